@@ -1,45 +1,106 @@
 from django.contrib import admin
 
+from .images import discard_image_variants, schedule_image_variants
+from .large_tables import LargeTableAdminMixin
 from .models import (
     Airline,
     Airport,
     AirplaneType,
     Airplane,
+    Crew,
     Route,
     Flight,
     Order,
     Ticket,
 )
 
-admin.site.register(Airline)
 admin.site.register(AirplaneType)
-admin.site.register(Route)
-admin.site.register(Flight)
+
+
+@admin.register(Airline)
+class AirlineListingAdmin(admin.ModelAdmin):
+    search_fields = ["name"]
+
+    def save_model(self, request, obj, form, change):
+        """Replace the variants of a changed image, like its upload does"""
+        image_changed = "image" in form.changed_data
+        if image_changed:
+            discard_image_variants(obj.image_variants)
+            obj.image_variants = {}
+
+        super().save_model(request, obj, form, change)
+
+        if image_changed:
+            schedule_image_variants(obj)
 
 
 @admin.register(Airport)
 class AirportListingAdmin(admin.ModelAdmin):
     list_display = ["name", "code", "closest_big_city"]
+    search_fields = ["code", "name", "closest_big_city"]
 
 
 @admin.register(Airplane)
 class AirplaneListingAdmin(admin.ModelAdmin):
     list_display = ["name", "airplane_type", "capacity"]
+    list_select_related = ["airplane_type"]
+    search_fields = ["name"]
+
+
+@admin.register(Crew)
+class CrewListingAdmin(admin.ModelAdmin):
+    list_display = ["first_name", "last_name"]
+    search_fields = ["first_name", "last_name"]
+
+
+@admin.register(Route)
+class RouteListingAdmin(admin.ModelAdmin):
+    list_display = ["__str__", "distance"]
+    list_select_related = ["source", "destination"]
+    search_fields = ["source__code", "destination__code"]
+    autocomplete_fields = ["source", "destination"]
+
+
+@admin.register(Flight)
+class FlightListingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ["__str__", "airline", "airplane", "arrival_time"]
+    list_select_related = [
+        "route__source", "route__destination", "airline", "airplane"
+    ]
+    list_filter = ["airline"]
+    search_fields = [
+        "id", "route", "route__source__code", "route__destination__code"
+    ]
+    search_help_text = "Flight or route ids, or airport codes"
+    autocomplete_fields = ["route", "airline", "airplane", "crew"]
 
 
 @admin.register(Order)
-class OrderListingAdmin(admin.ModelAdmin):
+class OrderListingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = [
+        "id",
         "user",
         "created_at",
     ]
+    list_select_related = ["user"]
+    search_fields = ["id", "user__email"]
+    search_help_text = "Order ids or user emails"
+    ordering = ["-id"]
+    autocomplete_fields = ["user"]
 
 
 @admin.register(Ticket)
-class TicketListingAdmin(admin.ModelAdmin):
+class TicketListingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = [
         "order",
         "flight",
         "row",
         "seat",
     ]
+    list_select_related = [
+        "order", "flight__route__source", "flight__route__destination"
+    ]
+    search_fields = ["order", "flight", "order__user__email"]
+    search_help_text = "Order or flight ids, or user emails"
+    ordering = ["-id"]
+    autocomplete_fields = ["flight", "order"]
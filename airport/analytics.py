@@ -0,0 +1,187 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round, TruncDate
+
+from airport.models import DailyLoad, Flight, Ticket
+
+# flights departed earlier than these days before today are final, their
+# rollups are only refreshed on request
+REFRESH_LOOKBACK_DAYS = 2
+# departure days aggregated by one INSERT ... SELECT statement
+REFRESH_BATCH_DAYS = 31
+
+# `DailyLoad` fields, and the aliases of the grouped flights query
+# filling them, named in both the INSERT and its SELECT
+ROLLUP_COLUMNS = {
+    "date": "day",
+    "route": "route_ref",
+    "airline": "airline_ref",
+    "airplane_type": "airplane_type_ref",
+    "flights": "flight_count",
+    "seats": "seat_count",
+    "seats_sold": "sold_count",
+}
+
+# rollup fields grouped by each dimension, with their labels
+DIMENSIONS = {
+    "route": ("route", "route__source__code", "route__destination__code"),
+    "airline": ("airline", "airline__name"),
+    "airplane_type": ("airplane_type", "airplane_type__name"),
+}
+
+
+def to_datetime(day):
+    return datetime.combine(day, time.min)
+
+
+def rollup_query(start, end):
+    """
+    Flights departing from the `start` to the `end` date grouped like
+    `DailyLoad`, selecting the `ROLLUP_COLUMNS` aliases
+    """
+    seats_sold = (
+        Ticket.objects.filter(
+            flight=OuterRef("pk"),
+            # read the departure partition only
+            departure_time=OuterRef("departure_time"),
+        )
+        .values("flight")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return (
+        Flight.objects.filter(
+            departure_time__gte=to_datetime(start),
+            departure_time__lt=to_datetime(end + timedelta(days=1)),
+        )
+        .annotate(
+            day=TruncDate("departure_time"),
+            sold=Coalesce(Subquery(seats_sold), 0),
+        )
+        .values(
+            "day",
+            route_ref=F("route"),
+            airline_ref=F("airline"),
+            airplane_type_ref=F("airplane__airplane_type"),
+        )
+        .annotate(
+            flight_count=Count("pk"),
+            seat_count=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+            sold_count=Sum("sold"),
+        )
+        .order_by()
+    )
+
+
+def refresh_daily_loads(
+    start, end, batch_days=REFRESH_BATCH_DAYS, using=DEFAULT_DB_ALIAS
+):
+    """
+    Recompute the rollups of the `start` to `end` departure dates, each
+    batch of days replaced in a transaction by a single set-based
+    INSERT ... SELECT. Return the number of rollups written.
+    """
+    if batch_days < 1:
+        raise ValueError("batch_days must be positive")
+
+    connection = connections[using]
+    quote_name = connection.ops.quote_name
+    table = quote_name(DailyLoad._meta.db_table)
+    columns = ", ".join(
+        quote_name(DailyLoad._meta.get_field(name).column)
+        for name in ROLLUP_COLUMNS
+    )
+    selected = ", ".join(
+        f"rollup.{quote_name(alias)}" for alias in ROLLUP_COLUMNS.values()
+    )
+    written = 0
+
+    batch_start = start
+    while batch_start <= end:
+        batch_end = min(batch_start + timedelta(days=batch_days - 1), end)
+        sql, params = (
+            rollup_query(batch_start, batch_end)
+            .query.get_compiler(using)
+            .as_sql()
+        )
+        with transaction.atomic(using=using):
+            DailyLoad.objects.using(using).filter(
+                date__range=(batch_start, batch_end)
+            ).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) "
+                    f"SELECT {selected} FROM ({sql}) rollup",
+                    params,
+                )
+                written += cursor.rowcount
+        batch_start = batch_end + timedelta(days=1)
+
+    return written
+
+
+def pending_refresh_range(today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Return the departure dates whose rollups may be stale: all of them
+    on the first refresh, then from `REFRESH_LOOKBACK_DAYS` before
+    today, or None when there are no flights nor rollups
+    """
+    today = today or date.today()
+    departures = Flight.objects.using(using).aggregate(
+        first=Min("departure_time"), last=Max("departure_time")
+    )
+    rollups = DailyLoad.objects.using(using).aggregate(
+        first=Min("date"), last=Max("date")
+    )
+    lasts = [
+        value
+        for value in (departures["last"], rollups["last"])
+        if value is not None
+    ]
+    if not lasts:
+        return None
+
+    last = max(
+        value.date() if isinstance(value, datetime) else value
+        for value in lasts
+    )
+    if rollups["first"] is None:
+        first = departures["first"].date()
+    else:
+        first = today - timedelta(days=REFRESH_LOOKBACK_DAYS)
+    return first, last
+
+
+def load_factors(queryset, dimension):
+    """Sum the rollups by date and `dimension`, adding the load factor"""
+    seats_sold = Sum("seats_sold")
+    return (
+        queryset.values("date", *DIMENSIONS[dimension])
+        .annotate(
+            total_flights=Sum("flights"),
+            total_seats=Sum("seats"),
+            total_seats_sold=seats_sold,
+            load_factor=Coalesce(
+                Round(
+                    Cast(seats_sold, FloatField())
+                    / NullIf(Sum("seats"), 0, output_field=IntegerField()),
+                    4,
+                ),
+                0.0,
+                output_field=FloatField(),
+            ),
+        )
+        .order_by("date", DIMENSIONS[dimension][0])
+    )
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AirportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "airport"
+
+    def ready(self):
+        # connect the signals invalidating the flight search and airport
+        # location indexes, and register the system checks
+        from airport import checks, locations, search  # noqa: F401
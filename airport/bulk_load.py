@@ -0,0 +1,559 @@
+import csv
+import gzip
+import json
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from airport.conflicts import check_bookings, flight_bookings
+from airport.geo import route_distance
+from airport.models import Airport
+
+# unique field identifying the rows of a model in fixtures, next to the pk
+NATURAL_KEYS = {
+    "airport.airport": "code",
+    "airport.airline": "name",
+    "airport.airplanetype": "name",
+    "airport.airplane": "name",
+}
+FORMATS = ("json", "ndjson", "csv")
+EXTENSION_FORMATS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+}
+JSON_WHITESPACE = " \t\n\r"
+JSON_READ_SIZE = 1 << 16
+
+
+def natural_key_field(model):
+    """Return the natural key field name of a model, if it has one"""
+    return NATURAL_KEYS.get(model._meta.label_lower) or getattr(
+        model, "USERNAME_FIELD", None
+    )
+
+
+def get_model(label):
+    try:
+        return apps.get_model(label)
+    except (LookupError, ValueError):
+        raise ValueError(f"Unknown model {label!r}")
+
+
+def detect_format(path):
+    suffixes = Path(path).suffixes
+    if suffixes[-1:] == [".gz"]:
+        suffixes = suffixes[:-1]
+    if not suffixes or suffixes[-1] not in EXTENSION_FORMATS:
+        raise ValueError(
+            f"Can't tell the format of {path}, "
+            f"use one of the {', '.join(EXTENSION_FORMATS)} extensions"
+        )
+    return EXTENSION_FORMATS[suffixes[-1]]
+
+
+def open_fixture(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_json_array(stream, read_size=JSON_READ_SIZE):
+    """
+    Yield the items of a top-level JSON array one by one, reading the
+    stream in chunks instead of parsing the whole document at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = "", 0
+
+    def read_more():
+        nonlocal buffer, position
+        chunk = stream.read(read_size)
+        buffer, position = buffer[position:] + chunk, 0
+        return bool(chunk)
+
+    def next_char():
+        nonlocal position
+        while True:
+            while (
+                position < len(buffer) and buffer[position] in JSON_WHITESPACE
+            ):
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                raise ValueError("Unexpected end of the JSON fixture")
+
+    if next_char() != "[":
+        raise ValueError("A JSON fixture must be an array of objects")
+    position += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # the item may continue in the next chunk
+            if not read_more():
+                raise
+            continue
+        yield item
+
+        separator = next_char()
+        position += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(
+                f"Expected ',' or ']' in the JSON fixture, got {separator!r}"
+            )
+
+
+def iter_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            yield orjson.loads(line)
+
+
+def read_fixture(path, fixture_format=None):
+    """Stream the records of a JSON, NDJSON or CSV fixture file"""
+    fixture_format = fixture_format or detect_format(path)
+    readers = {
+        "json": iter_json_array,
+        "ndjson": iter_ndjson,
+        "csv": csv.DictReader,
+    }
+    with open_fixture(path) as stream:
+        yield from readers[fixture_format](stream)
+
+
+@contextmanager
+def keep_timestamps(fields):
+    """Insert the given values of `auto_now(_add)` fields as they are"""
+    timestamps = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    for field, _, _ in timestamps:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in timestamps:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """
+    Loads fixture records with bulk inserts, a batch per model, in a
+    single transaction.
+
+    Records are either in the `dumpdata` format (`model`, `pk` and
+    `fields`) or flat field values of `model`. Relations are given by
+    primary key, or by natural key (see `NATURAL_KEYS`) as a string.
+    With `upsert`, rows conflicting on the primary key, or on the
+    natural key for records without one, are updated instead.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        upsert=False,
+        batch_size=5_000,
+        using=DEFAULT_DB_ALIAS,
+    ):
+        self.model = model
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.using = using
+        self.counts = Counter()
+        self.models_with_pks = set()
+        self.natural_key_pks = defaultdict(dict)
+        self.record_num = 0
+        self.batch_model = None
+        self.batch_with_pk = None
+        self.batch = []
+
+    def validate(self):
+        if self.batch_size < 1:
+            raise ValueError("The batch size must be positive")
+
+    def load(self, records):
+        """Load the records and return the number of rows per model"""
+        self.validate()
+        with transaction.atomic(using=self.using):
+            for record in records:
+                self.add(record)
+            self.flush()
+            self.reset_sequences()
+
+        return {model._meta.label: num for model, num in self.counts.items()}
+
+    def add(self, record):
+        self.record_num += 1
+        model, pk, values = self.parse_record(record)
+        with_pk = pk is not None
+
+        if (model, with_pk) != (self.batch_model, self.batch_with_pk):
+            self.flush()
+            self.batch_model, self.batch_with_pk = model, with_pk
+        self.batch.append((self.record_num, pk, values))
+
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def parse_record(self, record):
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {self.record_num} is not an object")
+
+        if "fields" in record:
+            model = get_model(record.get("model", ""))
+            pk, values = record.get("pk"), dict(record["fields"])
+        elif self.model is not None:
+            model, values = self.model, dict(record)
+            pk = values.pop("pk", None)
+            pk = values.pop(model._meta.pk.name, pk)
+        else:
+            raise ValueError(
+                f"Record {self.record_num} has no model, set the model "
+                f"of files with flat records"
+            )
+
+        return model, None if pk in ("", None) else pk, values
+
+    def flush(self):
+        if not self.batch:
+            return
+
+        model, with_pk = self.batch_model, self.batch_with_pk
+        opts = model._meta
+        conflict_field = self.get_conflict_field(model, with_pk)
+        records = self.batch
+        self.batch = []
+
+        rows = [
+            (
+                num,
+                self.to_python(opts.pk, pk, num) if with_pk else None,
+                self.parse_values(model, values, num),
+            )
+            for num, pk, values in records
+        ]
+        self.resolve_natural_keys(rows)
+        if self.upsert:
+            rows = self.deduplicate(rows, with_pk, conflict_field)
+        if opts.label == "airport.Flight":
+            self.check_flight_bookings(rows)
+        if opts.label == "airport.Route":
+            self.set_route_distances(rows)
+
+        fields = {
+            field
+            for _, _, values in rows
+            for field in map(opts.get_field, values)
+            if not field.many_to_many
+        }
+        objects = [
+            model(
+                pk=pk,
+                **{
+                    name: value
+                    for name, value in values.items()
+                    if not opts.get_field(name).many_to_many
+                },
+            )
+            for _, pk, values in rows
+        ]
+
+        with keep_timestamps(fields):
+            model.objects.using(self.using).bulk_create(
+                objects, **self.get_conflict_options(conflict_field, fields)
+            )
+
+        self.set_many_to_many(model, objects, rows)
+        self.natural_key_pks.pop(model, None)
+        self.counts[model] += len(objects)
+        if with_pk:
+            self.models_with_pks.add(model)
+
+    def check_flight_bookings(self, rows):
+        """
+        Reject flights double booking an airplane or crew member, with
+        each other or with the stored flights, as the API does. Upserted
+        rows without both times keep theirs and aren't checked.
+        """
+        bookings = []
+        for _, pk, values in rows:
+            if {"departure_time", "arrival_time"} <= values.keys():
+                bookings += flight_bookings(
+                    pk,
+                    values["departure_time"],
+                    values["arrival_time"],
+                    values.get("airplane_id"),
+                    values.get("crew", ()),
+                )
+        check_bookings(
+            bookings,
+            exclude=[pk for _, pk, _ in rows if pk is not None],
+            using=self.using,
+        )
+
+    def set_route_distances(self, rows):
+        """
+        Compute the distance of the routes between airports with a
+        location, as `Route.save` does, bulk inserts skipping it. Routes
+        between other airports must give theirs. Upserted rows without
+        both airports keep their distance.
+        """
+        airport_ids = {
+            values[field]
+            for _, _, values in rows
+            for field in ("source_id", "destination_id")
+            if field in values
+        }
+        locations = {
+            pk: (latitude, longitude)
+            for pk, latitude, longitude in Airport.objects.using(self.using)
+            .filter(
+                pk__in=airport_ids,
+                latitude__isnull=False,
+                longitude__isnull=False,
+            )
+            .values_list("pk", "latitude", "longitude")
+        }
+        for num, _, values in rows:
+            if not {"source_id", "destination_id"} <= values.keys():
+                continue
+            source = locations.get(values["source_id"])
+            destination = locations.get(values["destination_id"])
+            if source and destination:
+                values["distance"] = route_distance(*source, *destination)
+            elif values.get("distance") is None:
+                raise ValueError(
+                    f"Record {num}: give the distance of routes between "
+                    f"airports without a location"
+                )
+
+    def get_conflict_field(self, model, with_pk):
+        if not self.upsert:
+            return None
+        if with_pk:
+            return model._meta.pk
+        if natural_key_field(model) is None:
+            raise ValueError(
+                f"{model._meta.label} records need a primary key "
+                f"to be upserted"
+            )
+        return model._meta.get_field(natural_key_field(model))
+
+    def deduplicate(self, rows, with_pk, conflict_field):
+        """Keep the last row per key, no row can be upserted twice at once"""
+        unique_rows = {}
+        for num, pk, values in rows:
+            key = pk if with_pk else values.get(conflict_field.name)
+            if key is None:
+                raise ValueError(
+                    f"Record {num} has no {conflict_field.name} "
+                    f"to be upserted by"
+                )
+            unique_rows[key] = (num, pk, values)
+        return list(unique_rows.values())
+
+    def get_conflict_options(self, conflict_field, fields):
+        if conflict_field is None:
+            return {}
+
+        update_fields = [
+            field.name
+            for field in fields
+            if field != conflict_field and not field.primary_key
+        ]
+        if not update_fields:
+            return {"ignore_conflicts": True}
+        return {
+            "update_conflicts": True,
+            "unique_fields": [conflict_field.name],
+            "update_fields": update_fields,
+        }
+
+    def to_python(self, field, value, num):
+        if value == "" and (field.null or field.is_relation):
+            # empty CSV cells
+            return None
+        try:
+            value = field.to_python(value)
+        except ValidationError as error:
+            raise ValueError(
+                f"Record {num}: {field.name}: {' '.join(error.messages)}"
+            )
+
+        if (
+            isinstance(value, datetime)
+            and timezone.is_aware(value)
+            and not settings.USE_TZ
+        ):
+            # stored in the local time, as loaddata does on PostgreSQL
+            value = timezone.make_naive(value)
+        return value
+
+    def parse_values(self, model, values, num):
+        """
+        Return the values by field name, with relations given by natural
+        key left as `NaturalKey` placeholders.
+        """
+        parsed = {}
+        for key, value in values.items():
+            try:
+                field = model._meta.get_field(key)
+            except FieldDoesNotExist:
+                field = None
+            if field is None or not field.concrete:
+                raise ValueError(
+                    f"Record {num}: {model._meta.label} has no field {key!r}"
+                )
+
+            if field.many_to_many:
+                if isinstance(value, str):
+                    value = [item for item in value.split(",") if item]
+                parsed[field.name] = [
+                    self.to_relation(field, item, num) for item in value
+                ]
+            elif field.is_relation:
+                parsed[field.attname] = (
+                    self.to_python(field, value, num)
+                    if key == field.attname
+                    else self.to_relation(field, value, num)
+                )
+            else:
+                parsed[field.name] = self.to_python(field, value, num)
+        return parsed
+
+    def to_relation(self, field, value, num):
+        related_model = field.related_model
+        if isinstance(value, list) and len(value) == 1:
+            # dumpdata --natural-foreign format
+            value = value[0]
+        if isinstance(value, str) and natural_key_field(related_model):
+            return NaturalKey(related_model, value)
+        return self.to_python(related_model._meta.pk, value, num)
+
+    def resolve_natural_keys(self, rows):
+        """Replace the natural keys of a batch by the primary keys"""
+        keys = defaultdict(set)
+        for _, _, values in rows:
+            for value in values.values():
+                for item in value if isinstance(value, list) else [value]:
+                    if isinstance(item, NaturalKey):
+                        keys[item.model].add(item.key)
+
+        for model, model_keys in keys.items():
+            self.fetch_natural_keys(model, model_keys)
+
+        for _, _, values in rows:
+            for name, value in values.items():
+                if isinstance(value, list):
+                    values[name] = [self.get_pk(item) for item in value]
+                else:
+                    values[name] = self.get_pk(value)
+
+    def fetch_natural_keys(self, model, keys):
+        known = self.natural_key_pks[model]
+        missing = [key for key in keys if key not in known]
+        if not missing:
+            return
+
+        key_field = natural_key_field(model)
+        known.update(
+            model.objects.using(self.using)
+            .filter(**{f"{key_field}__in": missing})
+            .values_list(key_field, "pk")
+        )
+        unknown = sorted(key for key in missing if key not in known)
+        if unknown:
+            raise ValueError(
+                f"Unknown {model._meta.label} {key_field}: "
+                f"{', '.join(unknown[:10])}"
+            )
+
+    def get_pk(self, value):
+        if isinstance(value, NaturalKey):
+            return self.natural_key_pks[value.model][value.key]
+        return value
+
+    def set_many_to_many(self, model, objects, rows):
+        for field in model._meta.many_to_many:
+            owners = [
+                (obj, values[field.name])
+                for obj, (_, _, values) in zip(objects, rows)
+                if field.name in values
+            ]
+            if not owners:
+                continue
+            if any(obj.pk is None for obj, _ in owners):
+                self.set_natural_key_pks(model, [obj for obj, _ in owners])
+
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(
+                field.m2m_reverse_field_name()
+            ).attname
+            if self.upsert:
+                through.objects.using(self.using).filter(
+                    **{f"{source}__in": [obj.pk for obj, _ in owners]}
+                ).delete()
+            through.objects.using(self.using).bulk_create(
+                [
+                    through(**{source: obj.pk, target: related_pk})
+                    for obj, related_pks in owners
+                    for related_pk in related_pks
+                ],
+                ignore_conflicts=True,
+            )
+
+    def set_natural_key_pks(self, model, objects):
+        """Set the primary keys the database didn't return on insert"""
+        key_field = natural_key_field(model)
+        keys = [getattr(obj, key_field) for obj in objects]
+        pks = dict(
+            model.objects.using(self.using)
+            .filter(**{f"{key_field}__in": keys})
+            .values_list(key_field, "pk")
+        )
+        for obj, key in zip(objects, keys):
+            obj.pk = pks[key]
+
+    def reset_sequences(self):
+        """Continue the PostgreSQL id sequences after the loaded ids"""
+        connection = connections[self.using]
+        if not self.models_with_pks or connection.vendor != "postgresql":
+            return
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), list(self.models_with_pks)
+            ):
+                cursor.execute(sql)
+
+
+class NaturalKey:
+    """Placeholder of a relation given by natural key"""
+
+    __slots__ = ("model", "key")
+
+    def __init__(self, model, key):
+        self.model = model
+        self.key = key
@@ -0,0 +1,24 @@
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache(cache):
+    """Tell if other processes see the entries of the cache"""
+    return not isinstance(cache, (DummyCache, LocMemCache))
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if is_shared_cache(caches[DEFAULT_CACHE_ALIAS]):
+        return []
+    return [
+        checks.Warning(
+            "The default cache is local to each process, so the workers "
+            "don't share rate limits, read-your-writes stickiness, slow "
+            "queries, request profiles, booking curves or index versions.",
+            hint="Set REDIS_URL to a Redis server shared by the workers.",
+            id="airport.W001",
+        )
+    ]
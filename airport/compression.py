@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.utils.text import compress_string
+
+MAX_RANDOM_BYTES = 100
+
+INCOMPRESSIBLE_CONTENT_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "application/gzip",
+    "application/zip",
+)
+
+
+def accepts_encoding(request, encoding):
+    """Return True if `Accept-Encoding` allows the given encoding"""
+    qualities = {}
+
+    for value in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = value.partition(";")
+        name, _, quality = params.strip().partition("=")
+        try:
+            qualities[coding.strip().lower()] = (
+                float(quality) if name.strip() == "q" else 1.0
+            )
+        except ValueError:
+            qualities[coding.strip().lower()] = 0.0
+
+    return qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "")
+    return (
+        not response.streaming
+        and not response.has_header("Content-Encoding")
+        and not content_type.startswith(INCOMPRESSIBLE_CONTENT_TYPES)
+        and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+    )
+
+
+def gzip_content(content):
+    return compress_string(content, max_random_bytes=MAX_RANDOM_BYTES)
@@ -0,0 +1,223 @@
+from collections import defaultdict, namedtuple
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import (
+    DateTimeRangeField,
+    RangeBoundary,
+    RangeOperators,
+)
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Func
+
+from airport.models import Airplane, Crew, Flight
+
+AIRPLANE = "airplane"
+CREW = "crew"
+RESOURCES = {AIRPLANE: Airplane, CREW: Crew}
+RESOURCE_NAMES = {AIRPLANE: "Airplane", CREW: "Crew member"}
+
+# a resource taken by a flight from `start` to `end`, excluded; `new`
+# bookings are the checked ones, and `flight_id` is None until the
+# flight is created
+Booking = namedtuple(
+    "Booking", ["resource", "resource_id", "flight_id", "start", "end", "new"]
+)
+# a new booking and another booking of its resource overlapping it
+Conflict = namedtuple("Conflict", ["booking", "other"])
+
+
+class TsTzRange(Func):
+    # PostgreSQL stores every DateTimeField as a timestamptz column
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+# PostgreSQL guard against concurrent or unchecked airplane double
+# bookings; the crew table of the flights has no times to constrain
+AIRPLANE_EXCLUSION = ExclusionConstraint(
+    name="exclude_airplane_double_booking",
+    expressions=[
+        ("airplane", RangeOperators.EQUAL),
+        (
+            TsTzRange("departure_time", "arrival_time", RangeBoundary()),
+            RangeOperators.OVERLAPS,
+        ),
+    ],
+)
+
+
+def flight_bookings(flight_id, start, end, airplane_id=None, crew_ids=()):
+    """New bookings of the airplane and crew members of a flight"""
+    bookings = [
+        Booking(CREW, crew_id, flight_id, start, end, True)
+        for crew_id in crew_ids
+    ]
+    if airplane_id is not None:
+        bookings.insert(
+            0, Booking(AIRPLANE, airplane_id, flight_id, start, end, True)
+        )
+    return bookings
+
+
+class IntervalIndex:
+    """
+    Bookings per resource, swept in start order to find the new ones
+    overlapping another booking of their resource in O(n log n)
+    """
+
+    def __init__(self, bookings=()):
+        self.bookings = defaultdict(list)
+        for booking in bookings:
+            self.add(booking)
+
+    def add(self, booking):
+        self.bookings[booking.resource, booking.resource_id].append(booking)
+
+    def conflicts(self):
+        """
+        Return a conflict of every new booking overlapping another one,
+        along with the booking ending last among those starting before
+        """
+        conflicts = []
+        for bookings in self.bookings.values():
+            bookings.sort(key=lambda booking: (booking.start, booking.end))
+            latest = None
+            for booking in bookings:
+                if (
+                    latest is not None
+                    and booking.start < latest.end
+                    and (booking.new or latest.new)
+                    and (
+                        booking.flight_id is None
+                        or booking.flight_id != latest.flight_id
+                    )
+                ):
+                    conflicts.append(
+                        Conflict(booking, latest)
+                        if booking.new
+                        else Conflict(latest, booking)
+                    )
+                if latest is None or booking.end > latest.end:
+                    latest = booking
+        return conflicts
+
+
+def find_conflicts(bookings, exclude=(), using=DEFAULT_DB_ALIAS):
+    """
+    Return the conflicts of the new bookings with each other and with
+    the stored flights, apart from the `exclude` ones they replace
+    """
+    bookings = list(bookings)
+    if not bookings:
+        return []
+
+    resource_ids = defaultdict(set)
+    for booking in bookings:
+        resource_ids[booking.resource].add(booking.resource_id)
+    start = min(booking.start for booking in bookings)
+    end = max(booking.end for booking in bookings)
+
+    index = IntervalIndex(bookings)
+    if resource_ids[AIRPLANE]:
+        for flight_id, airplane_id, departure, arrival in (
+            Flight.objects.using(using)
+            .filter(
+                airplane_id__in=resource_ids[AIRPLANE],
+                departure_time__lt=end,
+                arrival_time__gt=start,
+            )
+            .exclude(pk__in=exclude)
+            .values_list("id", "airplane_id", "departure_time", "arrival_time")
+        ):
+            index.add(
+                Booking(
+                    AIRPLANE, airplane_id, flight_id, departure, arrival, False
+                )
+            )
+    if resource_ids[CREW]:
+        for flight_id, crew_id, departure, arrival in (
+            Flight.crew.through.objects.using(using)
+            .filter(
+                crew_id__in=resource_ids[CREW],
+                flight__departure_time__lt=end,
+                flight__arrival_time__gt=start,
+            )
+            .exclude(flight_id__in=exclude)
+            .values_list(
+                "flight_id",
+                "crew_id",
+                "flight__departure_time",
+                "flight__arrival_time",
+            )
+        ):
+            index.add(
+                Booking(CREW, crew_id, flight_id, departure, arrival, False)
+            )
+    return index.conflicts()
+
+
+def describe(booking):
+    flight = (
+        "a new flight"
+        if booking.flight_id is None
+        else f"flight {booking.flight_id}"
+    )
+    return (
+        f"{flight} from {booking.start:%Y-%m-%d %H:%M} "
+        f"to {booking.end:%Y-%m-%d %H:%M}"
+    )
+
+
+class DoubleBookingError(ValueError):
+    """Airplanes or crew members booked by overlapping flights"""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__(
+            " ".join(
+                message
+                for messages in self.errors.values()
+                for message in messages
+            )
+        )
+
+    @property
+    def errors(self):
+        """Messages of the conflicts per resource"""
+        errors = defaultdict(list)
+        for booking, other in self.conflicts:
+            errors[booking.resource].append(
+                f"{RESOURCE_NAMES[booking.resource]} {booking.resource_id} "
+                f"of {describe(booking)} is already booked by "
+                f"{describe(other)}."
+            )
+        return dict(errors)
+
+
+def check_bookings(bookings, exclude=(), using=DEFAULT_DB_ALIAS):
+    """
+    Raise DoubleBookingError if new bookings conflict. The booked
+    airplanes and crew members are locked until the end of the
+    transaction, so concurrent bookings of them are checked in turn.
+    """
+    bookings = list(bookings)
+    for resource, model in RESOURCES.items():
+        ids = sorted(
+            {
+                booking.resource_id
+                for booking in bookings
+                if booking.resource == resource
+            }
+        )
+        if ids:
+            list(
+                model.objects.using(using)
+                .select_for_update()
+                .filter(pk__in=ids)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+
+    conflicts = find_conflicts(bookings, exclude, using)
+    if conflicts:
+        raise DoubleBookingError(conflicts)
@@ -0,0 +1,70 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_READS_KEY = "primary_reads:{}"
+
+replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def read_from_replicas(enabled=True):
+    token = replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def stick_to_primary(user_id):
+    """
+    Read the data of a user from the primary for the next
+    `REPLICA_STICKY_SECONDS`, so they see their writes despite the
+    replication lag. The mark is kept in the cache shared by the worker
+    processes, whichever serves their next request.
+    """
+    cache.set(
+        PRIMARY_READS_KEY.format(user_id),
+        True,
+        settings.REPLICA_STICKY_SECONDS,
+    )
+
+
+def is_stuck_to_primary(user_id):
+    return bool(cache.get(PRIMARY_READS_KEY.format(user_id)))
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to a random database of `REPLICA_DATABASES` within
+    `read_from_replicas()`, set for safe-method viewset actions by
+    `ReplicaRoutingMiddleware`, and everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # related objects from the database of the instance
+            return instance._state.db
+
+        if settings.REPLICA_DATABASES and replica_reads.get():
+            return random.choice(settings.REPLICA_DATABASES)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,207 @@
+from datetime import date, datetime
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, F
+from django.db.models.functions import Cast
+
+from airport.models import Flight, Ticket
+
+# bookings made earlier are counted as made this many days before departure
+HORIZON_DAYS = 365
+# routes with fewer departed flights use the booking curve of all routes
+MIN_ROUTE_FLIGHTS = 5
+# days before departure of the curve points listed by the API
+CURVE_DAYS = (0, 1, 3, 7, 14, 30, 60, 90, 180, 365)
+CURVES_KEY = "demand_forecast:curves"
+
+
+class BookingCurves:
+    """
+    Share of the final seats sold already sold by each number of days
+    before departure, with the final load factor, per route. Arrays are
+    indexed like `route_ids`; the last row is for all routes.
+    """
+
+    def __init__(self, route_ids, flights, curves, load_factors, fitted_at):
+        self.route_ids = route_ids
+        self.flights = flights
+        self.curves = curves
+        self.load_factors = load_factors
+        self.fitted_at = fitted_at
+
+    def route_index(self, route_ids):
+        """Rows of the routes, the all routes one for unknown routes"""
+        route_ids = np.asarray(route_ids, dtype=np.int64)
+        index = np.searchsorted(self.route_ids, route_ids)
+        known = index < len(self.route_ids)
+        known[known] = self.route_ids[index[known]] == route_ids[known]
+        return np.where(known, index, len(self.route_ids))
+
+    def summaries(self):
+        """Route booking curves sampled at `CURVE_DAYS`, busiest first"""
+        days = np.array(CURVE_DAYS)
+        return [
+            {
+                "route": int(self.route_ids[index]),
+                "flights": int(self.flights[index]),
+                "load_factor": round(float(self.load_factors[index]), 4),
+                "curve": dict(
+                    zip(
+                        CURVE_DAYS,
+                        np.round(self.curves[index, days], 4).tolist(),
+                    )
+                ),
+            }
+            for index in np.argsort(-self.flights[:-1], kind="stable")
+        ]
+
+    def predict(self, route_ids, days_before, seats_sold, capacity):
+        """
+        Expected final seats sold of flights: the seats sold plus the
+        share of the route demand usually booked later on
+        """
+        index = self.route_index(route_ids)
+        days = np.clip(np.asarray(days_before), 0, HORIZON_DAYS)
+        seats_sold = np.asarray(seats_sold, dtype=np.float64)
+        capacity = np.asarray(capacity, dtype=np.float64)
+
+        remaining = 1 - self.curves[index, days]
+        expected = seats_sold + remaining * self.load_factors[index] * capacity
+        return np.clip(expected, seats_sold, np.maximum(capacity, seats_sold))
+
+
+def to_days(timestamps):
+    """Dates of ISO timestamps, parsed by NumPy rather than row by row"""
+    return np.array(timestamps, dtype="datetime64[us]").astype(
+        "datetime64[D]"
+    )
+
+
+def fit_booking_curves(now=None, using=None):
+    """
+    Build the booking curves from the tickets of the departed flights,
+    counted per flight and booking time by the database and accumulated
+    with NumPy. Timestamps are read as text, converting them to
+    datetimes one by one would take most of the time.
+    """
+    now = now or datetime.now()
+    flights = list(
+        Flight.objects.using(using)
+        .filter(departure_time__lt=now)
+        .values_list(
+            "id",
+            "route_id",
+            Cast("departure_time", CharField()),
+            F("airplane__rows") * F("airplane__seats_in_row"),
+        )
+        .order_by("id")
+    )
+    bookings = list(
+        Ticket.objects.using(using)
+        .filter(flight__departure_time__lt=now)
+        .values_list("flight_id", Cast("order__created_at", CharField()))
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+    flight_ids, flight_routes, departures, capacities = (
+        zip(*flights) if flights else ((),) * 4
+    )
+    booked_flights, booked_at, tickets = (
+        zip(*bookings) if bookings else ((),) * 3
+    )
+
+    flight_ids = np.array(flight_ids, dtype=np.int64)
+    flight_routes = np.array(flight_routes, dtype=np.int64)
+    capacities = np.array(capacities, dtype=np.float64)
+    tickets = np.array(tickets, dtype=np.float64)
+    # flights are sorted by id
+    booked = np.searchsorted(
+        flight_ids, np.array(booked_flights, dtype=np.int64)
+    )
+    booking_routes = flight_routes[booked]
+    days_before = (to_days(departures)[booked] - to_days(booked_at)).astype(
+        np.int64
+    )
+
+    route_ids = np.unique(np.concatenate([flight_routes, booking_routes]))
+    routes = len(route_ids)
+    width = HORIZON_DAYS + 1
+
+    # tickets booked each number of days before departure, per route
+    sold_at = np.bincount(
+        np.searchsorted(route_ids, booking_routes) * width
+        + np.clip(days_before, 0, HORIZON_DAYS),
+        weights=tickets,
+        minlength=routes * width,
+    ).reshape(routes, width)
+    # tickets booked that many days before departure or earlier
+    sold_by = np.cumsum(sold_at[:, ::-1], axis=1)[:, ::-1]
+    sold_by = np.vstack([sold_by, sold_by.sum(axis=0)])
+
+    flight_index = np.searchsorted(route_ids, flight_routes)
+    flights = np.bincount(flight_index, minlength=routes)
+    flights = np.append(flights, flights.sum())
+    seats = np.bincount(flight_index, weights=capacities, minlength=routes)
+    seats = np.append(seats, seats.sum())
+
+    total = sold_by[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        curves = np.where(total[:, None] > 0, sold_by / total[:, None], 1.0)
+        load_factors = np.where(seats > 0, total / seats, 0.0)
+
+    # too few flights make a noisy curve, use the one of all routes
+    sparse = flights < MIN_ROUTE_FLIGHTS
+    sparse[-1] = False
+    curves[sparse] = curves[-1]
+    load_factors[sparse] = load_factors[-1]
+
+    return BookingCurves(route_ids, flights, curves, load_factors, now)
+
+
+def get_booking_curves():
+    """
+    Return the booking curves cached by `fit_demand_curves`, None until
+    it ran. Fitting reads every departed ticket, never in a request.
+    """
+    return cache.get(CURVES_KEY)
+
+
+def cache_booking_curves(using=None):
+    curves = fit_booking_curves(using=using)
+    cache.set(CURVES_KEY, curves, settings.DEMAND_CURVES_TTL)
+    return curves
+
+
+def forecast_flights(flights, curves, today=None):
+    """
+    Set the `days_before`, `expected_seats_sold` and
+    `expected_load_factor` of upcoming flights annotated with their
+    `capacity` and `seats_sold`
+    """
+    flights = list(flights)
+    if not flights:
+        return flights
+
+    today = today or date.today()
+    days_before = [
+        (flight.departure_time.date() - today).days for flight in flights
+    ]
+    capacity = np.array([flight.capacity for flight in flights])
+    expected = curves.predict(
+        [flight.route_id for flight in flights],
+        days_before,
+        [flight.seats_sold for flight in flights],
+        capacity,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        load_factors = np.where(capacity > 0, expected / capacity, 0.0)
+
+    for flight, days, seats, load_factor in zip(
+        flights, days_before, expected, load_factors
+    ):
+        flight.days_before = days
+        flight.expected_seats_sold = round(float(seats), 1)
+        flight.expected_load_factor = round(float(load_factor), 4)
+    return flights
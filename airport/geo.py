@@ -0,0 +1,135 @@
+import heapq
+
+import numpy as np
+
+# mean radius of the Earth
+EARTH_RADIUS_KM = 6371.0088
+# points of the k-d tree leaves, compared with vectorized distances
+LEAF_SIZE = 16
+
+
+def great_circle_km(latitude_1, longitude_1, latitude_2, longitude_2):
+    """Haversine distance between points, of numbers or numpy arrays"""
+    latitude_1, longitude_1, latitude_2, longitude_2 = map(
+        np.radians, (latitude_1, longitude_1, latitude_2, longitude_2)
+    )
+    haversine = (
+        np.sin((latitude_2 - latitude_1) / 2) ** 2
+        + np.cos(latitude_1)
+        * np.cos(latitude_2)
+        * np.sin((longitude_2 - longitude_1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(haversine, 1)))
+
+
+def route_distance(*coordinates):
+    """Whole great-circle kilometers between two points"""
+    return round(float(great_circle_km(*coordinates)))
+
+
+def unit_vectors(latitudes, longitudes):
+    """
+    Points of the unit sphere, whose straight line (chord) distances
+    order them like their great-circle distances
+    """
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack(
+        (
+            np.cos(latitudes) * np.cos(longitudes),
+            np.cos(latitudes) * np.sin(longitudes),
+            np.sin(latitudes),
+        )
+    )
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1))
+
+
+def km_to_chord(km):
+    return 2 * np.sin(np.minimum(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class KDTree:
+    """
+    Static k-d tree of points, split at the median of their widest
+    dimension. Nodes keep the bounding box of their points, so queries
+    skip the nodes farther than the current bound.
+    """
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.order = np.arange(len(self.points))
+        # (start, end, lower, upper, left, right) of the points
+        # self.order[start:end], leaves having no children
+        self.nodes = []
+        if len(self.points):
+            self.build(0, len(self.points))
+
+    def build(self, start, end):
+        node = len(self.nodes)
+        self.nodes.append(None)
+        points = self.points[self.order[start:end]]
+        lower, upper = points.min(axis=0), points.max(axis=0)
+        if end - start <= LEAF_SIZE:
+            self.nodes[node] = (start, end, lower, upper, None, None)
+            return node
+
+        dim = int(np.argmax(upper - lower))
+        middle = (start + end) // 2
+        split = np.argpartition(points[:, dim], middle - start)
+        self.order[start:end] = self.order[start:end][split]
+        left = self.build(start, middle)
+        right = self.build(middle, end)
+        self.nodes[node] = (start, end, lower, upper, left, right)
+        return node
+
+    def box_distance(self, point, node):
+        _, _, lower, upper, _, _ = self.nodes[node]
+        outside = np.maximum(np.maximum(lower - point, 0), point - upper)
+        return float(np.linalg.norm(outside))
+
+    def query(self, point, k, max_distance=np.inf):
+        """
+        Return the indexes and distances of the `k` points nearest to
+        point within `max_distance`, nearest first
+        """
+        point = np.asarray(point, dtype=float)
+        # the best points as a max-heap of (-distance, index)
+        best = []
+        if not self.nodes or k < 1:
+            return [], []
+
+        def bound():
+            return -best[0][0] if len(best) == k else max_distance
+
+        pending = [(self.box_distance(point, 0), 0)]
+        while pending:
+            distance, node = heapq.heappop(pending)
+            if distance > bound():
+                break
+
+            start, end, _, _, left, right = self.nodes[node]
+            if left is None:
+                indexes = self.order[start:end]
+                distances = np.linalg.norm(
+                    self.points[indexes] - point, axis=1
+                )
+                for index, distance in zip(indexes, distances):
+                    if distance > bound():
+                        continue
+                    heapq.heappush(best, (-distance, int(index)))
+                    if len(best) > k:
+                        heapq.heappop(best)
+            else:
+                for child in (left, right):
+                    heapq.heappush(
+                        pending, (self.box_distance(point, child), child)
+                    )
+
+        best = sorted((-distance, index) for distance, index in best)
+        return (
+            [index for _, index in best],
+            [distance for distance, _ in best],
+        )
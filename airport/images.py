@@ -0,0 +1,124 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from airport.models import Airline
+
+logger = logging.getLogger(__name__)
+
+# largest width and height of the resized copies of airline images
+IMAGE_VARIANTS = {
+    "thumbnail": (64, 64),
+    "medium": (256, 256),
+}
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXTENSION = ".webp"
+VARIANT_QUALITY = 80
+
+image_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="airline-image"
+)
+
+
+def variant_name(image_name, variant):
+    stem, _ = os.path.splitext(image_name)
+    return f"{stem}-{variant}{VARIANT_EXTENSION}"
+
+
+def render_variants(file):
+    """Return the encoded variants of an image file by variant name"""
+    with Image.open(file) as image:
+        # let JPEG decode at the smallest scale still larger than needed
+        image.draft("RGB", max(IMAGE_VARIANTS.values()))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert(
+            "RGBA" if image.has_transparency_data else "RGB"
+        )
+
+    variants = {}
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY)
+        variants[variant] = buffer.getvalue()
+    return variants
+
+
+def generate_image_variants(airline_id, image_name):
+    """
+    Store the variants of an airline image next to it and record their
+    names, unless the airline image was replaced meanwhile.
+    """
+    storage = Airline._meta.get_field("image").storage
+    with storage.open(image_name) as file:
+        rendered = render_variants(file)
+
+    names = {
+        variant: storage.save(
+            variant_name(image_name, variant), ContentFile(content)
+        )
+        for variant, content in rendered.items()
+    }
+
+    updated = Airline.objects.filter(pk=airline_id, image=image_name).update(
+        image_variants=names
+    )
+    if not updated:
+        for name in names.values():
+            storage.delete(name)
+    return names
+
+
+def generate_in_background(airline_id, image_name):
+    try:
+        generate_image_variants(airline_id, image_name)
+    except Exception:
+        logger.exception(
+            "Couldn't generate the variants of airline %s image %s",
+            airline_id,
+            image_name,
+        )
+    finally:
+        connections.close_all()
+
+
+def discard_image_variants(names):
+    """
+    Delete the variant files of a replaced airline image once the change
+    is committed, so a rolled back change keeps serving them.
+    """
+    storage = Airline._meta.get_field("image").storage
+    names = list(names.values())
+
+    def delete():
+        for name in names:
+            storage.delete(name)
+
+    transaction.on_commit(delete)
+
+
+def schedule_image_variants(airline):
+    """
+    Generate the variants of a new airline image on a worker thread
+    once the upload is committed. Until then the original is served.
+    """
+    airline_id, image_name = airline.pk, airline.image.name
+
+    def submit():
+        try:
+            image_executor.submit(
+                generate_in_background, airline_id, image_name
+            )
+        except RuntimeError:
+            # the executor is shut down at interpreter exit
+            logger.warning(
+                "Skipped the variants of airline %s image", airline_id
+            )
+
+    transaction.on_commit(submit)
@@ -0,0 +1,86 @@
+import orjson
+from django.contrib.admin.utils import get_fields_from_path
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import IntegerField, Q
+from django.utils.functional import cached_property
+
+# row estimates below which rows are counted, which is cheap enough
+EXACT_COUNT_LIMIT = 10_000
+MAX_ID = 2**63 - 1
+
+# planner statistics of a table, partitions included
+TABLE_ROWS_SQL = """
+    SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0)
+    FROM pg_class
+    WHERE oid = %s::regclass
+        OR oid IN (
+            SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass
+        )
+"""
+
+
+def estimated_count(queryset):
+    """
+    Number of rows of the queryset, estimated by the PostgreSQL planner
+    instead of counted when there are more than EXACT_COUNT_LIMIT
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.is_empty():
+        return queryset.count()
+
+    if queryset.query.where:
+        plan = orjson.loads(queryset.explain(format="json"))
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    else:
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(TABLE_ROWS_SQL, [table, table])
+            estimate = cursor.fetchone()[0]
+
+    if estimate < EXACT_COUNT_LIMIT:
+        return queryset.count()
+    return int(estimate)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator of large tables, counting their rows approximately"""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+def is_id(term):
+    return term.isdigit() and int(term) <= MAX_ID
+
+
+def is_numeric(model, path):
+    field = get_fields_from_path(model, path)[-1]
+    if field.is_relation:
+        field = field.target_field
+    return isinstance(field, IntegerField)
+
+
+class LargeTableAdminMixin:
+    """
+    Changelist of a table too large to scan: approximate counts, and a
+    search of whole values of indexed `search_fields` (ids, emails, ...)
+    rather than the default substring scan. Numbers only match the
+    numeric fields.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        for term in search_term.split():
+            lookups = [
+                (f"{field}__exact", term)
+                for field in self.get_search_fields(request)
+                if is_id(term) or not is_numeric(self.model, field)
+            ]
+            if not lookups:
+                return queryset.none(), False
+            queryset = queryset.filter(Q.create(lookups, connector=Q.OR))
+        return queryset, False
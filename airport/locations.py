@@ -0,0 +1,138 @@
+import uuid
+
+import numpy as np
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from airport.geo import (
+    KDTree,
+    chord_to_km,
+    km_to_chord,
+    route_distance,
+    unit_vectors,
+)
+from airport.models import Airport, Route
+
+# airports of a nearest airports query, by default and at most
+NEARBY_AIRPORTS_LIMIT = 10
+MAX_NEARBY_AIRPORTS = 100
+INDEX_VERSION_KEY = "airport_locations:version"
+BATCH_SIZE = 1_000
+
+
+class AirportLocations:
+    """In-process k-d tree of the airports having a location"""
+
+    def __init__(self, airports):
+        airports = list(airports)
+        self.ids = [airport_id for airport_id, _, _ in airports]
+        self.tree = KDTree(
+            unit_vectors(
+                [latitude for _, latitude, _ in airports],
+                [longitude for _, _, longitude in airports],
+            )
+        )
+
+    @classmethod
+    def build(cls, using=None):
+        return cls(
+            Airport.objects.using(using)
+            .filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list("id", "latitude", "longitude")
+        )
+
+    def nearest(self, latitude, longitude, limit, radius=None):
+        """
+        Return the ids and great-circle kilometers of the `limit`
+        airports nearest to the point, within `radius` kilometers
+        """
+        indexes, chords = self.tree.query(
+            unit_vectors([latitude], [longitude])[0],
+            limit,
+            np.inf if radius is None else km_to_chord(radius),
+        )
+        return [
+            (self.ids[index], float(chord_to_km(chord)))
+            for index, chord in zip(indexes, chords)
+        ]
+
+
+# version and index of this process
+_airport_locations = (None, None)
+
+
+def get_airport_locations(using=None):
+    """
+    Return the index of this process, rebuilt once any process changed
+    an airport: its version is kept in the cache shared by the worker
+    processes
+    """
+    global _airport_locations
+
+    version = cache.get_or_set(INDEX_VERSION_KEY, new_version, None)
+    built_version, index = _airport_locations
+    if index is None or built_version != version:
+        index = AirportLocations.build(using)
+        _airport_locations = (version, index)
+    return index
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def invalidate_airport_locations():
+    cache.set(INDEX_VERSION_KEY, new_version(), None)
+
+
+def update_route_distances(routes=None, using=DEFAULT_DB_ALIAS):
+    """
+    Set the great-circle distance of the routes between airports with a
+    location, all of them by default. Return the number of routes
+    changed.
+    """
+    routes = (
+        Route.objects.using(using) if routes is None else routes
+    ).filter(
+        source__latitude__isnull=False,
+        source__longitude__isnull=False,
+        destination__latitude__isnull=False,
+        destination__longitude__isnull=False,
+    )
+    changed = []
+    for pk, distance, *coordinates in routes.values_list(
+        "pk",
+        "distance",
+        "source__latitude",
+        "source__longitude",
+        "destination__latitude",
+        "destination__longitude",
+    ):
+        new_distance = route_distance(*coordinates)
+        if new_distance != distance:
+            changed.append(Route(pk=pk, distance=new_distance))
+
+    Route.objects.using(using).bulk_update(
+        changed, ["distance"], batch_size=BATCH_SIZE
+    )
+    return len(changed)
+
+
+@receiver(post_save, sender=Airport)
+def airport_saved(sender, instance, raw=False, using=None, **kwargs):
+    invalidate_airport_locations()
+    if instance.has_location and not raw:
+        update_route_distances(
+            Route.objects.using(using).filter(
+                Q(source=instance) | Q(destination=instance)
+            ),
+            using=using,
+        )
+
+
+@receiver(post_delete, sender=Airport)
+def airport_deleted(sender, **kwargs):
+    invalidate_airport_locations()
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from airport.bulk_load import FORMATS, BulkLoader, get_model, read_fixture
+from airport.locations import update_route_distances
+from airport.search import invalidate_derived_indexes
+
+
+class Command(BaseCommand):
+    """Django command to bulk load fixture files"""
+
+    help = (
+        "Load JSON, NDJSON or CSV fixtures with bulk inserts in a single "
+        "transaction. Relations can be given by natural key (airport "
+        "code, airline name, ...) and existing rows updated with --upsert."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Fixture files")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the files, told by their extension by default",
+        )
+        parser.add_argument(
+            "--model",
+            help="Model of flat records, e.g. airport.route (required for "
+            "CSV files)",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update the rows conflicting on the primary key, or on "
+            "the natural key for records without one",
+        )
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            loader = BulkLoader(
+                model=options["model"] and get_model(options["model"]),
+                upsert=options["upsert"],
+                batch_size=options["batch_size"],
+                using=options["database"],
+            )
+            counts = loader.load(
+                record
+                for path in options["paths"]
+                for record in read_fixture(path, options["format"])
+            )
+            # airports given a location after their routes were loaded
+            distances = update_route_distances(using=options["database"])
+        except (OSError, ValueError, DatabaseError) as error:
+            raise CommandError(error)
+
+        invalidate_derived_indexes()
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} rows")
+        if distances:
+            self.stdout.write(f"{distances} route distances computed")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Data loaded in {time.perf_counter() - started:.1f}s!"
+            )
+        )
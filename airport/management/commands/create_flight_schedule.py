@@ -0,0 +1,66 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from airport.schedules import create_schedule
+from airport.serializers import FlightScheduleSerializer
+
+
+class Command(BaseCommand):
+    """Django command to create the flights of a weekly schedule"""
+
+    help = (
+        "Create the flights of a route on some weekdays over a date range "
+        "with their crew, using bulk inserts in a single transaction. "
+        "Flights already scheduled are kept, so it can be run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--route", required=True, type=int)
+        parser.add_argument("--airplane", required=True, type=int)
+        parser.add_argument("--airline", required=True, type=int)
+        parser.add_argument("--crew", nargs="*", type=int, default=[])
+        parser.add_argument(
+            "--weekdays",
+            nargs="+",
+            type=int,
+            required=True,
+            help="ISO weekdays of the flights, Monday is 1",
+        )
+        parser.add_argument(
+            "--departure-time", required=True, help="e.g. 08:30"
+        )
+        parser.add_argument(
+            "--duration", required=True, help="e.g. 02:15:00"
+        )
+        parser.add_argument("--start-date", required=True)
+        parser.add_argument("--end-date", required=True)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        serializer = FlightScheduleSerializer(
+            data={
+                field: options[field]
+                for field in FlightScheduleSerializer().fields
+            }
+        )
+        if not serializer.is_valid():
+            raise CommandError(
+                "; ".join(
+                    f"{field}: {' '.join(map(str, errors))}"
+                    for field, errors in serializer.errors.items()
+                )
+            )
+
+        try:
+            result = create_schedule(
+                **serializer.validated_data, using=options["database"]
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['created']} flights created, "
+                f"{result['existing']} already scheduled, "
+                f"{result['crew_links']} crew assignments added!"
+            )
+        )
@@ -0,0 +1,42 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from airport.partitions import (
+    MONTHS_AHEAD,
+    add_months,
+    create_partitions,
+    month_start,
+    months_between,
+)
+
+
+class Command(BaseCommand):
+    """Django command to create the ticket partitions of the coming months"""
+
+    help = (
+        "Create the monthly ticket partitions from the current month to "
+        "--months ahead, moving their tickets out of the default "
+        "partition. Run it monthly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=MONTHS_AHEAD)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        current = month_start(timezone.now())
+        months = months_between(
+            current, add_months(current, options["months"])
+        )
+
+        try:
+            created = create_partitions(
+                connections[options["database"]], months
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        for name in created:
+            self.stdout.write(f"{name} created")
+        self.stdout.write(self.style.SUCCESS("Ticket partitions are ready!"))
@@ -0,0 +1,54 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from airport.partitions import add_months, detach_partitions, month_start
+
+
+class Command(BaseCommand):
+    """Django command to detach the ticket partitions of past months"""
+
+    help = (
+        "Detach the monthly ticket partitions of flights departed more "
+        "than --keep-months ago. Their tickets leave the API; detached "
+        "partitions are kept as plain tables without foreign keys unless "
+        "--drop is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=24,
+            help="Number of past months to keep, the current one excluded",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["keep_months"] < 0:
+            raise CommandError("--keep-months can't be negative")
+
+        before = add_months(
+            month_start(timezone.now()), -options["keep_months"]
+        )
+        try:
+            detached = detach_partitions(
+                connections[options["database"]],
+                before,
+                drop=options["drop"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        for name in detached:
+            self.stdout.write(
+                f"{name} {'dropped' if options['drop'] else 'detached'}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(detached)} ticket partitions detached!")
+        )
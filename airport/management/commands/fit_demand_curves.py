@@ -0,0 +1,61 @@
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from airport.checks import is_shared_cache
+from airport.forecasting import CURVE_DAYS, cache_booking_curves
+
+
+class Command(BaseCommand):
+    """Django command to fit and cache the route booking curves"""
+
+    help = (
+        "Fit the booking curves of the routes on the tickets of every "
+        "departed flight and cache them for the forecast endpoints. Run "
+        "it daily, e.g. from cron; the cache must be shared with the "
+        "workers (REDIS_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=10,
+            help="Number of the busiest routes printed",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not is_shared_cache(caches[DEFAULT_CACHE_ALIAS]):
+            raise CommandError(
+                "The default cache is local to this process, the workers "
+                "would never see the curves. Set REDIS_URL to a cache "
+                "shared with them."
+            )
+
+        started = time.perf_counter()
+        curves = cache_booking_curves(using=options["database"])
+        elapsed = time.perf_counter() - started
+
+        summaries = curves.summaries()
+        self.stdout.write(
+            "route      flights  load   "
+            + " ".join(f"{days:>5}" for days in CURVE_DAYS)
+        )
+        for summary in summaries[: options["show"]]:
+            self.stdout.write(
+                f"{summary['route']:<10} {summary['flights']:>7}  "
+                f"{summary['load_factor']:.2f}   "
+                + " ".join(
+                    f"{share:>5.2f}" for share in summary["curve"].values()
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Booking curves of {len(summaries)} routes fitted "
+                f"in {elapsed:.2f}s!"
+            )
+        )
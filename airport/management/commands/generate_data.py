@@ -0,0 +1,79 @@
+import time
+from datetime import datetime
+
+from django.core.management import BaseCommand, CommandError
+
+from airport.search import invalidate_derived_indexes
+from airport.synthetic import DEFAULT_PASSWORD, SyntheticData
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with a synthetic dataset"""
+
+    help = (
+        "Generate airports, routes, airplanes, crews, flights, users, "
+        "orders and tickets. Rows are streamed in chunks, through COPY on "
+        "PostgreSQL, and the same seed always gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--airports", type=int, default=500)
+        parser.add_argument("--airlines", type=int, default=50)
+        parser.add_argument("--airplanes", type=int, default=300)
+        parser.add_argument("--crews", type=int, default=5_000)
+        parser.add_argument("--routes", type=int, default=5_000)
+        parser.add_argument("--flights", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--tickets", type=int, default=10_000_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--start",
+            type=datetime.fromisoformat,
+            default=datetime(2024, 1, 1),
+            help="Earliest departure time, ISO formatted",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=730,
+            help="Number of days flights departures are spread over",
+        )
+        parser.add_argument("--chunk-size", type=int, default=50_000)
+        parser.add_argument(
+            "--password",
+            default=DEFAULT_PASSWORD,
+            help="Password of the generated users",
+        )
+
+    def handle(self, *args, **options):
+        generator = SyntheticData(
+            airports=options["airports"],
+            airlines=options["airlines"],
+            airplanes=options["airplanes"],
+            crews=options["crews"],
+            routes=options["routes"],
+            flights=options["flights"],
+            users=options["users"],
+            tickets=options["tickets"],
+            seed=options["seed"],
+            start=options["start"],
+            days=options["days"],
+            chunk_size=options["chunk_size"],
+            password=options["password"],
+        )
+
+        started = time.perf_counter()
+        try:
+            counts = generator.generate(log=self.stdout.write)
+        except ValueError as error:
+            raise CommandError(error)
+
+        invalidate_derived_indexes()
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} rows")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Data generated in {time.perf_counter() - started:.1f}s!"
+            )
+        )
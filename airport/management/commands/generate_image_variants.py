@@ -0,0 +1,35 @@
+from django.core.management import BaseCommand
+
+from airport.images import generate_image_variants
+from airport.models import Airline
+
+
+class Command(BaseCommand):
+    """Django command to generate the resized variants of airline images"""
+
+    help = (
+        "Generate the resized variants of the airline images uploaded "
+        "before they were introduced, or outside of the API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate the variants of every airline image",
+        )
+
+    def handle(self, *args, **options):
+        airlines = Airline.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            airlines = airlines.filter(image_variants={})
+
+        for airline in airlines.only("id", "image"):
+            try:
+                generate_image_variants(airline.id, airline.image.name)
+            except OSError as error:
+                self.stderr.write(f"{airline.image.name}: {error}")
+                continue
+            self.stdout.write(f"{airline.image.name}: variants generated")
+
+        self.stdout.write(self.style.SUCCESS("Image variants generated!"))
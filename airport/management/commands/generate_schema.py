@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from airport.schema import generate_schema_artifact, get_code_version
+
+
+class Command(BaseCommand):
+    """Django command to pregenerate the OpenAPI schema served by the API"""
+
+    help = "Generate the OpenAPI schema artifact of the current code version"
+
+    def handle(self, *args, **options):
+        version = get_code_version()
+        self.stdout.write(f"Generating schema for code version {version}...")
+
+        for path in generate_schema_artifact(version):
+            self.stdout.write(f"Written {path}")
+
+        self.stdout.write(self.style.SUCCESS("Schema generated!"))
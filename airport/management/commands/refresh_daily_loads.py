@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from airport.analytics import (
+    REFRESH_BATCH_DAYS,
+    pending_refresh_range,
+    refresh_daily_loads,
+)
+
+
+class Command(BaseCommand):
+    """Django command to refresh the daily load factor rollups"""
+
+    help = (
+        "Recompute the daily seats offered and sold per route, airline "
+        "and airplane type. Without --from and --to only the departure "
+        "dates which may have changed are refreshed; run it regularly, "
+        "e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="start",
+            type=date.fromisoformat,
+            help="First departure date to refresh, e.g. 2024-01-01",
+        )
+        parser.add_argument(
+            "--to",
+            dest="end",
+            type=date.fromisoformat,
+            help="Last departure date to refresh",
+        )
+        parser.add_argument(
+            "--batch-days",
+            type=int,
+            default=REFRESH_BATCH_DAYS,
+            help="Departure dates recomputed per statement",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if start is None or end is None:
+            pending = pending_refresh_range(using=options["database"])
+            if pending is None:
+                self.stdout.write("No flights to refresh")
+                return
+            start, end = start or pending[0], end or pending[1]
+
+        try:
+            written = refresh_daily_loads(
+                start,
+                end,
+                batch_days=options["batch_days"],
+                using=options["database"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{written} daily loads refreshed from {start} to {end}!"
+            )
+        )
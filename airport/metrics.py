@@ -0,0 +1,116 @@
+import os
+
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+)
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    "airport_request_duration_seconds",
+    "Time spent serving a request, by view and viewset action",
+    ["view", "action"],
+)
+REQUESTS = Counter(
+    "airport_requests_total",
+    "Served requests, by view, viewset action and status code",
+    ["view", "action", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "airport_request_db_queries",
+    "Database queries run per request, by view and viewset action",
+    ["view", "action"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf")),
+)
+THROTTLED_REQUESTS = Counter(
+    "airport_throttled_requests_total",
+    "Requests rejected by throttling, by view",
+    ["view"],
+)
+BOOKINGS = Counter("airport_bookings_total", "Orders created")
+BOOKED_TICKETS = Counter("airport_booked_tickets_total", "Tickets booked")
+SEAT_CONFLICTS = Counter(
+    "airport_seat_conflicts_total",
+    "Tickets rejected because the seat was already booked",
+)
+CACHE_REQUESTS = Counter(
+    "airport_cache_requests_total",
+    "Cache lookups, by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+UNRESOLVED_VIEW = "unresolved"
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries it runs"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def get_view_labels(request):
+    """
+    Return the URL name and the viewset action of the resolved view,
+    or the request method for views without actions.
+    """
+    match = request.resolver_match
+    if match is None:
+        return UNRESOLVED_VIEW, request.method.lower()
+
+    actions = getattr(match.func, "actions", None) or {}
+    return (
+        match.view_name,
+        actions.get(request.method.lower(), request.method.lower()),
+    )
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def get_registry():
+    """
+    Return a registry aggregating the metrics of every worker process
+    when `PROMETHEUS_MULTIPROC_DIR` is set, the process registry else.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Expose the metrics in the Prometheus text format, to the holders of
+    `METRICS_TOKEN`, or to anyone under `DEBUG` when it is unset.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseNotFound()
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
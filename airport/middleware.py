@@ -0,0 +1,203 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+
+from airport import metrics, profiling
+from airport.compression import accepts_encoding, gzip_content, is_compressible
+from airport.db_router import read_from_replicas, replica_reads
+from airport.slow_queries import SlowQueryRecorder
+from airport.timing import RequestTimings, get_timings, log_timings
+
+
+class CompressionMiddleware:
+    """
+    Gzip responses of at least `COMPRESSION_MIN_SIZE` bytes for clients
+    that accept it.
+
+    Responses carrying a `precompressed` mapping of encoding to body
+    (see `airport.schema.PrecomputedSchemaView`) are sent as is.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not accepts_encoding(request, "gzip"):
+            return response
+
+        precompressed = getattr(response, "precompressed", {})
+        compressed_content = precompressed.get("gzip") or gzip_content(
+            response.content
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(compressed_content))
+
+        # a strong ETag no longer matches the encoded body, see RFC 9110
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "gzip"
+
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Report the query count, DB, serializer, render and total time of
+    a `SERVER_TIMING_SAMPLE_RATE` fraction of requests, in a
+    `Server-Timing` header and a JSON log line of `airport.timing`.
+
+    Requests that aren't sampled pass through untouched.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        if not sample_rate or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        timings = request.server_timing = RequestTimings()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        timings.add("total", time.perf_counter() - started)
+
+        response.headers["Server-Timing"] = timings.as_header()
+        log_timings(request, response, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        timings = get_timings(request)
+        if timings is not None:
+            started = time.perf_counter()
+
+            def render_finished(response):
+                timings.add("render", time.perf_counter() - started)
+
+            response.add_post_render_callback(render_finished)
+
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status and database query count of every request,
+    labelled with its view and viewset action (see `airport.metrics`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_counter = metrics.QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view, action = metrics.get_view_labels(request)
+        metrics.REQUEST_LATENCY.labels(view, action).observe(duration)
+        metrics.REQUEST_QUERIES.labels(view, action).observe(
+            query_counter.count
+        )
+        metrics.REQUESTS.labels(view, action, response.status_code).inc()
+        if response.status_code == 429:
+            metrics.THROTTLED_REQUESTS.labels(view).inc()
+
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Capture queries slower than `SLOW_QUERY_THRESHOLD_MS` with their
+    view, action and `EXPLAIN` plan, see `airport.slow_queries`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SLOW_QUERY_THRESHOLD_MS:
+            return self.get_response(request)
+
+        recorder = SlowQueryRecorder(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile a request of a staff user with `cProfile` when it has a true
+    `X-Profile` header or `profile` query parameter, e.g. `1` or `true`.
+
+    The stats are stored for download (see `airport.profiling`) and the
+    response tells where in `X-Profile-Id` and `X-Profile-Url` headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (
+            profiling.is_profiling_requested(request)
+            and profiling.is_staff_request(request)
+        ):
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        response, stats = profiling.profile_request(
+            self.get_response, request
+        )
+        profile_id = profiling.store_profile(
+            request, response, stats, time.perf_counter() - started
+        )
+
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["X-Profile-Url"] = request.build_absolute_uri(
+            reverse("airport:profile-detail", args=[profile_id])
+        )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let the reads of safe-method viewset actions go to the replicas,
+    see `airport.db_router`. Other requests only use the primary, as
+    well as the database queries run before the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with read_from_replicas(False):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in SAFE_METHODS and getattr(
+            view_func, "actions", None
+        ):
+            replica_reads.set(True)
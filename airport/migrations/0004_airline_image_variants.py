@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0003_crew_alter_flight_airline_flight_crew"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airline",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
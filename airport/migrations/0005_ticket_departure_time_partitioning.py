@@ -0,0 +1,64 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from airport import partitions
+
+
+def copy_departure_times(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    Ticket = apps.get_model("airport", "Ticket")
+    Ticket.objects.using(schema_editor.connection.alias).update(
+        departure_time=Subquery(
+            Flight.objects.filter(pk=OuterRef("flight_id")).values(
+                "departure_time"
+            )
+        )
+    )
+
+
+def partition_tickets(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        partitions.rebuild_ticket_table(schema_editor, partitioned=True)
+
+
+def unpartition_tickets(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        partitions.rebuild_ticket_table(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0004_airline_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="departure_time",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            copy_departure_times, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="ticket",
+            name="departure_time",
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.RemoveConstraint(
+            model_name="ticket",
+            name="validate_unique",
+        ),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("flight", "row", "seat", "departure_time"),
+                name="validate_unique",
+            ),
+        ),
+        migrations.AlterModelOptions(
+            name="ticket",
+            options={"ordering": ["departure_time", "row", "seat"]},
+        ),
+        migrations.RunPython(partition_tickets, unpartition_tickets),
+    ]
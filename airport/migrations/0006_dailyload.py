@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-19 09:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0005_ticket_departure_time_partitioning"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyLoad",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("flights", models.PositiveIntegerField()),
+                ("seats", models.PositiveIntegerField()),
+                ("seats_sold", models.PositiveIntegerField()),
+                (
+                    "airline",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.airline",
+                    ),
+                ),
+                (
+                    "airplane_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.airplanetype",
+                    ),
+                ),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="airport.route",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyload",
+            constraint=models.UniqueConstraint(
+                fields=("date", "route", "airline", "airplane_type"),
+                name="unique_daily_load",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+from airport.search import AIRLINE_VECTOR, AIRPORT_VECTOR
+
+# word indexes of the flight search, only PostgreSQL has full-text search
+SEARCH_INDEXES = {
+    "Airport": GinIndex(AIRPORT_VECTOR, name="airport_search_idx"),
+    "Airline": GinIndex(AIRLINE_VECTOR, name="airline_search_idx"),
+}
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in SEARCH_INDEXES.items():
+            schema_editor.add_index(
+                apps.get_model("airport", model_name), index
+            )
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for model_name, index in SEARCH_INDEXES.items():
+            schema_editor.remove_index(
+                apps.get_model("airport", model_name), index
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0006_dailyload"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_indexes, remove_search_indexes),
+    ]
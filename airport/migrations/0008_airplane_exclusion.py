@@ -0,0 +1,80 @@
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+from airport.conflicts import AIRPLANE_EXCLUSION
+
+# only PostgreSQL has exclusion constraints, the extension being skipped
+# on the other databases
+
+# double booked flights listed when the constraint can't be added
+MAX_LISTED_FLIGHTS = 20
+
+
+def check_airplane_double_bookings(Flight, using):
+    """
+    Raise a ValueError listing the flights whose airplane is booked by
+    another overlapping flight, which the constraint would reject
+    """
+    overlapping = (
+        Flight.objects.using(using)
+        .filter(
+            airplane_id=OuterRef("airplane_id"),
+            departure_time__lt=OuterRef("arrival_time"),
+            arrival_time__gt=OuterRef("departure_time"),
+        )
+        .exclude(pk=OuterRef("pk"))
+    )
+    flights = list(
+        Flight.objects.using(using)
+        .filter(Exists(overlapping))
+        .order_by("airplane_id", "departure_time")
+        .values_list("id", "airplane_id", "departure_time", "arrival_time")[
+            : MAX_LISTED_FLIGHTS + 1
+        ]
+    )
+    if not flights:
+        return
+
+    lines = [
+        f"  flight {flight_id}: airplane {airplane_id} from "
+        f"{departure:%Y-%m-%d %H:%M} to {arrival:%Y-%m-%d %H:%M}"
+        for flight_id, airplane_id, departure, arrival in flights[
+            :MAX_LISTED_FLIGHTS
+        ]
+    ]
+    if len(flights) > MAX_LISTED_FLIGHTS:
+        lines.append("  ...")
+    raise ValueError(
+        "Flights double book their airplane, reschedule or delete them "
+        "before migrating:\n" + "\n".join(lines)
+    )
+
+
+def add_airplane_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        Flight = apps.get_model("airport", "Flight")
+        check_airplane_double_bookings(
+            Flight, schema_editor.connection.alias
+        )
+        schema_editor.add_constraint(Flight, AIRPLANE_EXCLUSION)
+
+
+def remove_airplane_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_constraint(
+            apps.get_model("airport", "Flight"), AIRPLANE_EXCLUSION
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0007_search_indexes"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(
+            add_airplane_exclusion, remove_airplane_exclusion
+        ),
+    ]
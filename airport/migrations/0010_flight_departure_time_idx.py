@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("airport", "0009_airport_location"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time"], name="flight_departure_time_idx"
+            ),
+        ),
+    ]
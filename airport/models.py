@@ -3,14 +3,34 @@ import uuid
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
 from django.utils.text import slugify
 
+from airport.geo import route_distance
+
 
 class Airport(models.Model):
     name = models.CharField(max_length=255, unique=True)
     code = models.CharField(max_length=255, unique=True)
     closest_big_city = models.CharField(max_length=255)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+
+    @property
+    def has_location(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
 
     def __str__(self):
         return f"{self.name}, {self.closest_big_city} ({self.code})"
@@ -26,6 +46,8 @@ def airline_image_file_path(instance, filename):
 class Airline(models.Model):
     name = models.CharField(max_length=255, unique=True)
     image = models.ImageField(null=True, upload_to=airline_image_file_path)
+    # resized copies of the image by variant name, see airport.images
+    image_variants = models.JSONField(default=dict, editable=False)
 
     def __str__(self):
         return f"{self.name}"
@@ -71,8 +93,19 @@ class Route(models.Model):
     destination = models.ForeignKey(
         Airport, on_delete=models.CASCADE, related_name="route_destinations"
     )
+    # great-circle kilometers, computed once both airports have a location
     distance = models.IntegerField()
 
+    def save(self, *args, **kwargs):
+        if self.source.has_location and self.destination.has_location:
+            self.distance = route_distance(
+                self.source.latitude,
+                self.source.longitude,
+                self.destination.latitude,
+                self.destination.longitude,
+            )
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return (
             f"{self.source.code}"
@@ -94,8 +127,22 @@ class Flight(models.Model):
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
 
+    @property
+    def departure_tickets(self):
+        """Tickets of the flight, read from its departure partition only"""
+        if "tickets" in getattr(self, "_prefetched_objects_cache", {}):
+            # see prefetch_departure_tickets
+            return self.tickets.all()
+        return self.tickets.filter(departure_time=self.departure_time)
+
     class Meta:
         ordering = ["departure_time"]
+        indexes = [
+            # the default ordering, e.g. of the admin flight pages
+            models.Index(
+                fields=["departure_time"], name="flight_departure_time_idx"
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -118,6 +165,47 @@ class Order(models.Model):
         return f"{str(self.created_at.strftime('%Y-%m-%d %H:%M'))}"
 
 
+class TicketQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        set_departure_times(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+def set_departure_times(tickets):
+    """Copy the departure time of their flights to tickets lacking it"""
+    flight_ids = {
+        ticket.flight_id
+        for ticket in tickets
+        if ticket.departure_time is None
+    }
+    departure_times = dict(
+        Flight.objects.filter(pk__in=flight_ids).values_list(
+            "pk", "departure_time"
+        )
+    )
+    for ticket in tickets:
+        if ticket.departure_time is None:
+            ticket.departure_time = departure_times.get(ticket.flight_id)
+
+
+def prefetch_departure_tickets(flights):
+    """
+    Prefetch the tickets of flights with one query, reading their
+    departure partitions only
+    """
+    departure_times = {flight.departure_time for flight in flights}
+    prefetch_related_objects(
+        flights,
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.filter(
+                departure_time__in=departure_times
+            ),
+        ),
+    )
+
+
 class Ticket(models.Model):
     flight = models.ForeignKey(
         Flight,
@@ -131,6 +219,10 @@ class Ticket(models.Model):
     )
     row = models.IntegerField()
     seat = models.IntegerField()
+    # copy of the flight departure time, the partition key on PostgreSQL
+    departure_time = models.DateTimeField(editable=False)
+
+    objects = TicketQuerySet.as_manager()
 
     @staticmethod
     def validate_ticket(row, seat, airplane, error_to_raise):
@@ -150,6 +242,7 @@ class Ticket(models.Model):
                 )
 
     def clean(self):
+        self.departure_time = self.flight.departure_time
         Ticket.validate_ticket(
             self.row,
             self.seat,
@@ -163,9 +256,64 @@ class Ticket(models.Model):
 
     class Meta:
         constraints = [
+            # partitioned tables only enforce unique constraints including
+            # the partition key, which a flight has a single value of
             models.UniqueConstraint(
-                fields=["flight", "row", "seat"],
+                fields=["flight", "row", "seat", "departure_time"],
                 name="validate_unique"
             )
         ]
-        ordering = ["flight__departure_time", "row", "seat"]
+        ordering = ["departure_time", "row", "seat"]
+
+
+class DailyLoad(models.Model):
+    """
+    Seats offered and sold by the flights departing on a date, per route,
+    airline and airplane type, refreshed by `airport.analytics`
+    """
+
+    date = models.DateField()
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="+"
+    )
+    airline = models.ForeignKey(
+        Airline, on_delete=models.CASCADE, related_name="+"
+    )
+    airplane_type = models.ForeignKey(
+        AirplaneType, on_delete=models.CASCADE, related_name="+"
+    )
+    flights = models.PositiveIntegerField()
+    seats = models.PositiveIntegerField()
+    seats_sold = models.PositiveIntegerField()
+
+    @property
+    def load_factor(self) -> float:
+        return self.seats_sold / self.seats if self.seats else 0.0
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "route", "airline", "airplane_type"],
+                name="unique_daily_load",
+            )
+        ]
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.seats_sold}/{self.seats} seats sold"
+
+
+@receiver(pre_save, sender=Ticket)
+def set_ticket_departure_time(sender, instance, **kwargs):
+    instance.departure_time = instance.flight.departure_time
+
+
+@receiver(post_save, sender=Flight)
+def move_flight_tickets(sender, instance, created, raw, **kwargs):
+    """Keep the tickets of a rescheduled flight in the right partition"""
+    if created or raw:
+        return
+
+    instance.tickets.exclude(departure_time=instance.departure_time).update(
+        departure_time=instance.departure_time
+    )
@@ -0,0 +1,25 @@
+"""
+OpenAPI annotations of the API views, recorded by `drf_spectacular`
+where it is installed to serve the API documentation. Elsewhere they
+are no-ops, so that API workers don't import it.
+"""
+from django.apps import apps
+
+if apps.is_installed("drf_spectacular"):
+    from drf_spectacular.utils import OpenApiParameter, extend_schema
+else:
+
+    class OpenApiParameter:
+        QUERY = "query"
+        PATH = "path"
+        HEADER = "header"
+        COOKIE = "cookie"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    def extend_schema(*args, **kwargs):
+        def decorator(view):
+            return view
+
+        return decorator
@@ -0,0 +1,36 @@
+import codecs
+import json
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from airport.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson.
+
+    Bodies in another encoding than UTF-8, or parsed with `STRICT_JSON`
+    disabled, are handled by the standard library decoder.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read()
+            if self.strict and codecs.lookup(encoding).name == "utf-8":
+                return orjson.loads(body)
+
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(
+                body.decode(encoding), parse_constant=parse_constant
+            )
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
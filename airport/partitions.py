@@ -0,0 +1,272 @@
+import re
+from datetime import datetime
+
+from django.db import transaction
+
+TICKET_TABLE = "airport_ticket"
+PARTITION_KEY = "departure_time"
+DEFAULT_PARTITION = f"{TICKET_TABLE}_default"
+MONTH_PARTITION = re.compile(rf"^{TICKET_TABLE}_p(\d{{4}})_(\d{{2}})$")
+# tables referenced by the ticket foreign keys
+REFERENCES = {"flight_id": "airport_flight", "order_id": "airport_order"}
+# monthly partitions kept ready ahead of the current month
+MONTHS_AHEAD = 12
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    year, month_index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return datetime(year, month_index + 1, 1)
+
+
+def months_between(start, end):
+    """Return the first days of the months from `start` to `end`"""
+    months = []
+    month = month_start(start)
+    while month <= end:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def partition_name(month):
+    return f"{TICKET_TABLE}_p{month:%Y_%m}"
+
+
+def partition_bounds(month):
+    """
+    Bounds clause of a month partition. DDL takes no bind parameters,
+    so the bounds are literals, built from dates only.
+    """
+    return (
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') "
+        f"TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+
+
+def check_partitioned(connection):
+    if connection.vendor != "postgresql":
+        raise ValueError("Tickets are only partitioned on PostgreSQL")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [TICKET_TABLE],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] != "p":
+        raise ValueError(
+            f"{TICKET_TABLE} isn't partitioned, apply the migrations"
+        )
+
+
+def get_month_partitions(connection):
+    """Return the names of the monthly ticket partitions by month"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [TICKET_TABLE],
+        )
+        names = [name for name, in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = MONTH_PARTITION.match(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1)] = name
+    return dict(sorted(partitions.items()))
+
+
+def create_partitions(connection, months):
+    """
+    Create the missing partitions of the given months, moving their
+    tickets out of the default partition. Return the created names.
+    """
+    check_partitioned(connection)
+    existing = get_month_partitions(connection)
+    quote_name = connection.ops.quote_name
+    table = quote_name(TICKET_TABLE)
+    key = quote_name(PARTITION_KEY)
+    created = []
+
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            for month in months:
+                if month in existing:
+                    continue
+
+                name = quote_name(partition_name(month))
+                bounds = [month, add_months(month, 1)]
+                cursor.execute(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+                cursor.execute(
+                    f"WITH moved AS ("
+                    f"DELETE FROM {quote_name(DEFAULT_PARTITION)} "
+                    f"WHERE {key} >= %s AND {key} < %s RETURNING *"
+                    f") INSERT INTO {name} SELECT * FROM moved",
+                    bounds,
+                )
+                cursor.execute(
+                    f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                    f"{partition_bounds(month)}"
+                )
+                created.append(partition_name(month))
+
+    return created
+
+
+def drop_foreign_keys(cursor, quote_name, table):
+    cursor.execute(
+        "SELECT conname FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    for name, in cursor.fetchall():
+        cursor.execute(
+            f"ALTER TABLE {quote_name(table)} "
+            f"DROP CONSTRAINT {quote_name(name)}"
+        )
+
+
+def detach_partitions(connection, before, drop=False):
+    """
+    Detach the partitions of the months ending by `before`, dropping
+    them with `drop`, and return their names. Detached partitions are
+    plain tables, kept for archiving. Their foreign keys are dropped so
+    they don't block deleting the orders and flights they reference.
+    """
+    check_partitioned(connection)
+    quote_name = connection.ops.quote_name
+    detached = []
+
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            for month, name in get_month_partitions(connection).items():
+                if add_months(month, 1) > before:
+                    break
+
+                cursor.execute(
+                    f"ALTER TABLE {quote_name(TICKET_TABLE)} "
+                    f"DETACH PARTITION {quote_name(name)}"
+                )
+                if drop:
+                    cursor.execute(f"DROP TABLE {quote_name(name)}")
+                else:
+                    drop_foreign_keys(cursor, quote_name, name)
+                detached.append(name)
+
+    return detached
+
+
+def rebuild_ticket_table(schema_editor, partitioned, now=None):
+    """
+    Replace the ticket table by a copy, range partitioned by departure
+    month or not, from the first departure month to `MONTHS_AHEAD`
+    months ahead and a default partition for the other tickets.
+
+    Primary and unique keys of a partitioned table must include the
+    partition key, so the primary key is `(id, departure_time)` there.
+    """
+    quote_name = schema_editor.quote_name
+    execute = schema_editor.execute
+    new_table = f"{TICKET_TABLE}_new"
+    sequence = f"{new_table}_id_seq"
+    table, new, key = map(quote_name, (TICKET_TABLE, new_table, PARTITION_KEY))
+
+    execute(f"CREATE SEQUENCE {quote_name(sequence)} AS bigint")
+    execute(
+        f"CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS)"
+        + (f" PARTITION BY RANGE ({key})" if partitioned else "")
+    )
+    execute(
+        f"ALTER TABLE {new} ALTER COLUMN {quote_name('id')} "
+        f"SET DEFAULT nextval('{quote_name(sequence)}')"
+    )
+    execute(
+        f"ALTER SEQUENCE {quote_name(sequence)} "
+        f"OWNED BY {new}.{quote_name('id')}"
+    )
+    primary_key = ["id", PARTITION_KEY] if partitioned else ["id"]
+    execute(
+        f"ALTER TABLE {new} ADD CONSTRAINT {quote_name(f'{new_table}_pkey')} "
+        f"PRIMARY KEY ({', '.join(map(quote_name, primary_key))})"
+    )
+    unique = ["flight_id", "row", "seat", PARTITION_KEY]
+    execute(
+        f"ALTER TABLE {new} "
+        f"ADD CONSTRAINT {quote_name(f'{new_table}_validate_unique')} "
+        f"UNIQUE ({', '.join(map(quote_name, unique))})"
+    )
+    # flight_id lookups use the unique constraint index
+    execute(
+        f"CREATE INDEX {quote_name(f'{new_table}_order_id')} "
+        f"ON {new} ({quote_name('order_id')})"
+    )
+
+    if partitioned:
+        execute(
+            f"CREATE TABLE {quote_name(DEFAULT_PARTITION)} "
+            f"PARTITION OF {new} DEFAULT"
+        )
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"SELECT min({key}), max({key}) FROM {table}")
+            first, last = cursor.fetchone()
+
+        now = now or datetime.now()
+        last_month = add_months(month_start(now), MONTHS_AHEAD)
+        if last is not None:
+            last_month = max(last_month, month_start(last))
+        for month in months_between(first or now, last_month):
+            execute(
+                f"CREATE TABLE {quote_name(partition_name(month))} "
+                f"PARTITION OF {new} {partition_bounds(month)}"
+            )
+
+    execute(f"INSERT INTO {new} SELECT * FROM {table}")
+    # added after the copy, so the copied rows leave no deferred trigger
+    # events that would block the later ALTER TABLE of the migration
+    for column, referenced in REFERENCES.items():
+        execute(
+            f"ALTER TABLE {new} "
+            f"ADD CONSTRAINT {quote_name(f'{new_table}_{column}_fk')} "
+            f"FOREIGN KEY ({quote_name(column)}) "
+            f"REFERENCES {quote_name(referenced)} ({quote_name('id')}) "
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+    execute(
+        f"SELECT setval('{quote_name(sequence)}', "
+        f"COALESCE(max({quote_name('id')}), 0) + 1, false) FROM {table}"
+    )
+    execute(f"DROP TABLE {table}")
+    execute(f"ALTER TABLE {new} RENAME TO {table}")
+    execute(
+        f"ALTER SEQUENCE {quote_name(sequence)} "
+        f"RENAME TO {quote_name(f'{TICKET_TABLE}_id_seq')}"
+    )
+    renamed = {
+        f"{new_table}_pkey": f"{TICKET_TABLE}_pkey",
+        f"{new_table}_validate_unique": "validate_unique",
+        **{
+            f"{new_table}_{column}_fk": f"{TICKET_TABLE}_{column}_fk"
+            for column in REFERENCES
+        },
+    }
+    for old_name, new_name in renamed.items():
+        execute(
+            f"ALTER TABLE {table} RENAME CONSTRAINT {quote_name(old_name)} "
+            f"TO {quote_name(new_name)}"
+        )
+    execute(
+        f"ALTER INDEX {quote_name(f'{new_table}_order_id')} "
+        f"RENAME TO {quote_name(f'{TICKET_TABLE}_order_id')}"
+    )
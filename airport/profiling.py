@@ -0,0 +1,100 @@
+import cProfile
+import io
+import marshal
+import pstats
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import APIException
+from rest_framework.fields import BooleanField
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+PROFILE_KEY = "profile:{}"
+
+
+def is_profiling_requested(request):
+    """True for a true value of the header or query parameter, e.g. 1"""
+    return any(
+        value in BooleanField.TRUE_VALUES
+        for value in (
+            request.headers.get(PROFILE_HEADER),
+            request.GET.get(PROFILE_PARAM),
+        )
+    )
+
+
+def is_staff_request(request):
+    """
+    Authenticate the request with the API authentication classes,
+    before the view does, to tell if it comes from a staff user.
+    """
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            user_auth = authentication_class().authenticate(drf_request)
+        except APIException:
+            return False
+        if user_auth is not None:
+            return bool(user_auth[0].is_staff)
+    return False
+
+
+def profile_request(get_response, request):
+    """Return the response and the `cProfile` stats of serving it"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profiler.disable()
+
+    profiler.create_stats()
+    return response, profiler.stats
+
+
+def store_profile(request, response, stats, duration):
+    """
+    Keep the stats for `REQUEST_PROFILE_TTL` seconds, return its id. They
+    are stored in the cache shared by the workers, so any of them serves
+    the download.
+    """
+    profile_id = uuid.uuid4().hex
+    match = request.resolver_match
+    cache.set(
+        PROFILE_KEY.format(profile_id),
+        {
+            "id": profile_id,
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "stats": zlib.compress(marshal.dumps(stats)),
+        },
+        settings.REQUEST_PROFILE_TTL,
+    )
+    return profile_id
+
+
+def load_profile(profile_id):
+    profile = cache.get(PROFILE_KEY.format(profile_id))
+    if profile is not None:
+        profile = {**profile, "stats": zlib.decompress(profile["stats"])}
+    return profile
+
+
+def format_stats(stats_data, sort="cumulative", limit=50):
+    """Render marshalled stats like `python -m pstats` does"""
+    stream = io.StringIO()
+    stats = pstats.Stats(stream=stream)
+    stats.stats = marshal.loads(stats_data)
+    stats.get_top_level_stats()
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
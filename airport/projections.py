@@ -0,0 +1,242 @@
+from operator import itemgetter
+
+from django.conf import settings
+from rest_framework import mixins
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from airport.models import Airline
+from airport.timing import measure
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class Column:
+    """
+    A list response field read from one or more `values_list()` lookups.
+
+    Values are passed to `to_representation` positionally; `None`
+    values are returned as is, like serializer fields do.
+    """
+
+    def __init__(self, *lookups, to_representation=None):
+        self.lookups = lookups
+        self.to_representation = to_representation
+        self.indices = ()
+
+    def get_mapper(self, context):
+        """Return a function building the field value from a row"""
+        to_representation = self.to_representation
+
+        if len(self.indices) == 1:
+            get_value = itemgetter(self.indices[0])
+            if to_representation is None:
+                return get_value
+
+            def mapper(row):
+                value = get_value(row)
+                return None if value is None else to_representation(value)
+
+            return mapper
+
+        get_values = itemgetter(*self.indices)
+
+        def mapper(row):
+            return to_representation(*get_values(row))
+
+        return mapper
+
+
+class ImageURLColumn(Column):
+    """
+    Mirror of `serializers.ImageField` for a stored file name, or of
+    `ImageVariantField` when given the variants lookup and name.
+    """
+
+    def __init__(
+        self, lookup, model_field, variants_lookup=None, variant=None
+    ):
+        super().__init__(*filter(None, (lookup, variants_lookup)))
+        self.model_field = model_field
+        self.variant = variant
+
+    def get_mapper(self, context):
+        get_name = itemgetter(self.indices[0])
+        get_variants = (
+            itemgetter(self.indices[1]) if len(self.indices) > 1 else None
+        )
+        variant = self.variant
+        storage = self.model_field.storage
+        request = context.get("request")
+        use_url = api_settings.UPLOADED_FILES_USE_URL
+        urls = {}
+
+        def mapper(row):
+            name = get_name(row)
+            if not name:
+                return None
+            if get_variants is not None:
+                name = (get_variants(row) or {}).get(variant, name)
+            if not use_url:
+                return name
+
+            if name not in urls:
+                url = storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[name] = url
+
+            return urls[name]
+
+        return mapper
+
+
+class Projection:
+    """Builds list representations straight from `values_list()` rows"""
+
+    def __init__(self, **columns):
+        self.columns = columns
+        self.lookups = []
+
+        for column in columns.values():
+            indices = []
+            for lookup in column.lookups:
+                if lookup not in self.lookups:
+                    self.lookups.append(lookup)
+                indices.append(self.lookups.index(lookup))
+            column.indices = tuple(indices)
+
+    def values_list(self, queryset):
+        return queryset.prefetch_related(None).values_list(*self.lookups)
+
+    def project(self, rows, context):
+        mappers = [
+            (name, column.get_mapper(context))
+            for name, column in self.columns.items()
+        ]
+        return [
+            {name: mapper(row) for name, mapper in mappers} for row in rows
+        ]
+
+
+class ProjectedListModelMixin(mixins.ListModelMixin):
+    """
+    List a queryset through `list_projection` instead of the serializer
+    when `PROJECTED_LIST_RESPONSES` is enabled.
+    """
+
+    list_projection = None
+
+    def list(self, request, *args, **kwargs):
+        projection = self.list_projection
+        if projection is None or not settings.PROJECTED_LIST_RESPONSES:
+            return super().list(request, *args, **kwargs)
+
+        queryset = projection.values_list(
+            self.filter_queryset(self.get_queryset())
+        )
+        context = self.get_serializer_context()
+
+        page = self.paginate_queryset(queryset)
+        with measure(request, "serializer"):
+            data = projection.project(
+                queryset if page is None else page, context
+            )
+
+        if page is not None:
+            return self.get_paginated_response(data)
+
+        return Response(data)
+
+
+def format_datetime(value):
+    return value.strftime(DATETIME_FORMAT)
+
+
+def format_airport(name, closest_big_city, code):
+    """Same output as `Airport.__str__`"""
+    return f"{name}, {closest_big_city} ({code})"
+
+
+def airplane_capacity(rows, seats_in_row):
+    return rows * seats_in_row
+
+
+def airline_image_column(lookup, variant):
+    return ImageURLColumn(
+        lookup,
+        Airline._meta.get_field("image"),
+        variants_lookup=f"{lookup}_variants",
+        variant=variant,
+    )
+
+
+AIRPORT_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    name=Column("name"),
+    code=Column("code"),
+    closest_big_city=Column("closest_big_city"),
+    latitude=Column("latitude"),
+    longitude=Column("longitude"),
+)
+
+AIRLINE_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    name=Column("name"),
+    image=airline_image_column("image", "thumbnail"),
+)
+
+AIRPLANE_TYPE_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    name=Column("name"),
+)
+
+AIRPLANE_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    name=Column("name"),
+    airplane_type=Column("airplane_type_id"),
+    rows=Column("rows"),
+    seats_in_row=Column("seats_in_row"),
+    capacity=Column(
+        "rows", "seats_in_row", to_representation=airplane_capacity
+    ),
+)
+
+CREW_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    first_name=Column("first_name"),
+    last_name=Column("last_name"),
+)
+
+ROUTE_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    source=Column("source__name"),
+    destination=Column("destination__name"),
+)
+
+FLIGHT_LIST_PROJECTION = Projection(
+    id=Column("id"),
+    route_source=Column(
+        "route__source__name",
+        "route__source__closest_big_city",
+        "route__source__code",
+        to_representation=format_airport,
+    ),
+    route_destination=Column(
+        "route__destination__name",
+        "route__destination__closest_big_city",
+        "route__destination__code",
+        to_representation=format_airport,
+    ),
+    departure_time=Column(
+        "departure_time", to_representation=format_datetime
+    ),
+    arrival_time=Column("arrival_time", to_representation=format_datetime),
+    airplane_num_seats=Column(
+        "airplane__rows",
+        "airplane__seats_in_row",
+        to_representation=airplane_capacity,
+    ),
+    tickets_available=Column("tickets_available"),
+    airline_image=airline_image_column("airline__image", "thumbnail"),
+)
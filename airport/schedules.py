@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from airport.conflicts import check_bookings, flight_bookings
+from airport.models import Flight, Route
+
+# longest date range of a schedule, a season fits easily
+MAX_SCHEDULE_DAYS = 366
+BATCH_SIZE = 1_000
+
+
+def scheduled_departures(start, end, weekdays, departure_time):
+    """
+    Departure datetimes at `departure_time` on the ISO `weekdays`
+    (Monday is 1) from the `start` to the `end` date
+    """
+    weekdays = set(weekdays)
+    departures = []
+    day = start
+    while day <= end:
+        if day.isoweekday() in weekdays:
+            departures.append(datetime.combine(day, departure_time))
+        day += timedelta(days=1)
+    return departures
+
+
+def create_schedule(
+    route,
+    airplane,
+    airline,
+    crew,
+    weekdays,
+    departure_time,
+    duration,
+    start_date,
+    end_date,
+    using=DEFAULT_DB_ALIAS,
+):
+    """
+    Create the flights of a weekly schedule with their crew in a single
+    transaction, using bulk inserts. A flight of the route and airline
+    departing at a scheduled time is left as is, so creating the same
+    schedule again only completes its crew. Raise DoubleBookingError,
+    creating nothing, if the airplane or a crew member is booked by an
+    overlapping flight.
+
+    Return the numbers of created and existing flights, and of the
+    created crew links.
+    """
+    departures = scheduled_departures(
+        start_date, end_date, weekdays, departure_time
+    )
+
+    with transaction.atomic(using=using):
+        # serialize the schedules of a route, which could both create
+        # the same flights
+        Route.objects.using(using).select_for_update().get(pk=route.pk)
+
+        existing = {
+            departure: (flight_id, arrival)
+            for departure, flight_id, arrival in Flight.objects.using(using)
+            .filter(
+                route=route, airline=airline, departure_time__in=departures
+            )
+            .order_by("departure_time", "id")
+            .values_list("departure_time", "id", "arrival_time")
+        }
+        Through = Flight.crew.through
+        linked = set(
+            Through.objects.using(using)
+            .filter(flight_id__in=[pk for pk, _ in existing.values()])
+            .values_list("flight_id", "crew_id")
+        )
+        crew_ids = [member.id for member in crew]
+        check_bookings(
+            [
+                *(
+                    booking
+                    for departure in departures
+                    if departure not in existing
+                    for booking in flight_bookings(
+                        None,
+                        departure,
+                        departure + duration,
+                        airplane.id,
+                        crew_ids,
+                    )
+                ),
+                *(
+                    booking
+                    for departure, (flight_id, arrival) in existing.items()
+                    for booking in flight_bookings(
+                        flight_id,
+                        departure,
+                        arrival,
+                        crew_ids=[
+                            crew_id
+                            for crew_id in crew_ids
+                            if (flight_id, crew_id) not in linked
+                        ],
+                    )
+                ),
+            ],
+            using=using,
+        )
+
+        created = Flight.objects.using(using).bulk_create(
+            (
+                Flight(
+                    route=route,
+                    airline=airline,
+                    airplane=airplane,
+                    departure_time=departure,
+                    arrival_time=departure + duration,
+                )
+                for departure in departures
+                if departure not in existing
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        crew_links = Through.objects.using(using).bulk_create(
+            (
+                Through(flight_id=flight_id, crew_id=crew_id)
+                for flight_id in [
+                    *(pk for pk, _ in existing.values()),
+                    *(flight.id for flight in created),
+                ]
+                for crew_id in crew_ids
+                if (flight_id, crew_id) not in linked
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+    return {
+        "created": len(created),
+        "existing": len(existing),
+        "crew_links": len(crew_links),
+    }
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import (
+    SpectacularAPIView,
+    SpectacularRedocView,
+    SpectacularSwaggerView,
+)
+
+from airport.compression import gzip_content
+
+ARTIFACT_RENDERERS = {
+    OpenApiYamlRenderer.format: OpenApiYamlRenderer,
+    OpenApiJsonRenderer.format: OpenApiJsonRenderer,
+}
+
+SchemaArtifact = namedtuple("SchemaArtifact", ["content", "gzip", "etag"])
+
+
+@lru_cache(maxsize=None)
+def get_source_fingerprint():
+    """Hash of the project's python sources and the schema generator"""
+    digest = hashlib.md5(drf_spectacular.__version__.encode())
+    base_dir = str(settings.BASE_DIR)
+
+    for app_config in apps.get_app_configs():
+        if not app_config.path.startswith(base_dir):
+            continue
+
+        for source in sorted(Path(app_config.path).rglob("*.py")):
+            stat = source.stat()
+            digest.update(
+                f"{source}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+            )
+
+    return digest.hexdigest()[:12]
+
+
+def get_code_version():
+    """Return `CODE_VERSION` or a fingerprint of the source files"""
+    return settings.CODE_VERSION or get_source_fingerprint()
+
+
+def get_artifact_path(schema_format, version):
+    filename = f"openapi-{version}.{schema_format}"
+    return Path(settings.SCHEMA_ARTIFACT_DIR) / filename
+
+
+def write_atomic(path, content):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(content)
+    os.replace(tmp_path, path)
+
+
+def generate_schema_artifact(version=None):
+    """
+    Generate the schema in every served format, with its gzip form,
+    and remove artifacts of other code versions.
+    """
+    version = version or get_code_version()
+    artifact_dir = Path(settings.SCHEMA_ARTIFACT_DIR)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    generator = SpectacularAPIView.generator_class()
+    schema = generator.get_schema(
+        request=None, public=spectacular_settings.SERVE_PUBLIC
+    )
+
+    paths = []
+    for schema_format, renderer_class in ARTIFACT_RENDERERS.items():
+        content = renderer_class().render(
+            schema, renderer_class.media_type, {}
+        )
+        path = get_artifact_path(schema_format, version)
+        write_atomic(path, content)
+        write_atomic(path.with_name(path.name + ".gz"), gzip_content(content))
+        paths.append(path)
+
+    for path in artifact_dir.glob("openapi-*"):
+        if not path.name.startswith(f"openapi-{version}."):
+            path.unlink(missing_ok=True)
+
+    return paths
+
+
+@lru_cache(maxsize=None)
+def load_schema_artifact(schema_format, version):
+    """Read the stored schema, generating it first if it's missing"""
+    path = get_artifact_path(schema_format, version)
+    if not path.exists():
+        generate_schema_artifact(version)
+
+    content = path.read_bytes()
+    return SchemaArtifact(
+        content=content,
+        gzip=path.with_name(path.name + ".gz").read_bytes(),
+        etag=f'"{hashlib.md5(content).hexdigest()}"',
+    )
+
+
+def set_cache_headers(response, etag):
+    response["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE
+    )
+    return response
+
+
+class PrecomputedSchemaView(SpectacularAPIView):
+    """
+    Serve the schema artifact of the current code version instead of
+    introspecting the API on every request.
+
+    Requests for a specific `lang` or `version` are generated as usual.
+    """
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        artifact = load_schema_artifact(renderer.format, get_code_version())
+
+        response = get_conditional_response(request, etag=artifact.etag)
+        if response is None:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type += f"; charset={renderer.charset}"
+
+            response = HttpResponse(
+                artifact.content, content_type=content_type
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+            response.precompressed = {"gzip": artifact.gzip}
+
+        return set_cache_headers(response, artifact.etag)
+
+
+class CachedSchemaPageMixin:
+    """Add ETag and caching headers to a schema documentation page"""
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        etag = '"{}"'.format(
+            hashlib.md5(
+                f"{get_code_version()}:{request.get_full_path()}".encode()
+            ).hexdigest()
+        )
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        return set_cache_headers(response, etag)
+
+
+class CachedSwaggerView(CachedSchemaPageMixin, SpectacularSwaggerView):
+    pass
+
+
+class CachedRedocView(CachedSchemaPageMixin, SpectacularRedocView):
+    pass
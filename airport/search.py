@@ -0,0 +1,209 @@
+import re
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from airport.locations import invalidate_airport_locations
+from airport.models import Airline, Airport
+
+# free text terms of a search, further ones are ignored
+MAX_TERMS = 8
+# rank points of a term matching an airport code, or any other word
+CODE_WEIGHT = 4
+WORD_WEIGHT = 2
+SEARCH_CONFIG = "simple"
+# expressions of the PostgreSQL GIN indexes of the searched words
+AIRPORT_VECTOR = SearchVector(
+    "name", "code", "closest_big_city", config=SEARCH_CONFIG
+)
+AIRLINE_VECTOR = SearchVector("name", config=SEARCH_CONFIG)
+INDEX_VERSION_KEY = "search_index:version"
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return WORD.findall(text.lower())
+
+
+def term_weight(term, code):
+    return CODE_WEIGHT if code.lower() == term else WORD_WEIGHT
+
+
+class SearchIndex:
+    """
+    In-process inverted index of the airport and airline words, for the
+    databases without full-text search. Terms match word prefixes.
+    """
+
+    def __init__(self, airports, airlines):
+        postings = defaultdict(lambda: (defaultdict(int), defaultdict(int)))
+        for airport_id, name, code, city in airports:
+            for token in tokenize(f"{name} {city}"):
+                matches = postings[token][0]
+                matches[airport_id] = max(matches[airport_id], WORD_WEIGHT)
+            for token in tokenize(code):
+                postings[token][0][airport_id] = CODE_WEIGHT
+        for airline_id, name in airlines:
+            for token in tokenize(name):
+                postings[token][1][airline_id] = WORD_WEIGHT
+
+        self.postings = dict(postings)
+        self.tokens = sorted(self.postings)
+
+    @classmethod
+    def build(cls, using=None):
+        return cls(
+            Airport.objects.using(using).values_list(
+                "id", "name", "code", "closest_big_city"
+            ),
+            Airline.objects.using(using).values_list("id", "name"),
+        )
+
+    def lookup(self, term):
+        """Return the weights of the airports and airlines matching term"""
+        airports, airlines = {}, {}
+        position = bisect_left(self.tokens, term)
+        for token in self.tokens[position:]:
+            if not token.startswith(term):
+                break
+            token_airports, token_airlines = self.postings[token]
+            for airport_id, weight in token_airports.items():
+                # only a full code gets the code weight
+                weight = weight if token == term else WORD_WEIGHT
+                airports[airport_id] = max(airports.get(airport_id, 0), weight)
+            airlines.update(token_airlines)
+        return airports, airlines
+
+
+# version and index of this process
+_search_index = (None, None)
+
+
+def get_search_index(using=None):
+    """
+    Return the index of this process, rebuilt once any process changed
+    an airport or airline: their version is kept in the cache shared by
+    the worker processes
+    """
+    global _search_index
+
+    version = cache.get_or_set(INDEX_VERSION_KEY, new_version, None)
+    built_version, index = _search_index
+    if index is None or built_version != version:
+        index = SearchIndex.build(using)
+        _search_index = (version, index)
+    return index
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def invalidate_search_index():
+    cache.set(INDEX_VERSION_KEY, new_version(), None)
+
+
+def invalidate_derived_indexes():
+    """
+    Rebuild the flight search and airport location indexes of every
+    process, e.g. after bulk inserts, which don't send the signals
+    invalidating them
+    """
+    invalidate_search_index()
+    invalidate_airport_locations()
+
+
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+@receiver(post_save, sender=Airline)
+@receiver(post_delete, sender=Airline)
+def airport_or_airline_changed(sender, **kwargs):
+    invalidate_search_index()
+
+
+def search_postgres(term, using):
+    """Look the term up in the word indexes of PostgreSQL"""
+    query = SearchQuery(f"{term}:*", search_type="raw", config=SEARCH_CONFIG)
+    airports = {
+        airport_id: term_weight(term, code)
+        for airport_id, code in Airport.objects.using(using)
+        .annotate(search=AIRPORT_VECTOR)
+        .filter(search=query)
+        .values_list("id", "code")
+    }
+    airlines = dict.fromkeys(
+        Airline.objects.using(using)
+        .annotate(search=AIRLINE_VECTOR)
+        .filter(search=query)
+        .values_list("id", flat=True),
+        WORD_WEIGHT,
+    )
+    return airports, airlines
+
+
+def matching(airport_ids, airline_ids):
+    """Flights from or to the airports, or of the airlines"""
+    return (
+        Q(route__source__in=airport_ids)
+        | Q(route__destination__in=airport_ids)
+        | Q(airline__in=airline_ids)
+    )
+
+
+def term_rank(airports, airlines):
+    """Points of the flights matching a term, the best match counting"""
+
+    def weighing(weights, weight):
+        return [pk for pk, points in weights.items() if points == weight]
+
+    return Case(
+        *(
+            When(
+                matching(
+                    weighing(airports, weight), weighing(airlines, weight)
+                ),
+                then=Value(weight),
+            )
+            for weight in sorted(
+                {*airports.values(), *airlines.values()}, reverse=True
+            )
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def search_flights(queryset, text):
+    """
+    Filter the flights matching every term of the text by their source
+    or destination airport name, code or city, or their airline name,
+    annotating their `rank`. Returns None for a text without terms.
+    """
+    terms = list(dict.fromkeys(tokenize(text)))[:MAX_TERMS]
+    if not terms:
+        return None
+
+    using = queryset.db
+    if connections[using].vendor == "postgresql":
+        matches = [search_postgres(term, using) for term in terms]
+    else:
+        index = get_search_index(using)
+        matches = [index.lookup(term) for term in terms]
+
+    rank = Value(0)
+    for airports, airlines in matches:
+        if not airports and not airlines:
+            return queryset.annotate(rank=Value(0)).none()
+
+        queryset = queryset.filter(matching(list(airports), list(airlines)))
+        rank += term_rank(airports, airlines)
+
+    return queryset.annotate(rank=rank)
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -13,12 +15,60 @@ from airport.models import (
     Order,
     Ticket, AirplaneType,
 )
+from airport.conflicts import (
+    DoubleBookingError,
+    check_bookings,
+    flight_bookings,
+)
+from airport.locations import MAX_NEARBY_AIRPORTS, NEARBY_AIRPORTS_LIMIT
+from airport.metrics import SEAT_CONFLICTS
+from airport.schedules import MAX_SCHEDULE_DAYS
+
+SEAT_BOOKED_MESSAGE = "Seat with entered data has been already booked."
+# flight fields whose change can double book an airplane or crew member
+BOOKED_FIELDS = {"departure_time", "arrival_time", "airplane", "crew"}
+# flights of a batch request, enough for a cart or an itinerary
+MAX_BATCH_FLIGHTS = 100
 
 
 class AirportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airport
-        fields = ("id", "name", "code", "closest_big_city",)
+        fields = (
+            "id", "name", "code", "closest_big_city", "latitude", "longitude",
+        )
+
+    def validate(self, attrs):
+        if (attrs.get("latitude") is None) != (attrs.get("longitude") is None):
+            raise ValidationError(
+                "Enter both the latitude and longitude, or neither."
+            )
+        return attrs
+
+
+class NearbyAirportFilterSerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(
+        required=False,
+        min_value=0,
+        help_text="Kilometers around the point, anywhere by default",
+    )
+    limit = serializers.IntegerField(
+        default=NEARBY_AIRPORTS_LIMIT,
+        min_value=1,
+        max_value=MAX_NEARBY_AIRPORTS,
+    )
+
+
+class NearbyAirportSerializer(AirportSerializer):
+    distance = serializers.FloatField(
+        read_only=True, help_text="Great-circle kilometers to the point"
+    )
+
+    class Meta:
+        model = Airport
+        fields = AirportSerializer.Meta.fields + ("distance",)
 
 
 class AirlineSerializer(serializers.ModelSerializer):
@@ -27,12 +77,40 @@ class AirlineSerializer(serializers.ModelSerializer):
         fields = ("id", "name",)
 
 
+class ImageVariantField(serializers.ImageField):
+    """
+    URL of a resized variant of the airline image, or of the original
+    image while its variants are being generated.
+    """
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, airline):
+        image = airline.image
+        if not image:
+            return None
+
+        name = airline.image_variants.get(self.variant, image.name)
+        return super().to_representation(
+            type(image)(airline, image.field, name)
+        )
+
+
 class AirlineListSerializer(serializers.ModelSerializer):
+    image = ImageVariantField("thumbnail", source="*")
+
     class Meta:
         model = Airline
         fields = ("id", "name", "image",)
 
 
+class AirlineDetailSerializer(AirlineListSerializer):
+    image = ImageVariantField("medium", source="*")
+
+
 class AirlineImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Airline
@@ -68,6 +146,22 @@ class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance",)
+        # computed between airports with a location
+        extra_kwargs = {"distance": {"required": False}}
+
+    def validate(self, attrs):
+        located = (
+            attrs["source"].has_location
+            and attrs["destination"].has_location
+        )
+        if not located and attrs.get("distance") is None:
+            raise ValidationError(
+                {
+                    "distance": "Enter the distance of a route from or to "
+                    "an airport without a location."
+                }
+            )
+        return attrs
 
 
 class RouteListSerializer(RouteSerializer):
@@ -114,6 +208,61 @@ class FlightSerializer(serializers.ModelSerializer):
         model = Flight
         fields = "__all__"
 
+    def validate(self, attrs):
+        data = super(FlightSerializer, self).validate(attrs=attrs)
+        departure_time = attrs.get(
+            "departure_time", getattr(self.instance, "departure_time", None)
+        )
+        arrival_time = attrs.get(
+            "arrival_time", getattr(self.instance, "arrival_time", None)
+        )
+        if arrival_time <= departure_time:
+            raise ValidationError(
+                {"arrival_time": "arrival_time must be after departure_time."}
+            )
+        return data
+
+    def check_bookings(self, validated_data):
+        """Reject an airplane or crew member booked by another flight"""
+        if not BOOKED_FIELDS.intersection(validated_data):
+            return
+
+        flight = self.instance
+
+        def value(field):
+            if field in validated_data:
+                return validated_data[field]
+            return getattr(flight, field)
+
+        crew = (
+            validated_data["crew"]
+            if "crew" in validated_data
+            else flight.crew.all()
+        )
+        try:
+            check_bookings(
+                flight_bookings(
+                    flight and flight.pk,
+                    value("departure_time"),
+                    value("arrival_time"),
+                    value("airplane").pk,
+                    [member.pk for member in crew],
+                ),
+                exclude=[flight.pk] if flight else (),
+            )
+        except DoubleBookingError as error:
+            raise ValidationError(error.errors)
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.check_bookings(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.check_bookings(validated_data)
+            return super().update(instance, validated_data)
+
 
 class FlightListSerializer(FlightSerializer):
     route_source = serializers.CharField(
@@ -126,10 +275,7 @@ class FlightListSerializer(FlightSerializer):
         source="airplane.capacity",
     )
     tickets_available = serializers.IntegerField(read_only=True)
-    airline_image = serializers.ImageField(
-        source="airline.image",
-        read_only=True
-    )
+    airline_image = ImageVariantField("thumbnail", source="airline")
 
     class Meta:
         model = Flight
@@ -145,6 +291,78 @@ class FlightListSerializer(FlightSerializer):
         )
 
 
+class BookedSeatValidator(UniqueTogetherValidator):
+    """Reject tickets for booked seats, counting the conflicts"""
+
+    def filter_queryset(self, attrs, queryset, serializer):
+        # look in the partition of the flight departure only
+        return super().filter_queryset(attrs, queryset, serializer).filter(
+            departure_time=attrs["flight"].departure_time
+        )
+
+    def __call__(self, attrs, serializer):
+        try:
+            super().__call__(attrs, serializer)
+        except ValidationError:
+            SEAT_CONFLICTS.inc()
+            raise
+
+
+class FlightSearchSerializer(FlightListSerializer):
+    airline = serializers.CharField(source="airline.name")
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Flight
+        fields = FlightListSerializer.Meta.fields + ("airline", "rank")
+
+
+class FlightScheduleSerializer(serializers.Serializer):
+    route = serializers.PrimaryKeyRelatedField(queryset=Route.objects.all())
+    airplane = serializers.PrimaryKeyRelatedField(
+        queryset=Airplane.objects.all()
+    )
+    airline = serializers.PrimaryKeyRelatedField(
+        queryset=Airline.objects.all()
+    )
+    crew = serializers.PrimaryKeyRelatedField(
+        queryset=Crew.objects.all(), many=True, required=False
+    )
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=7),
+        allow_empty=False,
+        help_text="ISO weekdays of the flights, Monday is 1",
+    )
+    departure_time = serializers.TimeField()
+    duration = serializers.DurationField(min_value=timedelta(minutes=1))
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        days = (attrs["end_date"] - attrs["start_date"]).days + 1
+        if days < 1:
+            raise ValidationError(
+                {"end_date": "end_date can't be before start_date."}
+            )
+        if days > MAX_SCHEDULE_DAYS:
+            raise ValidationError(
+                {
+                    "end_date": f"A schedule can't span more than "
+                    f"{MAX_SCHEDULE_DAYS} days."
+                }
+            )
+        attrs.setdefault("crew", [])
+        return attrs
+
+
+class FlightScheduleResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField(help_text="Flights created")
+    existing = serializers.IntegerField(
+        help_text="Flights of the schedule already there"
+    )
+    crew_links = serializers.IntegerField(help_text="Crew assignments added")
+
+
 class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -160,10 +378,10 @@ class TicketSerializer(serializers.ModelSerializer):
         model = Ticket
         fields = ("id", "row", "seat", "flight",)
         validators = [
-            UniqueTogetherValidator(
+            BookedSeatValidator(
                 queryset=Ticket.objects.all(),
                 fields=["flight", "row", "seat"],
-                message="Seat with entered data has been already booked."
+                message=SEAT_BOOKED_MESSAGE,
             )
         ]
 
@@ -186,9 +404,9 @@ class FlightDetailSerializer(FlightSerializer):
     airplane_type = serializers.CharField(
         source="airplane.airplane_type"
     )
-    airline = AirlineListSerializer()
+    airline = AirlineDetailSerializer()
     taken_tickets = TicketSeatsSerializer(
-        source="tickets",
+        source="departure_tickets",
         many=True,
     )
     crew = serializers.StringRelatedField(
@@ -210,6 +428,17 @@ class FlightDetailSerializer(FlightSerializer):
         )
 
 
+class FlightBatchFilterSerializer(serializers.Serializer):
+    ids = serializers.CharField(
+        help_text=f"Comma separated ids of at most {MAX_BATCH_FLIGHTS} "
+        f"flights, in the order of the response (ex. ?ids=3,1,2)"
+    )
+    detail = serializers.BooleanField(
+        default=False,
+        help_text="Detail representations instead of the list ones",
+    )
+
+
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
 
@@ -229,3 +458,93 @@ class OrderSerializer(serializers.ModelSerializer):
 class OrderListSerializer(OrderSerializer):
     created_at = serializers.DateTimeField(format="%Y-%m-%d %H:%M")
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class SlowQuerySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    captured_at = serializers.DateTimeField()
+    duration_ms = serializers.FloatField()
+    database = serializers.CharField()
+    view = serializers.CharField()
+    action = serializers.CharField()
+    method = serializers.CharField()
+    path = serializers.CharField()
+    sql = serializers.CharField()
+    params = serializers.JSONField(allow_null=True)
+    plan = serializers.CharField(allow_null=True)
+
+
+class DateRangeSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("date_from") and attrs.get("date_to"):
+            if attrs["date_from"] > attrs["date_to"]:
+                raise ValidationError(
+                    {"date_to": "date_to can't be before date_from."}
+                )
+        return attrs
+
+
+class LoadFactorSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    flights = serializers.IntegerField(source="total_flights")
+    seats = serializers.IntegerField(source="total_seats")
+    seats_sold = serializers.IntegerField(source="total_seats_sold")
+    load_factor = serializers.FloatField()
+
+
+class RouteLoadFactorSerializer(LoadFactorSerializer):
+    route = serializers.IntegerField()
+    source = serializers.CharField(source="route__source__code")
+    destination = serializers.CharField(source="route__destination__code")
+
+
+class AirlineLoadFactorSerializer(LoadFactorSerializer):
+    airline = serializers.IntegerField()
+    airline_name = serializers.CharField(source="airline__name")
+
+
+class AirplaneTypeLoadFactorSerializer(LoadFactorSerializer):
+    airplane_type = serializers.IntegerField()
+    airplane_type_name = serializers.CharField(source="airplane_type__name")
+
+
+class ForecastFilterSerializer(DateRangeSerializer):
+    route = serializers.IntegerField(required=False)
+
+
+class FlightForecastSerializer(serializers.ModelSerializer):
+    source = serializers.CharField(source="route.source.code")
+    destination = serializers.CharField(source="route.destination.code")
+    days_before = serializers.IntegerField()
+    capacity = serializers.IntegerField()
+    seats_sold = serializers.IntegerField()
+    expected_seats_sold = serializers.FloatField()
+    expected_load_factor = serializers.FloatField()
+
+    class Meta:
+        model = Flight
+        fields = (
+            "id",
+            "route",
+            "source",
+            "destination",
+            "departure_time",
+            "days_before",
+            "capacity",
+            "seats_sold",
+            "expected_seats_sold",
+            "expected_load_factor",
+        )
+
+
+class RouteBookingCurveSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    flights = serializers.IntegerField()
+    load_factor = serializers.FloatField()
+    curve = serializers.DictField(
+        child=serializers.FloatField(),
+        help_text="Share of the seats sold booked by days before departure",
+    )
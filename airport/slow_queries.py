@@ -0,0 +1,182 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from airport.metrics import get_view_labels
+
+logger = logging.getLogger(__name__)
+
+COUNTER_KEY = "slow_query:counter"
+ENTRY_KEY = "slow_query:{}"
+
+# pending EXPLAIN plans beyond this are skipped
+MAX_PENDING_EXPLAINS = 10
+
+explain_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="slow-query-explain"
+)
+pending_explains = threading.BoundedSemaphore(MAX_PENDING_EXPLAINS)
+
+
+def entry_key(entry_id):
+    return ENTRY_KEY.format(entry_id % settings.SLOW_QUERY_LOG_SIZE)
+
+
+def record_slow_query(entry):
+    """
+    Store a capture in the ring buffer of the last `SLOW_QUERY_LOG_SIZE`
+    slow queries. It is kept in the default cache, which every worker
+    process shares once `CACHES` points at Redis (see `airport.W001`).
+    """
+    cache.add(COUNTER_KEY, 0, timeout=None)
+    entry["id"] = cache.incr(COUNTER_KEY)
+    cache.set(entry_key(entry["id"]), entry, timeout=None)
+    return entry["id"]
+
+
+def update_slow_query(entry_id, **fields):
+    entry = cache.get(entry_key(entry_id))
+    if entry is None or entry["id"] != entry_id:
+        # overwritten by a newer capture meanwhile
+        return
+
+    entry.update(fields)
+    cache.set(entry_key(entry_id), entry, timeout=None)
+
+
+def get_slow_queries():
+    """Return the captures in the ring buffer, newest first"""
+    last_id = cache.get(COUNTER_KEY) or 0
+    ids = range(last_id, max(last_id - settings.SLOW_QUERY_LOG_SIZE, 0), -1)
+    entries = cache.get_many([entry_key(entry_id) for entry_id in ids])
+    return [
+        entries[entry_key(entry_id)]
+        for entry_id in ids
+        if entries.get(entry_key(entry_id), {}).get("id") == entry_id
+    ]
+
+
+def clear_slow_queries():
+    size = settings.SLOW_QUERY_LOG_SIZE
+    cache.delete_many(
+        [COUNTER_KEY] + [ENTRY_KEY.format(num) for num in range(size)]
+    )
+
+
+def to_json_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: to_json_value(value) for key, value in params.items()}
+    return [to_json_value(value) for value in params]
+
+
+def to_json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def explain_slow_query(entry_id, alias, sql, params):
+    """Run `EXPLAIN` for a captured query and store the plan"""
+    connection = connections[alias]
+    options = {}
+    if connection.vendor == "postgresql":
+        options = {"analyze": True, "buffers": True}
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix(**options)} {sql}",
+                params,
+            )
+            # the plan text is the last column on every backend
+            plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as error:
+        logger.warning("Couldn't explain slow query %s: %s", entry_id, error)
+        plan = None
+
+    update_slow_query(entry_id, plan=plan)
+
+
+def explain_in_background(entry_id, alias, sql, params):
+    try:
+        explain_slow_query(entry_id, alias, sql, params)
+    finally:
+        connections.close_all()
+        pending_explains.release()
+
+
+def schedule_explain(entry_id, alias, sql, params):
+    """
+    Explain the query on a worker thread, with its own connection,
+    unless `MAX_PENDING_EXPLAINS` plans are already waiting.
+    """
+    if not pending_explains.acquire(blocking=False):
+        return False
+
+    try:
+        explain_executor.submit(
+            explain_in_background, entry_id, alias, sql, params
+        )
+    except RuntimeError:
+        # the executor is shut down at interpreter exit
+        pending_explains.release()
+        return False
+
+    return True
+
+
+class SlowQueryRecorder:
+    """
+    Database execute wrapper capturing the queries of a request which
+    run longer than `SLOW_QUERY_THRESHOLD_MS`.
+
+    Only `SELECT` statements are explained, as `ANALYZE` executes them
+    again, and only a `SLOW_QUERY_EXPLAIN_SAMPLE_RATE` fraction of them.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.capture(sql, params, many, context, duration)
+
+    def capture(self, sql, params, many, context, duration):
+        view, action = get_view_labels(self.request)
+        entry_id = record_slow_query(
+            {
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+                "duration_ms": round(duration * 1000, 2),
+                "database": context["connection"].alias,
+                "view": view,
+                "action": action,
+                "method": self.request.method,
+                "path": self.request.path,
+                "sql": sql,
+                "params": None if many else to_json_params(params),
+                "plan": None,
+            }
+        )
+
+        explainable = not many and sql.lstrip()[:6].upper() == "SELECT"
+        if explainable and (
+            random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+        ):
+            schedule_explain(
+                entry_id, context["connection"].alias, sql, params
+            )
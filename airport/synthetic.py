@@ -0,0 +1,465 @@
+import csv
+import heapq
+import io
+import random
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Max
+
+from airport.geo import route_distance
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+CITIES = [
+    "London", "Paris", "Dubai", "Sydney", "New York", "Tokyo", "Singapore",
+    "Frankfurt", "Amsterdam", "Madrid", "Rome", "Istanbul", "Los Angeles",
+    "Chicago", "Toronto", "Hong Kong", "Bangkok", "Seoul", "Delhi", "Doha",
+    "Munich", "Zurich", "Vienna", "Lisbon", "Dublin", "Barcelona", "Warsaw",
+    "Prague", "Kyiv", "Athens", "Cairo", "Johannesburg", "Sao Paulo",
+    "Mexico City", "Miami", "San Francisco", "Vancouver", "Melbourne",
+    "Auckland", "Beijing", "Shanghai", "Mumbai", "Kuala Lumpur", "Jakarta",
+    "Manila", "Helsinki", "Oslo", "Stockholm", "Copenhagen", "Brussels",
+]
+FIRST_NAMES = [
+    "John", "Anna", "Peter", "Maria", "David", "Olga", "James", "Sofia",
+    "Michael", "Emma", "Daniel", "Laura", "Robert", "Julia", "Thomas", "Eva",
+]
+LAST_NAMES = [
+    "Smith", "Doe", "Brown", "Kowalski", "Garcia", "Muller", "Rossi",
+    "Novak", "Martin", "Silva", "Kozlov", "Jensen", "Dubois", "Tanaka",
+]
+AIRPLANE_MODELS = [
+    "Airbus A320", "Airbus A321", "Airbus A330", "Airbus A350",
+    "Boeing 737", "Boeing 777", "Boeing 787", "Embraer E195",
+]
+# latitudes of the generated airports, most land being in between
+AIRPORT_LATITUDES = (-55, 70)
+AIRPLANE_ROWS = range(25, 61)
+AIRPLANE_SEATS_IN_ROW = (4, 6, 8, 10)
+CREW_PER_FLIGHT = range(2, 6)
+# time an airplane and its crew are busy on the ground between flights
+TURNAROUND = timedelta(minutes=30)
+TICKETS_PER_ORDER = range(1, 5)
+DEFAULT_PASSWORD = "password"
+
+
+def airport_code(num):
+    """Unique IATA-like code: AAA, AAB, ... then longer codes"""
+    letters = ""
+    num += 26 * 26
+    while num:
+        num, rest = divmod(num, 26)
+        letters = chr(ord("A") + rest) + letters
+    return letters
+
+
+class TableWriter:
+    """
+    Buffers rows of a model and inserts them in chunks, through `COPY`
+    on PostgreSQL and a plain multi-row `INSERT` elsewhere.
+
+    Rows are tuples of values for `fields`, with explicit primary keys
+    so other rows can reference them. Model `save()` logic such as
+    `auto_now_add` is bypassed, so generated timestamps are kept.
+    """
+
+    def __init__(self, model, fields, chunk_size):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.rows = []
+        self.count = 0
+        self.connection = connections[DEFAULT_DB_ALIAS]
+
+        self.model_fields = [model._meta.get_field(field) for field in fields]
+        table = connection.ops.quote_name(model._meta.db_table)
+        columns = ", ".join(
+            connection.ops.quote_name(field.column)
+            for field in self.model_fields
+        )
+        self.copy_sql = (
+            f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+        )
+        self.insert_sql = (
+            f"INSERT INTO {table} ({columns}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})"
+        )
+
+    def add(self, row):
+        self.rows.append(row)
+
+    def is_full(self):
+        return len(self.rows) >= self.chunk_size
+
+    def flush(self):
+        if not self.rows:
+            return
+
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == "postgresql":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(self.rows)
+                buffer.seek(0)
+                cursor.copy_expert(self.copy_sql, buffer)
+            else:
+                prepare = [
+                    partial(field.get_db_prep_save, connection=self.connection)
+                    for field in self.model_fields
+                ]
+                cursor.executemany(
+                    self.insert_sql,
+                    [
+                        [prep(value) for prep, value in zip(prepare, row)]
+                        for row in self.rows
+                    ],
+                )
+
+        self.count += len(self.rows)
+        self.rows = []
+
+
+def next_id(model):
+    return (model.objects.aggregate(max_id=Max("pk"))["max_id"] or 0) + 1
+
+
+class SyntheticData:
+    """
+    Reproducible generator of a realistic airport dataset.
+
+    Flights are sold to `tickets / flights` seats on average, each order
+    booking 1-4 seats of one flight some days before its departure.
+    """
+
+    def __init__(
+        self,
+        airports=500,
+        airlines=50,
+        airplanes=300,
+        crews=5_000,
+        routes=5_000,
+        flights=100_000,
+        users=100_000,
+        tickets=10_000_000,
+        seed=42,
+        start=datetime(2024, 1, 1),
+        days=730,
+        chunk_size=50_000,
+        password=DEFAULT_PASSWORD,
+    ):
+        self.airports = airports
+        self.airlines = airlines
+        self.airplanes = airplanes
+        self.crews = crews
+        self.routes = routes
+        self.flights = flights
+        self.users = users
+        self.tickets = tickets
+        self.start = start
+        self.days = days
+        self.chunk_size = chunk_size
+        self.password = password
+        self.random = random.Random(seed)
+        self.writers = {}
+
+    def writer(self, model, fields):
+        self.writers[model] = TableWriter(model, fields, self.chunk_size)
+        return self.writers[model]
+
+    def validate(self):
+        min_capacity = min(AIRPLANE_ROWS) * min(AIRPLANE_SEATS_IN_ROW)
+        if self.tickets > self.flights * min_capacity:
+            raise ValueError(
+                f"{self.tickets} tickets don't fit in {self.flights} "
+                f"flights; use at least "
+                f"{-(-self.tickets // min_capacity)} flights"
+            )
+        if self.airports < 2:
+            raise ValueError("At least 2 airports are needed for routes")
+        if self.crews < max(CREW_PER_FLIGHT):
+            raise ValueError(
+                f"At least {max(CREW_PER_FLIGHT)} crew members are needed "
+                f"for flights"
+            )
+
+    @transaction.atomic
+    def generate(self, log=None):
+        """Insert the dataset and return the number of rows per model"""
+        self.validate()
+        log = log or (lambda message: None)
+
+        airport_locations = self.generate_airports()
+        airline_ids = self.generate_airlines()
+        airplane_capacities = self.generate_airplanes()
+        crew_ids = self.generate_crews()
+        route_ids = self.generate_routes(airport_locations)
+        user_ids = self.generate_users()
+        log("Reference data and users generated")
+
+        self.generate_flights(
+            route_ids, airline_ids, airplane_capacities, crew_ids, user_ids,
+            log,
+        )
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(
+                    no_style(), list(self.writers)
+                ):
+                    cursor.execute(sql)
+
+        return {
+            model._meta.label: writer.count
+            for model, writer in self.writers.items()
+        }
+
+    def insert(self, model, fields, rows):
+        writer = self.writer(model, fields)
+        for row in rows:
+            writer.add(row)
+            if writer.is_full():
+                writer.flush()
+        writer.flush()
+
+    def generate_airports(self):
+        """Insert the airports and return their locations by id"""
+        first_id = next_id(Airport)
+        locations = {
+            pk: (
+                round(self.random.uniform(*AIRPORT_LATITUDES), 4),
+                round(self.random.uniform(-180, 180), 4),
+            )
+            for pk in range(first_id, first_id + self.airports)
+        }
+        self.insert(
+            Airport,
+            [
+                "id", "name", "code", "closest_big_city", "latitude",
+                "longitude",
+            ],
+            (
+                (
+                    pk,
+                    f"{CITIES[pk % len(CITIES)]} Airport {pk}",
+                    airport_code(pk),
+                    CITIES[pk % len(CITIES)],
+                    latitude,
+                    longitude,
+                )
+                for pk, (latitude, longitude) in locations.items()
+            ),
+        )
+        return locations
+
+    def generate_airlines(self):
+        first_id = next_id(Airline)
+        ids = range(first_id, first_id + self.airlines)
+        self.insert(
+            Airline,
+            ["id", "name", "image", "image_variants"],
+            # an empty object, written as is by COPY too
+            ((pk, f"Airline {pk}", None, {}) for pk in ids),
+        )
+        return ids
+
+    def generate_airplanes(self):
+        first_type_id = next_id(AirplaneType)
+        type_ids = range(first_type_id, first_type_id + len(AIRPLANE_MODELS))
+        self.insert(
+            AirplaneType,
+            ["id", "name"],
+            (
+                (pk, f"{name} ({pk})")
+                for pk, name in zip(type_ids, AIRPLANE_MODELS)
+            ),
+        )
+
+        first_id = next_id(Airplane)
+        capacities = {}
+        rows = []
+        for pk in range(first_id, first_id + self.airplanes):
+            airplane_rows = self.random.choice(AIRPLANE_ROWS)
+            seats_in_row = self.random.choice(AIRPLANE_SEATS_IN_ROW)
+            capacities[pk] = (airplane_rows, seats_in_row)
+            rows.append(
+                (
+                    pk,
+                    f"Airplane {pk}",
+                    airplane_rows,
+                    seats_in_row,
+                    self.random.choice(type_ids),
+                )
+            )
+        self.insert(
+            Airplane,
+            ["id", "name", "rows", "seats_in_row", "airplane_type"],
+            rows,
+        )
+        return capacities
+
+    def generate_crews(self):
+        first_id = next_id(Crew)
+        ids = range(first_id, first_id + self.crews)
+        self.insert(
+            Crew,
+            ["id", "first_name", "last_name"],
+            (
+                (
+                    pk,
+                    self.random.choice(FIRST_NAMES),
+                    self.random.choice(LAST_NAMES),
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def generate_routes(self, airport_locations):
+        first_id = next_id(Route)
+        ids = range(first_id, first_id + self.routes)
+        airport_ids = list(airport_locations)
+        rows = []
+        for pk in ids:
+            source, destination = self.random.sample(airport_ids, 2)
+            rows.append(
+                (
+                    pk,
+                    source,
+                    destination,
+                    route_distance(
+                        *airport_locations[source],
+                        *airport_locations[destination],
+                    ),
+                )
+            )
+        self.insert(Route, ["id", "source", "destination", "distance"], rows)
+        return ids
+
+    def generate_users(self):
+        user_model = get_user_model()
+        first_id = next_id(user_model)
+        ids = range(first_id, first_id + self.users)
+        password = make_password(self.password)
+        now = datetime.now()
+        self.insert(
+            user_model,
+            [
+                "id", "password", "is_superuser", "email", "first_name",
+                "last_name", "is_staff", "is_active", "date_joined",
+            ],
+            (
+                (
+                    pk, password, False, f"user{pk}@example.com",
+                    self.random.choice(FIRST_NAMES),
+                    self.random.choice(LAST_NAMES),
+                    False, True, now,
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def generate_flights(
+        self, route_ids, airline_ids, airplane_capacities, crew_ids,
+        user_ids, log,
+    ):
+        flights = self.writer(
+            Flight,
+            [
+                "id", "route", "airline", "airplane", "departure_time",
+                "arrival_time",
+            ],
+        )
+        flight_crews = self.writer(Flight.crew.through, ["flight", "crew"])
+        orders = self.writer(Order, ["id", "created_at", "user"])
+        tickets = self.writer(
+            Ticket, ["flight", "order", "row", "seat", "departure_time"]
+        )
+
+        rnd = self.random
+        # next free time and id of the airplanes and crew members, the
+        # flights taking the first free ones so none is double booked
+        airplanes = [(self.start, pk) for pk in airplane_capacities]
+        crews = [(self.start, pk) for pk in crew_ids]
+        flight_id = next_id(Flight)
+        order_id = next_id(Order)
+        per_flight, remainder = divmod(self.tickets, self.flights)
+        period = self.days * 24 * 60
+        departures = sorted(
+            rnd.randrange(period) for _ in range(self.flights)
+        )
+
+        for num, minutes in enumerate(departures):
+            free_at, airplane_id = heapq.heappop(airplanes)
+            crew = [
+                heapq.heappop(crews)
+                for _ in range(rnd.choice(CREW_PER_FLIGHT))
+            ]
+            # a flight waits for its airplane and crew when all are busy
+            departure = max(
+                self.start + timedelta(minutes=minutes),
+                free_at,
+                *(crew_free_at for crew_free_at, _ in crew),
+            )
+            arrival = departure + timedelta(minutes=rnd.randint(45, 900))
+            airplane_rows, seats_in_row = airplane_capacities[airplane_id]
+            flights.add(
+                (
+                    flight_id,
+                    rnd.choice(route_ids),
+                    rnd.choice(airline_ids),
+                    airplane_id,
+                    departure,
+                    arrival,
+                )
+            )
+            heapq.heappush(airplanes, (arrival + TURNAROUND, airplane_id))
+            for _, crew_id in crew:
+                flight_crews.add((flight_id, crew_id))
+                heapq.heappush(crews, (arrival + TURNAROUND, crew_id))
+
+            sold = per_flight + (num < remainder)
+            slot = 0
+            while slot < sold:
+                days_before = min(rnd.expovariate(1 / 30), 365)
+                orders.add(
+                    (
+                        order_id,
+                        departure - timedelta(days=days_before),
+                        rnd.choice(user_ids),
+                    )
+                )
+                order_size = min(rnd.choice(TICKETS_PER_ORDER), sold - slot)
+                for _ in range(order_size):
+                    tickets.add(
+                        (
+                            flight_id,
+                            order_id,
+                            slot // seats_in_row + 1,
+                            slot % seats_in_row + 1,
+                            departure,
+                        )
+                    )
+                    slot += 1
+                order_id += 1
+            flight_id += 1
+
+            if tickets.is_full() or flights.is_full():
+                for writer in (flights, flight_crews, orders, tickets):
+                    writer.flush()
+                log(f"{tickets.count} tickets of {self.tickets} generated")
+
+        for writer in (flights, flight_crews, orders, tickets):
+            writer.flush()
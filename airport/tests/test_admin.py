@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from airport.large_tables import EstimatedCountPaginator, estimated_count
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+TICKET_CHANGELIST_URL = reverse("admin:airport_ticket_changelist")
+ORDER_CHANGELIST_URL = reverse("admin:airport_order_changelist")
+USER_CHANGELIST_URL = reverse("admin:user_user_changelist")
+AUTOCOMPLETE_URL = reverse("admin:autocomplete")
+
+
+class LargeTableAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "pass"
+        )
+        cls.user = get_user_model().objects.create_user(
+            "user@test.com", "pass"
+        )
+        airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        cls.flight = Flight.objects.create(
+            route=route,
+            airline=Airline.objects.create(name="Airline"),
+            airplane=airplane,
+            departure_time=datetime(2024, 6, 1, 8),
+            arrival_time=datetime(2024, 6, 1, 10),
+        )
+        cls.order = Order.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def book(self, rows):
+        Ticket.objects.bulk_create(
+            Ticket(order=self.order, flight=self.flight, row=row, seat=1)
+            for row in rows
+        )
+
+    def changelist_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_ticket_changelist_queries_dont_grow_with_rows(self):
+        self.book([1])
+        queries = self.changelist_queries(TICKET_CHANGELIST_URL)
+
+        self.book(range(2, 11))
+
+        self.assertEqual(
+            self.changelist_queries(TICKET_CHANGELIST_URL), queries
+        )
+
+    def test_order_changelist_queries_dont_grow_with_rows(self):
+        queries = self.changelist_queries(ORDER_CHANGELIST_URL)
+
+        for num in range(5):
+            Order.objects.create(
+                user=get_user_model().objects.create_user(
+                    f"user{num}@test.com", "pass"
+                )
+            )
+
+        self.assertEqual(
+            self.changelist_queries(ORDER_CHANGELIST_URL), queries
+        )
+
+    def test_search_matches_whole_ids_and_emails(self):
+        other = Order.objects.create(
+            user=get_user_model().objects.create_user("other@test.com", "a")
+        )
+
+        for term, orders in (
+            (str(other.id), [other]),
+            ("user@test.com", [self.order]),
+            ("test.com", []),
+            ("9" * 30, []),
+        ):
+            with self.subTest(term=term):
+                res = self.client.get(ORDER_CHANGELIST_URL, {"q": term})
+
+                self.assertEqual(
+                    list(res.context["cl"].result_list), orders
+                )
+
+    def test_ticket_search(self):
+        self.book([1, 2])
+
+        res = self.client.get(TICKET_CHANGELIST_URL, {"q": self.flight.id})
+        self.assertEqual(len(res.context["cl"].result_list), 2)
+
+        res = self.client.get(TICKET_CHANGELIST_URL, {"q": "x@test.com"})
+        self.assertEqual(len(res.context["cl"].result_list), 0)
+
+    def test_user_search(self):
+        res = self.client.get(USER_CHANGELIST_URL, {"q": "user@test.com"})
+
+        self.assertEqual(list(res.context["cl"].result_list), [self.user])
+
+    def test_flight_autocomplete(self):
+        res = self.client.get(
+            AUTOCOMPLETE_URL,
+            {
+                "app_label": "airport",
+                "model_name": "ticket",
+                "field_name": "flight",
+                "term": "LHR",
+            },
+        )
+
+        self.assertEqual(
+            [result["id"] for result in res.json()["results"]],
+            [str(self.flight.id)],
+        )
+
+    def test_ticket_change_form_uses_autocomplete(self):
+        self.book([1])
+
+        res = self.client.get(
+            reverse(
+                "admin:airport_ticket_change",
+                args=[Ticket.objects.get().pk],
+            )
+        )
+
+        # the flight and order widgets load their options on demand
+        self.assertContains(res, "data-ajax--url", count=2)
+
+
+class EstimatedCountTests(TestCase):
+    def test_counts_exactly_without_planner_estimates(self):
+        Airline.objects.create(name="Airline")
+
+        self.assertEqual(estimated_count(Airline.objects.all()), 1)
+        self.assertEqual(estimated_count(Airline.objects.none()), 0)
+        self.assertEqual(
+            EstimatedCountPaginator(Airline.objects.order_by("id"), 10).count,
+            1,
+        )
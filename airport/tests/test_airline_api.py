@@ -1,14 +1,18 @@
+import shutil
 import tempfile
 import os
+from unittest import mock
 
 from PIL import Image
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from airport import images
 from airport.models import (
     Airline, Flight, Airplane, AirplaneType, Airport, Route
 )
@@ -119,6 +123,7 @@ class AdminAirlineApiTests(TestCase):
             self.assertEqual(payload[key], getattr(airline, key))
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class AirlineImageUploadTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -132,7 +137,7 @@ class AirlineImageUploadTests(TestCase):
         self.flight.save()
 
     def tearDown(self):
-        self.airline.image.delete()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
 
     def test_upload_image_to_airline(self):
         """Test uploading an image to airline"""
@@ -206,3 +211,165 @@ class AirlineImageUploadTests(TestCase):
         res = self.client.get(FLIGHT_URL + f"{self.flight.id}/")
 
         self.assertIn("image", res.data["airline"].keys())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AirlineImageVariantsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@myproject.com", "password"
+        )
+        self.client.force_authenticate(self.user)
+        self.airline = sample_airline()
+        self.flight = sample_flight(airline=self.airline)
+
+        patcher = mock.patch.object(images, "image_executor")
+        self.image_executor = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def upload_image(self, size=(600, 300), mode="RGBA", image_format="PNG"):
+        suffix = f".{image_format.lower()}"
+        with tempfile.NamedTemporaryFile(suffix=suffix) as ntf:
+            Image.new(mode, size).save(ntf, format=image_format)
+            ntf.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(
+                    image_upload_url(self.airline.id),
+                    {"image": ntf},
+                    format="multipart",
+                )
+        self.airline.refresh_from_db()
+        return res
+
+    def test_upload_schedules_variants_after_commit(self):
+        self.upload_image()
+
+        self.image_executor.submit.assert_called_once_with(
+            images.generate_in_background,
+            self.airline.id,
+            self.airline.image.name,
+        )
+
+    def test_generate_variants(self):
+        self.upload_image()
+
+        names = images.generate_image_variants(
+            self.airline.id, self.airline.image.name
+        )
+        self.airline.refresh_from_db()
+
+        self.assertEqual(self.airline.image_variants, names)
+        self.assertEqual(set(names), set(images.IMAGE_VARIANTS))
+        storage = self.airline.image.storage
+        for variant, (width, height) in images.IMAGE_VARIANTS.items():
+            with storage.open(names[variant]) as file, Image.open(
+                file
+            ) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.mode, "RGBA")
+                self.assertEqual(image.size, (width, height // 2))
+
+    def test_variants_of_replaced_image_are_discarded(self):
+        self.upload_image()
+        image_name = self.airline.image.name
+        Airline.objects.filter(pk=self.airline.id).update(image="other.png")
+
+        names = images.generate_image_variants(self.airline.id, image_name)
+
+        self.airline.refresh_from_db()
+        self.assertEqual(self.airline.image_variants, {})
+        for name in names.values():
+            self.assertFalse(self.airline.image.storage.exists(name))
+
+    def test_serializers_return_variant_urls(self):
+        self.upload_image()
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertTrue(
+            res.data["results"][0]["airline_image"].endswith(
+                self.airline.image.url
+            )
+        )
+
+        images.generate_image_variants(
+            self.airline.id, self.airline.image.name
+        )
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertTrue(
+            res.data["results"][0]["airline_image"].endswith(
+                "-thumbnail.webp"
+            )
+        )
+        res = self.client.get(AIRLINE_URL)
+        self.assertTrue(res.data[0]["image"].endswith("-thumbnail.webp"))
+        res = self.client.get(FLIGHT_URL + f"{self.flight.id}/")
+        self.assertTrue(res.data["airline"]["image"].endswith("-medium.webp"))
+
+    def test_new_upload_resets_variants(self):
+        self.upload_image()
+        images.generate_image_variants(
+            self.airline.id, self.airline.image.name
+        )
+        self.airline.refresh_from_db()
+        old_variants = list(self.airline.image_variants.values())
+
+        self.upload_image(mode="RGB", image_format="JPEG")
+
+        self.assertEqual(self.airline.image_variants, {})
+        storage = self.airline.image.storage
+        for name in old_variants:
+            self.assertFalse(storage.exists(name))
+
+    def change_image_in_admin(self, **data):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                reverse("admin:airport_airline_change", args=[self.airline.id]),
+                {"name": self.airline.name, **data},
+            )
+        self.airline.refresh_from_db()
+        return res
+
+    def test_admin_image_change_replaces_variants(self):
+        self.upload_image()
+        images.generate_image_variants(
+            self.airline.id, self.airline.image.name
+        )
+        self.airline.refresh_from_db()
+        old_variants = list(self.airline.image_variants.values())
+        old_image = self.airline.image.name
+        self.image_executor.reset_mock()
+
+        with tempfile.NamedTemporaryFile(suffix=".png") as ntf:
+            Image.new("RGB", (100, 100)).save(ntf, format="PNG")
+            ntf.seek(0)
+            res = self.change_image_in_admin(image=ntf)
+
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+        self.assertNotEqual(self.airline.image.name, old_image)
+        self.assertEqual(self.airline.image_variants, {})
+        self.image_executor.submit.assert_called_once_with(
+            images.generate_in_background,
+            self.airline.id,
+            self.airline.image.name,
+        )
+        storage = self.airline.image.storage
+        for name in old_variants:
+            self.assertFalse(storage.exists(name))
+
+    def test_admin_name_change_keeps_variants(self):
+        self.upload_image()
+        names = images.generate_image_variants(
+            self.airline.id, self.airline.image.name
+        )
+        self.image_executor.reset_mock()
+
+        self.change_image_in_admin()
+
+        self.assertEqual(self.airline.image_variants, names)
+        self.image_executor.submit.assert_not_called()
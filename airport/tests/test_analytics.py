@@ -0,0 +1,254 @@
+from datetime import date, datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.analytics import pending_refresh_range, refresh_daily_loads
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    DailyLoad,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+ROUTES_URL = reverse("airport:load-factor-routes")
+AIRLINES_URL = reverse("airport:load-factor-airlines")
+AIRPLANE_TYPES_URL = reverse("airport:load-factor-airplane-types")
+
+
+def sample_flight(route, airline, airplane, departure_time):
+    return Flight.objects.create(
+        route=route,
+        airline=airline,
+        airplane=airplane,
+        departure_time=departure_time,
+        arrival_time=departure_time,
+    )
+
+
+class DailyLoadTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        airports = [
+            Airport.objects.create(name=code, code=code)
+            for code in ("LHR", "CDG", "ORY")
+        ]
+        cls.routes = [
+            Route.objects.create(
+                source=airports[0], destination=destination, distance=400
+            )
+            for destination in airports[1:]
+        ]
+        cls.airlines = [
+            Airline.objects.create(name=name) for name in ("First", "Second")
+        ]
+        airplane_type = AirplaneType.objects.create(name="Narrow")
+        cls.airplanes = [
+            Airplane.objects.create(
+                name=name,
+                rows=rows,
+                seats_in_row=2,
+                airplane_type=airplane_type,
+            )
+            for name, rows in (("Small", 5), ("Large", 10))
+        ]
+        # 10 + 20 seats from LHR to CDG on June 1st, 10 to ORY on June 2nd
+        cls.flights = [
+            sample_flight(
+                cls.routes[0],
+                cls.airlines[0],
+                cls.airplanes[0],
+                datetime(2024, 6, 1, 8),
+            ),
+            sample_flight(
+                cls.routes[0],
+                cls.airlines[1],
+                cls.airplanes[1],
+                datetime(2024, 6, 1, 20),
+            ),
+            sample_flight(
+                cls.routes[1],
+                cls.airlines[0],
+                cls.airplanes[0],
+                datetime(2024, 6, 2, 8),
+            ),
+        ]
+        user = get_user_model().objects.create_user("test@test.com", "pass")
+        order = Order.objects.create(user=user)
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight=flight, row=row, seat=1)
+            for flight, sold in zip(cls.flights, (5, 3, 10))
+            for row in range(1, sold + 1)
+        )
+
+
+class RefreshDailyLoadsTests(DailyLoadTestMixin, TestCase):
+    def test_refresh_groups_flights_by_day_and_dimensions(self):
+        written = refresh_daily_loads(date(2024, 6, 1), date(2024, 6, 2))
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            list(
+                DailyLoad.objects.order_by("date", "airline").values_list(
+                    "date",
+                    "route",
+                    "airline",
+                    "flights",
+                    "seats",
+                    "seats_sold",
+                )
+            ),
+            [
+                (date(2024, 6, 1), self.routes[0].id, self.airlines[0].id,
+                 1, 10, 5),
+                (date(2024, 6, 1), self.routes[0].id, self.airlines[1].id,
+                 1, 20, 3),
+                (date(2024, 6, 2), self.routes[1].id, self.airlines[0].id,
+                 1, 10, 10),
+            ],
+        )
+
+    def test_refresh_replaces_rollups_of_the_range_only(self):
+        refresh_daily_loads(date(2024, 6, 1), date(2024, 6, 2), batch_days=1)
+        self.flights[0].tickets.all().delete()
+        self.flights[2].tickets.all().delete()
+
+        refresh_daily_loads(date(2024, 6, 1), date(2024, 6, 1))
+
+        self.assertEqual(
+            dict(DailyLoad.objects.values_list("airline", "seats_sold"))[
+                self.airlines[0].id
+            ],
+            10,
+        )
+        self.assertEqual(
+            sorted(DailyLoad.objects.values_list("seats_sold", flat=True)),
+            [0, 3, 10],
+        )
+
+    def test_pending_range_covers_all_flights_first(self):
+        today = date(2024, 6, 10)
+        self.assertEqual(
+            pending_refresh_range(today),
+            (date(2024, 6, 1), date(2024, 6, 2)),
+        )
+
+        refresh_daily_loads(date(2024, 6, 1), date(2024, 6, 2))
+
+        self.assertEqual(
+            pending_refresh_range(today),
+            (date(2024, 6, 8), date(2024, 6, 2)),
+        )
+        self.assertEqual(
+            pending_refresh_range(date(2024, 6, 2)),
+            (date(2024, 5, 31), date(2024, 6, 2)),
+        )
+
+    def test_command_refreshes_pending_range(self):
+        out = StringIO()
+
+        call_command("refresh_daily_loads", stdout=out)
+
+        self.assertEqual(DailyLoad.objects.count(), 3)
+        self.assertIn("from 2024-06-01 to 2024-06-02", out.getvalue())
+
+
+class LoadFactorApiTests(DailyLoadTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+        refresh_daily_loads(date(2024, 6, 1), date(2024, 6, 2))
+
+    def test_staff_required(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "pass")
+        )
+
+        res = self.client.get(ROUTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_route_load_factors(self):
+        res = self.client.get(ROUTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [dict(row) for row in res.data["results"]],
+            [
+                {
+                    "date": "2024-06-01",
+                    "flights": 2,
+                    "seats": 30,
+                    "seats_sold": 8,
+                    "load_factor": 0.2667,
+                    "route": self.routes[0].id,
+                    "source": "LHR",
+                    "destination": "CDG",
+                },
+                {
+                    "date": "2024-06-02",
+                    "flights": 1,
+                    "seats": 10,
+                    "seats_sold": 10,
+                    "load_factor": 1.0,
+                    "route": self.routes[1].id,
+                    "source": "LHR",
+                    "destination": "ORY",
+                },
+            ],
+        )
+
+    def test_airline_and_airplane_type_load_factors(self):
+        res = self.client.get(AIRLINES_URL)
+        self.assertEqual(
+            [
+                (row["airline_name"], row["seats"], row["seats_sold"])
+                for row in res.data["results"]
+            ],
+            [("First", 10, 5), ("Second", 20, 3), ("First", 10, 10)],
+        )
+
+        res = self.client.get(AIRPLANE_TYPES_URL)
+        self.assertEqual(
+            [
+                (row["airplane_type_name"], row["flights"], row["load_factor"])
+                for row in res.data["results"]
+            ],
+            [("Narrow", 2, 0.2667), ("Narrow", 1, 1.0)],
+        )
+
+    def test_filter_by_date_range(self):
+        res = self.client.get(
+            ROUTES_URL, {"date_from": "2024-06-02", "date_to": "2024-06-30"}
+        )
+        self.assertEqual(
+            [row["date"] for row in res.data["results"]], ["2024-06-02"]
+        )
+
+        res = self.client.get(AIRLINES_URL, {"date_to": "2024-06-01"})
+        self.assertEqual(res.data["count"], 2)
+
+    def test_invalid_date_range(self):
+        for params in (
+            {"date_from": "yesterday"},
+            {"date_from": "2024-06-02", "date_to": "2024-06-01"},
+        ):
+            with self.subTest(params=params):
+                res = self.client.get(ROUTES_URL, params)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
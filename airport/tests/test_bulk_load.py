@@ -0,0 +1,197 @@
+import gzip
+import io
+import json
+import tempfile
+from datetime import datetime
+from datetime import timezone as tz
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from airport.bulk_load import iter_json_array
+from airport.locations import get_airport_locations
+from airport.models import Airline, Airport, Flight, Order, Route
+from airport.search import get_search_index
+
+FIXTURE = Path(__file__).resolve().parents[2] / "data_for_db.json"
+
+
+def bulk_load_data(*paths, **options):
+    call_command("bulk_load_data", *paths, stdout=io.StringIO(), **options)
+
+
+class BulkLoadDataTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def write(self, name, content):
+        path = Path(self.directory) / name
+        if name.endswith(".gz"):
+            with gzip.open(path, "wt") as file:
+                file.write(content)
+        else:
+            path.write_text(content)
+        return str(path)
+
+    def test_loads_dumpdata_fixture(self):
+        for num in range(1, 4):
+            get_user_model().objects.create_user(
+                id=num, email=f"user{num}@test.com", password="password"
+            )
+
+        bulk_load_data(str(FIXTURE), batch_size=2)
+
+        self.assertEqual(Airport.objects.count(), 5)
+        self.assertEqual(Flight.objects.count(), 5)
+        self.assertEqual(
+            Order.objects.get(pk=1).created_at,
+            timezone.make_naive(datetime(2022, 12, 1, 8, tzinfo=tz.utc)),
+        )
+        fixture_crews = {
+            record["pk"]: record["fields"]["crew"]
+            for record in json.loads(FIXTURE.read_text())
+            if record["model"] == "airport.flight"
+        }
+        for flight in Flight.objects.prefetch_related("crew"):
+            self.assertEqual(
+                sorted(crew.pk for crew in flight.crew.all()),
+                sorted(fixture_crews[flight.pk]),
+            )
+
+    def test_resolves_natural_keys_in_csv(self):
+        airports = self.write(
+            "airports.csv",
+            "code,name,closest_big_city\n"
+            "LHR,Heathrow Airport,London\n"
+            "CDG,Charles de Gaulle Airport,Paris\n",
+        )
+        routes = self.write(
+            "routes.csv",
+            "source,destination,distance\nLHR,CDG,344\nCDG,LHR,344\n",
+        )
+
+        bulk_load_data(airports, model="airport.airport")
+        bulk_load_data(routes, model="airport.route")
+
+        route = Route.objects.select_related("source", "destination").first()
+        self.assertEqual(route.source.code, "LHR")
+        self.assertEqual(route.destination.code, "CDG")
+        self.assertEqual(Route.objects.count(), 2)
+
+    def test_computes_route_distances(self):
+        airports = self.write(
+            "airports.csv",
+            "code,name,closest_big_city,latitude,longitude\n"
+            "LHR,Heathrow Airport,London,51.47,-0.4543\n"
+            "CDG,Charles de Gaulle Airport,Paris,49.0097,2.5479\n",
+        )
+        routes = self.write("routes.csv", "source,destination\nLHR,CDG\n")
+
+        bulk_load_data(airports, model="airport.airport")
+        bulk_load_data(routes, model="airport.route")
+
+        self.assertEqual(Route.objects.get().distance, 347)
+
+    def test_route_distance_needs_airport_locations(self):
+        routes = self.write(
+            "routes.ndjson",
+            '{"model": "airport.airport", "fields": {"code": "LHR", '
+            '"name": "Heathrow Airport", "closest_big_city": "London"}}\n'
+            '{"model": "airport.airport", "fields": {"code": "CDG", '
+            '"name": "Charles de Gaulle", "closest_big_city": "Paris"}}\n'
+            '{"model": "airport.route", "fields": {"source": "LHR", '
+            '"destination": "CDG"}}\n',
+        )
+
+        with self.assertRaisesMessage(CommandError, "Record 3"):
+            bulk_load_data(routes)
+        self.assertFalse(Airport.objects.exists())
+
+    def test_rebuilds_derived_indexes(self):
+        cache.clear()
+        search_index = get_search_index()
+        locations = get_airport_locations()
+        airports = self.write(
+            "airports.csv",
+            "code,name,closest_big_city,latitude,longitude\n"
+            "LHR,Heathrow Airport,London,51.47,-0.4543\n",
+        )
+
+        bulk_load_data(airports, model="airport.airport")
+
+        self.assertIsNot(get_search_index(), search_index)
+        self.assertEqual(len(get_airport_locations().ids), 1)
+        self.assertEqual(len(locations.ids), 0)
+
+    def test_upserts_by_natural_key(self):
+        Airline.objects.create(name="Lufthansa")
+        airlines = self.write(
+            "airlines.ndjson.gz",
+            '{"name": "Lufthansa", "image": "uploads/airlines/lh.png"}\n'
+            '{"name": "Air France"}\n',
+        )
+
+        bulk_load_data(airlines, model="airport.airline", upsert=True)
+
+        self.assertEqual(Airline.objects.count(), 2)
+        self.assertEqual(
+            Airline.objects.get(name="Lufthansa").image.name,
+            "uploads/airlines/lh.png",
+        )
+
+    def test_upserts_by_primary_key(self):
+        Airport.objects.create(
+            id=1, name="Heathrow", code="LHR", closest_big_city="London"
+        )
+        airports = self.write(
+            "airports.json",
+            json.dumps(
+                [
+                    {
+                        "model": "airport.airport",
+                        "pk": 1,
+                        "fields": {
+                            "name": "Heathrow Airport",
+                            "code": "LHR",
+                            "closest_big_city": "London",
+                        },
+                    },
+                ]
+            ),
+        )
+
+        with self.assertRaises(CommandError):
+            bulk_load_data(airports)
+        bulk_load_data(airports, upsert=True)
+
+        self.assertEqual(Airport.objects.get(pk=1).name, "Heathrow Airport")
+
+    def test_unknown_natural_key_rolls_back(self):
+        routes = self.write(
+            "routes.ndjson",
+            '{"model": "airport.airport", "fields": {"code": "LHR", '
+            '"name": "Heathrow Airport", "closest_big_city": "London"}}\n'
+            '{"model": "airport.route", "fields": {"source": "LHR", '
+            '"destination": "XXX", "distance": 1}}\n',
+        )
+
+        with self.assertRaisesMessage(CommandError, "XXX"):
+            bulk_load_data(routes)
+        self.assertFalse(Airport.objects.exists())
+
+    def test_rejects_unknown_fields(self):
+        airlines = self.write("airlines.csv", "name,country\nKLM,NL\n")
+
+        with self.assertRaisesMessage(CommandError, "country"):
+            bulk_load_data(airlines, model="airport.airline")
+
+    def test_streams_json_array_in_chunks(self):
+        content = FIXTURE.read_text()
+
+        items = list(iter_json_array(io.StringIO(content), read_size=7))
+
+        self.assertEqual(items, json.loads(content))
@@ -0,0 +1,109 @@
+import gzip
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from airport import middleware
+from airport.compression import accepts_encoding
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Flight, Route
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+SCHEMA_URL = reverse("schema")
+
+
+class AcceptsEncodingTests(TestCase):
+    def accepts_gzip(self, accept_encoding):
+        request = RequestFactory().get(
+            "/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return accepts_encoding(request, "gzip")
+
+    def test_accepts_encoding(self):
+        self.assertTrue(self.accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(self.accepts_gzip("br;q=1.0, gzip;q=0.8"))
+        self.assertTrue(self.accepts_gzip("*"))
+        self.assertFalse(self.accepts_gzip(""))
+        self.assertFalse(self.accepts_gzip("identity"))
+        self.assertFalse(self.accepts_gzip("gzip;q=0, *"))
+        self.assertTrue(self.accepts_gzip("*;q=0, gzip"))
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @classmethod
+    def setUpTestData(cls):
+        airline = Airline.objects.create(name="Test airline")
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Heathrow Airport",
+                code="LHR",
+                closest_big_city="London"
+            ),
+            destination=Airport.objects.create(
+                name="Charles de Gaulle Airport",
+                code="CDG",
+                closest_big_city="Paris"
+            ),
+            distance=400
+        )
+        for day in range(1, 11):
+            Flight.objects.create(
+                airline=airline,
+                airplane=airplane,
+                route=route,
+                departure_time=f"2022-06-{day:02} 14:00",
+                arrival_time=f"2022-06-{day:02} 20:00",
+            )
+
+    @override_settings(COMPRESSION_MIN_SIZE=100)
+    def test_response_above_threshold_is_compressed(self):
+        plain = self.client.get(FLIGHT_URL)
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_response_below_threshold_is_not_compressed(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", res)
+
+    @override_settings(COMPRESSION_MIN_SIZE=100)
+    def test_gzip_not_accepted(self):
+        res = self.client.get(FLIGHT_URL, HTTP_ACCEPT_ENCODING="gzip;q=0")
+
+        self.assertNotIn("Content-Encoding", res)
+
+    @override_settings(
+        COMPRESSION_MIN_SIZE=10, SCHEMA_ARTIFACT_DIR=tempfile.mkdtemp()
+    )
+    def test_cached_schema_is_not_recompressed(self):
+        with mock.patch.object(
+            middleware, "gzip_content", wraps=middleware.gzip_content
+        ) as gzip_content:
+            first = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        gzip_content.assert_not_called()
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertEqual(second.content, first.content)
+        self.assertIn(b"Airport Service API", gzip.decompress(second.content))
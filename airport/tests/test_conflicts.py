@@ -0,0 +1,431 @@
+import json
+import tempfile
+from datetime import date, datetime, time, timedelta
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.conflicts import (
+    AIRPLANE,
+    AIRPLANE_EXCLUSION,
+    CREW,
+    Booking,
+    DoubleBookingError,
+    IntervalIndex,
+    find_conflicts,
+    flight_bookings,
+)
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+from airport.schedules import create_schedule
+
+FLIGHT_URL = reverse("airport:flight-list")
+SCHEDULE_URL = reverse("airport:schedule-list")
+
+
+def at(hour):
+    return datetime(2024, 6, 3, hour)
+
+
+def booking(start, end, new=True, flight_id=None, resource_id=1):
+    return Booking(AIRPLANE, resource_id, flight_id, at(start), at(end), new)
+
+
+class IntervalIndexTests(TestCase):
+    def test_overlapping_new_bookings(self):
+        first, second = booking(8, 10), booking(9, 11)
+
+        self.assertEqual(
+            IntervalIndex([second, first]).conflicts(), [(second, first)]
+        )
+
+    def test_adjacent_and_other_resource_bookings(self):
+        index = IntervalIndex(
+            [
+                booking(8, 10),
+                booking(10, 12),
+                booking(9, 11, resource_id=2),
+            ]
+        )
+
+        self.assertEqual(index.conflicts(), [])
+
+    def test_only_new_bookings_are_checked(self):
+        stored = booking(8, 20, new=False, flight_id=1)
+        inner = booking(9, 10, new=False, flight_id=2)
+        new = booking(11, 12)
+
+        self.assertEqual(
+            IntervalIndex([stored, inner, new]).conflicts(), [(new, stored)]
+        )
+
+    def test_new_booking_starting_first(self):
+        new = booking(8, 12)
+        stored = booking(9, 10, new=False, flight_id=1)
+
+        self.assertEqual(
+            IntervalIndex([stored, new]).conflicts(), [(new, stored)]
+        )
+
+
+class ConflictsTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        cls.airline = Airline.objects.create(name="Airline")
+        airplane_type = AirplaneType.objects.create(name="Type")
+        cls.airplane, cls.other_airplane = [
+            Airplane.objects.create(
+                name=name, rows=10, seats_in_row=4, airplane_type=airplane_type
+            )
+            for name in ("Airplane", "Other airplane")
+        ]
+        cls.crew = [
+            Crew.objects.create(first_name=name, last_name="Doe")
+            for name in ("John", "Jane", "Jim")
+        ]
+        # Monday 2024-06-03 from 08:00 to 10:00
+        cls.flight = Flight.objects.create(
+            route=cls.route,
+            airline=cls.airline,
+            airplane=cls.airplane,
+            departure_time=at(8),
+            arrival_time=at(10),
+        )
+        cls.flight.crew.set(cls.crew[:2])
+
+
+class FindConflictsTests(ConflictsTestMixin, TestCase):
+    def test_conflicts_per_resource(self):
+        conflicts = find_conflicts(
+            flight_bookings(
+                None,
+                at(9),
+                at(11),
+                self.airplane.id,
+                [self.crew[1].id, self.crew[2].id],
+            )
+        )
+
+        self.assertEqual(
+            [(new.resource, new.resource_id, other.flight_id)
+             for new, other in conflicts],
+            [
+                (AIRPLANE, self.airplane.id, self.flight.id),
+                (CREW, self.crew[1].id, self.flight.id),
+            ],
+        )
+
+    def test_replaced_flight_is_excluded(self):
+        bookings = flight_bookings(
+            self.flight.id,
+            at(9),
+            at(11),
+            self.airplane.id,
+            [member.id for member in self.crew[:2]],
+        )
+
+        self.assertEqual(
+            find_conflicts(bookings, exclude=[self.flight.id]), []
+        )
+
+    def test_error_messages(self):
+        error = DoubleBookingError(
+            find_conflicts(
+                flight_bookings(None, at(9), at(11), self.airplane.id)
+            )
+        )
+
+        self.assertEqual(
+            error.errors,
+            {
+                AIRPLANE: [
+                    f"Airplane {self.airplane.id} of a new flight from "
+                    f"2024-06-03 09:00 to 2024-06-03 11:00 is already booked "
+                    f"by flight {self.flight.id} from 2024-06-03 08:00 to "
+                    f"2024-06-03 10:00."
+                ]
+            },
+        )
+
+
+class FlightConflictsApiTests(ConflictsTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+
+    def payload(self, **fields):
+        return {
+            "route": self.route.id,
+            "airline": self.airline.id,
+            "airplane": self.other_airplane.id,
+            "crew": [self.crew[2].id],
+            "departure_time": "2024-06-03 09:00",
+            "arrival_time": "2024-06-03 11:00",
+            **fields,
+        }
+
+    def test_create_with_free_resources(self):
+        res = self.client.post(FLIGHT_URL, self.payload(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_double_booking(self):
+        res = self.client.post(
+            FLIGHT_URL,
+            self.payload(
+                airplane=self.airplane.id,
+                crew=[member.id for member in self.crew],
+            ),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data["airplane"]), 1)
+        self.assertEqual(len(res.data["crew"]), 2)
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_arrival_after_departure(self):
+        res = self.client.post(
+            FLIGHT_URL,
+            self.payload(arrival_time="2024-06-03 09:00"),
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("arrival_time", res.data)
+
+    def test_update(self):
+        url = reverse("airport:flight-detail", args=[self.flight.id])
+        other = Flight.objects.create(
+            route=self.route,
+            airline=self.airline,
+            airplane=self.other_airplane,
+            departure_time=at(12),
+            arrival_time=at(14),
+        )
+        other.crew.set(self.crew[2:])
+
+        # moving a flight over its own times
+        res = self.client.patch(
+            url, {"arrival_time": "2024-06-03 11:00"}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.patch(
+            url,
+            {"crew": [self.crew[0].id, self.crew[2].id],
+             "arrival_time": "2024-06-03 13:00"},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(res.data), ["crew"])
+
+
+class ScheduleConflictsTests(ConflictsTestMixin, TestCase):
+    def schedule(self, crew, departure_time=time(9)):
+        # Mondays of June 2024, the first one overlapping the flight
+        return create_schedule(
+            route=self.route,
+            airplane=self.airplane,
+            airline=self.airline,
+            crew=crew,
+            weekdays=[1],
+            departure_time=departure_time,
+            duration=timedelta(hours=2),
+            start_date=date(2024, 6, 1),
+            end_date=date(2024, 6, 30),
+        )
+
+    def test_double_booking_creates_nothing(self):
+        with self.assertRaises(DoubleBookingError) as context:
+            self.schedule(self.crew[1:])
+
+        self.assertEqual(
+            {resource: len(messages)
+             for resource, messages in context.exception.errors.items()},
+            {AIRPLANE: 1, CREW: 1},
+        )
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_crew_added_to_existing_flights(self):
+        self.schedule(self.crew[:1], departure_time=time(12))
+        Flight.objects.create(
+            route=self.route,
+            airline=self.airline,
+            airplane=self.other_airplane,
+            departure_time=datetime(2024, 6, 10, 13),
+            arrival_time=datetime(2024, 6, 10, 15),
+        ).crew.add(self.crew[2])
+
+        with self.assertRaises(DoubleBookingError) as context:
+            self.schedule(self.crew[::2], departure_time=time(12))
+
+        [(booking, other)] = context.exception.conflicts
+        self.assertEqual(booking.resource_id, self.crew[2].id)
+        self.assertEqual(booking.start, datetime(2024, 6, 10, 12))
+
+    def test_api_and_command_report_conflicts(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+        res = client.post(
+            SCHEDULE_URL,
+            {
+                "route": self.route.id,
+                "airplane": self.airplane.id,
+                "airline": self.airline.id,
+                "weekdays": [1],
+                "departure_time": "09:00",
+                "duration": "02:00:00",
+                "start_date": "2024-06-01",
+                "end_date": "2024-06-30",
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(res.data), ["airplane"])
+
+        with self.assertRaisesMessage(CommandError, "already booked"):
+            call_command(
+                "create_flight_schedule",
+                f"--route={self.route.id}",
+                f"--airplane={self.airplane.id}",
+                f"--airline={self.airline.id}",
+                "--weekdays=1",
+                "--departure-time=09:00",
+                "--duration=02:00:00",
+                "--start-date=2024-06-01",
+                "--end-date=2024-06-30",
+                stdout=StringIO(),
+            )
+
+
+class BulkLoadConflictsTests(ConflictsTestMixin, TestCase):
+    def bulk_load(self, flights, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "flights.ndjson"
+            path.write_text(
+                "\n".join(
+                    json.dumps(
+                        {
+                            "route": self.route.id,
+                            "airline": self.airline.id,
+                            "airplane": self.airplane.id,
+                            **flight,
+                        }
+                    )
+                    for flight in flights
+                )
+            )
+            call_command(
+                "bulk_load_data",
+                str(path),
+                model="airport.flight",
+                stdout=StringIO(),
+                **options,
+            )
+
+    def test_double_bookings_are_rejected(self):
+        def flight(day, start, end, **fields):
+            return {
+                "departure_time": f"2024-06-{day:02}T{start:02}:00",
+                "arrival_time": f"2024-06-{day:02}T{end:02}:00",
+                **fields,
+            }
+
+        for flights in (
+            # overlapping the stored flight
+            [flight(3, 9, 11)],
+            # overlapping each other
+            [flight(4, 9, 11), flight(4, 10, 12)],
+            # a crew member of the stored flight
+            [
+                flight(
+                    3,
+                    9,
+                    11,
+                    airplane=self.other_airplane.id,
+                    crew=[self.crew[0].id],
+                )
+            ],
+        ):
+            with self.subTest(flights=flights):
+                with self.assertRaisesMessage(CommandError, "already booked"):
+                    self.bulk_load(flights)
+                self.assertEqual(Flight.objects.count(), 1)
+
+    def test_upserted_flight_replaces_its_booking(self):
+        self.bulk_load(
+            [
+                {
+                    "id": self.flight.id,
+                    "departure_time": "2024-06-03T09:00",
+                    "arrival_time": "2024-06-03T11:00",
+                }
+            ],
+            upsert=True,
+        )
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.departure_time, at(9))
+
+
+class AirplaneExclusionMigrationTests(ConflictsTestMixin, TestCase):
+    migration = import_module("airport.migrations.0008_airplane_exclusion")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # DDL fails on tables with pending deferred foreign key checks
+            connection.check_constraints()
+            with connection.schema_editor() as schema_editor:
+                schema_editor.remove_constraint(Flight, AIRPLANE_EXCLUSION)
+
+    def test_lists_double_booked_flights(self):
+        self.migration.check_airplane_double_bookings(Flight, "default")
+        other = Flight.objects.create(
+            route=self.route,
+            airline=self.airline,
+            airplane=self.airplane,
+            departure_time=at(9),
+            arrival_time=at(11),
+        )
+
+        with self.assertRaises(ValueError) as context:
+            self.migration.check_airplane_double_bookings(Flight, "default")
+
+        message = str(context.exception)
+        self.assertIn(
+            f"flight {self.flight.id}: airplane {self.airplane.id} "
+            f"from 2024-06-03 08:00 to 2024-06-03 10:00",
+            message,
+        )
+        self.assertIn(f"flight {other.id}: airplane", message)
@@ -0,0 +1,145 @@
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.db_router import (
+    PrimaryReplicaRouter,
+    is_stuck_to_primary,
+    read_from_replicas,
+)
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Flight, Order, Route
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaRoutingTests(TransactionTestCase):
+    # the replica mirrors the default database, only committed data is
+    # visible through both connections
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(name="Heathrow", code="LHR"),
+                destination=Airport.objects.create(name="Orly", code="ORY"),
+                distance=400,
+            ),
+            airline=Airline.objects.create(name="Test airline"),
+            airplane=Airplane.objects.create(
+                name="Test airplane",
+                rows=20,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(name="Test type"),
+            ),
+            departure_time="2024-05-01 10:00",
+            arrival_time="2024-05-01 12:00",
+        )
+
+    def request(self, method, url, data=None):
+        with CaptureQueriesContext(
+            connections["default"]
+        ) as primary, CaptureQueriesContext(connections["replica"]) as replica:
+            res = getattr(self.client, method)(url, data, format="json")
+        return res, len(primary), len(replica)
+
+    def order(self, seat=1):
+        return self.request(
+            "post",
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": seat, "flight": self.flight.id}]},
+        )
+
+    def test_safe_actions_read_from_replicas(self):
+        detail_url = reverse("airport:flight-detail", args=[self.flight.id])
+        for url in (FLIGHT_URL, detail_url):
+            with self.subTest(url=url):
+                res, primary, replica = self.request("get", url)
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(primary, 0)
+                self.assertGreater(replica, 0)
+
+    def test_writes_use_primary(self):
+        res, primary, replica = self.order()
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_orders_stick_to_primary_after_order(self):
+        res, primary, replica = self.request("get", ORDER_URL)
+        self.assertEqual(primary, 0)
+
+        self.order()
+        self.assertTrue(is_stuck_to_primary(self.user.id))
+
+        res, primary, replica = self.request("get", ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_stickiness_is_shared_by_worker_processes(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with override_settings(
+                CACHES={
+                    "default": {
+                        "BACKEND": "django.core.cache.backends.filebased."
+                        "FileBasedCache",
+                        "LOCATION": cache_dir,
+                    }
+                }
+            ):
+                self.order()
+                # the cache of a worker process that didn't take the order
+                other_worker = caches.create_connection("default")
+
+                with mock.patch("airport.db_router.cache", other_worker):
+                    res, primary, replica = self.request("get", ORDER_URL)
+
+        self.assertEqual(res.data["count"], 1)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_other_users_keep_reading_from_replicas(self):
+        self.order()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass")
+        )
+
+        res, primary, replica = self.request("get", ORDER_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_related_objects_read_from_instance_database(self):
+        router = PrimaryReplicaRouter()
+        order = Order.objects.create(user=self.user)
+
+        with read_from_replicas():
+            self.assertEqual(router.db_for_read(Order), "replica")
+            self.assertEqual(
+                router.db_for_read(Order, instance=order), "default"
+            )
+        self.assertEqual(router.db_for_read(Order), "default")
@@ -1,8 +1,11 @@
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import F, Count
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -11,9 +14,14 @@ from rest_framework import status
 from airport.models import (
     Flight, Airport, Route, Airline, Airplane, Crew, AirplaneType, Order, Ticket
 )
-from airport.serializers import FlightDetailSerializer, FlightListSerializer
+from airport.serializers import (
+    FlightDetailSerializer,
+    FlightListSerializer,
+    MAX_BATCH_FLIGHTS,
+)
 
 FLIGHT_URL = reverse("airport:flight-list")
+BATCH_URL = reverse("airport:flight-batch")
 
 
 def detail_url(flight_id):
@@ -113,8 +121,8 @@ class UnauthenticatedFlightApiTests(TestCase):
             airline=self.airline,
             airplane=self.airplane,
             route=route,
-            departure_time="2022-07-04 21:00",
-            arrival_time="2022-07-05 12:00",
+            departure_time="2022-08-04 21:00",
+            arrival_time="2022-08-05 12:00",
         )
 
         res = self.client.get(
@@ -138,8 +146,8 @@ class UnauthenticatedFlightApiTests(TestCase):
             airline=self.airline,
             airplane=self.airplane,
             route=route,
-            departure_time="2022-07-04 21:00",
-            arrival_time="2022-07-05 12:00",
+            departure_time="2022-08-04 21:00",
+            arrival_time="2022-08-05 12:00",
         )
 
         res = self.client.get(
@@ -223,6 +231,108 @@ class UnauthenticatedFlightApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class FlightBatchApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        crew = Crew.objects.create(first_name="John", last_name="Doe")
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user("test@test.com", "pass")
+        )
+        cls.flights = []
+        for day in range(1, 6):
+            flight = Flight.objects.create(
+                airline=Airline.objects.create(name=f"Airline {day}"),
+                airplane=airplane,
+                route=route,
+                departure_time=datetime(2024, 6, day, 8),
+                arrival_time=datetime(2024, 6, day, 10),
+            )
+            flight.crew.add(crew)
+            Ticket.objects.create(flight=flight, order=order, row=day, seat=1)
+            cls.flights.append(flight)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+
+    def batch(self, flights, **params):
+        ids = ",".join(str(flight.id) for flight in flights)
+        return self.client.get(BATCH_URL, {"ids": ids, **params})
+
+    def test_list_representations_in_requested_order(self):
+        flights = [self.flights[3], self.flights[0], self.flights[2]]
+
+        res = self.batch(flights)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["id"] for flight in res.data],
+            [flight.id for flight in flights],
+        )
+        self.assertEqual(res.data[0]["tickets_available"], 179)
+        self.assertEqual(
+            res.data[0].keys(), set(FlightListSerializer.Meta.fields)
+        )
+
+    def test_detail_representations(self):
+        flights = [self.flights[1], self.flights[0]]
+
+        res = self.batch(flights, detail=True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, FlightDetailSerializer(flights, many=True).data
+        )
+        self.assertEqual(
+            res.data[0]["taken_tickets"], [{"row": 2, "seat": 1}]
+        )
+
+    def test_queries_dont_grow_with_flights(self):
+        for params in ({}, {"detail": True}):
+            with self.subTest(params=params):
+                with CaptureQueriesContext(connection) as queries:
+                    self.batch(self.flights[:1], **params)
+                with self.assertNumQueries(len(queries)):
+                    res = self.batch(self.flights, **params)
+                self.assertEqual(len(res.data), len(self.flights))
+
+    def test_unknown_and_repeated_ids(self):
+        flight = self.flights[0]
+
+        res = self.client.get(
+            BATCH_URL, {"ids": f"{flight.id},{flight.id + 100},{flight.id}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([flight["id"] for flight in res.data], [flight.id])
+
+    def test_invalid_ids(self):
+        for ids in ("", "1,a", "1,,2", "0", "9" * 30):
+            with self.subTest(ids=ids):
+                res = self.client.get(BATCH_URL, {"ids": ids})
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(
+            BATCH_URL,
+            {"ids": ",".join(map(str, range(1, MAX_BATCH_FLIGHTS + 2)))},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", res.data)
+
+
 class AdminFlightApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,229 @@
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Route,
+)
+from airport.search import CODE_WEIGHT, WORD_WEIGHT, SearchIndex
+
+SEARCH_URL = reverse("airport:flight-search")
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+# PostgreSQL searches the tables, without an in-process index
+skip_on_postgresql = skipIf(
+    connection.vendor == "postgresql", "The in-process index isn't used"
+)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.index = SearchIndex(
+            [
+                (1, "Heathrow Airport", "LHR", "London"),
+                (2, "Gatwick Airport", "LGW", "London"),
+                (3, "Charles de Gaulle Airport", "CDG", "Paris"),
+            ],
+            [(1, "British Airways"), (2, "Air France")],
+        )
+
+    def test_lookup_matches_word_prefixes(self):
+        self.assertEqual(
+            self.index.lookup("lond"), ({1: WORD_WEIGHT, 2: WORD_WEIGHT}, {})
+        )
+        self.assertEqual(
+            self.index.lookup("air"),
+            ({1: WORD_WEIGHT, 2: WORD_WEIGHT, 3: WORD_WEIGHT},
+             {1: WORD_WEIGHT, 2: WORD_WEIGHT}),
+        )
+        self.assertEqual(self.index.lookup("rome"), ({}, {}))
+
+    def test_full_codes_outrank_words(self):
+        self.assertEqual(self.index.lookup("lhr"), ({1: CODE_WEIGHT}, {}))
+        self.assertEqual(
+            self.index.lookup("l"), ({1: WORD_WEIGHT, 2: WORD_WEIGHT}, {})
+        )
+
+
+class FlightSearchApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lhr, lgw, cdg, fco = [
+            Airport.objects.create(
+                name=name, code=code, closest_big_city=city
+            )
+            for name, code, city in (
+                ("Heathrow Airport", "LHR", "London"),
+                ("Gatwick Airport", "LGW", "London"),
+                ("Charles de Gaulle Airport", "CDG", "Paris"),
+                ("Fiumicino Airport", "FCO", "Rome"),
+            )
+        ]
+        emirates = Airline.objects.create(name="Emirates")
+        air_france = Airline.objects.create(name="Air France")
+        airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        departure = datetime(2024, 6, 1, 8)
+        cls.flights = {}
+        for key, source, destination, airline, hours in (
+            ("lhr_cdg_emirates", lhr, cdg, emirates, 3),
+            ("lgw_cdg_air_france", lgw, cdg, air_france, 2),
+            ("lhr_fco_air_france", lhr, fco, air_france, 1),
+            ("cdg_lhr_emirates", cdg, lhr, emirates, 0),
+        ):
+            cls.flights[key] = Flight.objects.create(
+                route=Route.objects.create(
+                    source=source, destination=destination, distance=400
+                ),
+                airline=airline,
+                airplane=airplane,
+                departure_time=departure + timedelta(hours=3 * hours),
+                arrival_time=departure + timedelta(hours=3 * hours + 2),
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "pass")
+        )
+
+    def search(self, text, **params):
+        return self.client.get(SEARCH_URL, {"q": text, **params})
+
+    def found(self, res):
+        ids = {flight.id: key for key, flight in self.flights.items()}
+        return [ids[row["id"]] for row in res.data["results"]]
+
+    def test_every_term_must_match(self):
+        res = self.search("london paris emirates")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.found(res), ["cdg_lhr_emirates", "lhr_cdg_emirates"]
+        )
+        self.assertEqual(res.data["results"][0]["airline"], "Emirates")
+        self.assertEqual(res.data["results"][0]["tickets_available"], 40)
+
+    def test_ranks_codes_before_words(self):
+        res = self.search("LHR")
+
+        self.assertEqual(
+            list(
+                zip(
+                    self.found(res),
+                    [row["rank"] for row in res.data["results"]],
+                )
+            ),
+            [
+                ("cdg_lhr_emirates", CODE_WEIGHT),
+                ("lhr_fco_air_france", CODE_WEIGHT),
+                ("lhr_cdg_emirates", CODE_WEIGHT),
+            ],
+        )
+
+        res = self.search("lond air")
+        self.assertEqual(
+            self.found(res),
+            [
+                "cdg_lhr_emirates",
+                "lhr_fco_air_france",
+                "lgw_cdg_air_france",
+                "lhr_cdg_emirates",
+            ],
+        )
+
+    def test_no_match(self):
+        for text in ("madrid", "london madrid"):
+            with self.subTest(text=text):
+                res = self.search(text)
+
+                self.assertEqual(res.data, {"next": None, "results": []})
+
+    def test_text_required(self):
+        for text in ("", "  ,. "):
+            with self.subTest(text=text):
+                res = self.search(text)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_pages(self):
+        Flight.objects.bulk_create(
+            Flight(
+                route=self.flights["lhr_cdg_emirates"].route,
+                airline=self.flights["lhr_cdg_emirates"].airline,
+                airplane=self.flights["lhr_cdg_emirates"].airplane,
+                departure_time=datetime(2024, 7, day, 8),
+                arrival_time=datetime(2024, 7, day, 10),
+            )
+            for day in range(1, 21)
+        )
+        expected = list(
+            Flight.objects.filter(
+                Q(route__source__code="CDG")
+                | Q(route__destination__code="CDG")
+            )
+            .order_by("departure_time", "id")
+            .values_list("id", flat=True)
+        )
+
+        ids = []
+        url = SEARCH_URL + "?q=paris"
+        while url:
+            res = self.client.get(url)
+            self.assertLessEqual(len(res.data["results"]), 10)
+            ids += [row["id"] for row in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor(self):
+        for cursor in ("nope", "WzEsMl0="):
+            with self.subTest(cursor=cursor):
+                res = self.search("paris", cursor=cursor)
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @skip_on_postgresql
+    def test_index_follows_airport_changes(self):
+        self.assertEqual(self.found(self.search("orly")), [])
+
+        Airport.objects.filter(code="CDG").update(name="Orly")
+        self.assertEqual(self.found(self.search("orly")), [])
+
+        Airport.objects.get(code="CDG").save()
+        self.assertEqual(len(self.found(self.search("orly"))), 3)
+
+    @skip_on_postgresql
+    def test_index_follows_changes_of_other_workers(self):
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={"default": {"BACKEND": FILE_CACHE, "LOCATION": cache_dir}}
+        ):
+            self.assertEqual(self.found(self.search("orly")), [])
+
+            # an airport renamed by another worker process
+            other_worker = caches.create_connection("default")
+            with mock.patch("airport.search.cache", other_worker):
+                airport = Airport.objects.get(code="CDG")
+                airport.name = "Orly"
+                airport.save()
+
+            self.assertEqual(len(self.found(self.search("orly"))), 3)
@@ -0,0 +1,256 @@
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.forecasting import (
+    cache_booking_curves,
+    fit_booking_curves,
+    get_booking_curves,
+)
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+
+FLIGHTS_URL = reverse("airport:forecast-flights")
+ROUTES_URL = reverse("airport:forecast-routes")
+
+
+class BookingCurvesTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        airports = [
+            Airport.objects.create(name=code, code=code)
+            for code in ("LHR", "CDG", "ORY")
+        ]
+        cls.busy_route, cls.quiet_route = [
+            Route.objects.create(
+                source=airports[0], destination=destination, distance=400
+            )
+            for destination in airports[1:]
+        ]
+        cls.airline = Airline.objects.create(name="Airline")
+        cls.airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=5,
+            seats_in_row=2,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        cls.user = get_user_model().objects.create_user("test@test.com", "a")
+
+        # 2 of the 4 seats sold of the busy route flights are booked 10
+        # days before departure, 2 the day before
+        for day in range(1, 6):
+            flight = cls.flight(cls.busy_route, datetime(2024, 6, day, 8))
+            cls.book(flight, (1, 2), days_before=10)
+            cls.book(flight, (3, 4), days_before=1)
+        # the quiet route sells out 30 days before departure
+        flight = cls.flight(cls.quiet_route, datetime(2024, 6, 1, 14))
+        cls.book(flight, range(1, 6), days_before=30)
+
+    @classmethod
+    def flight(cls, route, departure_time):
+        return Flight.objects.create(
+            route=route,
+            airline=cls.airline,
+            airplane=cls.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+
+    @classmethod
+    def book(cls, flight, rows, days_before):
+        order = Order.objects.create(user=cls.user)
+        Order.objects.filter(pk=order.pk).update(
+            created_at=flight.departure_time - timedelta(days=days_before)
+        )
+        Ticket.objects.bulk_create(
+            Ticket(order=order, flight=flight, row=row, seat=1)
+            for row in rows
+        )
+
+
+class FitBookingCurvesTests(BookingCurvesTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_route_curves(self):
+        curves = fit_booking_curves()
+        index = curves.route_index([self.busy_route.id])[0]
+
+        np.testing.assert_allclose(
+            curves.curves[index, [0, 1, 2, 10, 11]], [1, 1, 0.5, 0.5, 0]
+        )
+        self.assertEqual(curves.flights[index], 5)
+        self.assertAlmostEqual(curves.load_factors[index], 0.4)
+
+    def test_sparse_routes_use_curve_of_all_routes(self):
+        curves = fit_booking_curves()
+        quiet, unknown = curves.route_index([self.quiet_route.id, 0])
+
+        self.assertEqual(unknown, len(curves.route_ids))
+        np.testing.assert_array_equal(curves.curves[quiet], curves.curves[-1])
+        self.assertEqual(
+            curves.load_factors[quiet], curves.load_factors[-1]
+        )
+        self.assertEqual(curves.flights[-1], 6)
+        self.assertAlmostEqual(curves.load_factors[-1], 25 / 60)
+        # 5 of the 25 tickets are booked a month ahead
+        self.assertAlmostEqual(curves.curves[-1, 11], 0.2)
+
+    def test_predict_adds_usual_later_bookings(self):
+        curves = fit_booking_curves()
+
+        expected = curves.predict(
+            [self.busy_route.id] * 4, [5, 0, 5, 30], [1, 4, 10, 0], [10] * 4
+        )
+
+        np.testing.assert_allclose(expected, [3, 4, 10, 4])
+
+    def test_fit_without_history(self):
+        curves = fit_booking_curves(now=datetime(2000, 1, 1))
+
+        self.assertEqual(len(curves.route_ids), 0)
+        self.assertEqual(list(curves.predict([1], [3], [2], [10])), [2])
+
+    def test_curves_are_cached(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_booking_curves())
+        cache_booking_curves()
+
+        with self.assertNumQueries(0):
+            curves = get_booking_curves()
+        self.assertEqual(curves.flights[-1], 6)
+
+    def test_command_caches_curves(self):
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased."
+                    "FileBasedCache",
+                    "LOCATION": cache_dir,
+                }
+            }
+        ):
+            call_command("fit_demand_curves", stdout=out)
+
+            self.assertIsNotNone(cache.get("demand_forecast:curves"))
+        self.assertIn("Booking curves of 2 routes fitted", out.getvalue())
+
+    def test_command_requires_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, "REDIS_URL"):
+            call_command("fit_demand_curves", stdout=StringIO())
+
+        self.assertIsNone(cache.get("demand_forecast:curves"))
+
+
+class DemandForecastApiTests(BookingCurvesTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+        self.upcoming = self.flight(
+            self.busy_route, datetime.now() + timedelta(days=5)
+        )
+        self.book(self.upcoming, (1,), days_before=5)
+        cache_booking_curves()
+
+    def test_staff_required(self):
+        self.client.force_authenticate(self.user)
+
+        for url in (FLIGHTS_URL, ROUTES_URL):
+            with self.subTest(url=url):
+                res = self.client.get(url)
+
+                self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_upcoming_flight_forecasts(self):
+        quiet = self.flight(
+            self.quiet_route, datetime.now() + timedelta(days=40)
+        )
+
+        res = self.client.get(FLIGHTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (
+                    row["id"],
+                    row["source"],
+                    row["destination"],
+                    row["days_before"],
+                    row["seats_sold"],
+                    row["expected_seats_sold"],
+                    row["expected_load_factor"],
+                )
+                for row in res.data["results"]
+            ],
+            [
+                (self.upcoming.id, "LHR", "CDG", 5, 1, 3.0, 0.3),
+                (quiet.id, "LHR", "ORY", 40, 0, 4.2, 0.4167),
+            ],
+        )
+
+    def test_filter_flights(self):
+        self.flight(self.quiet_route, datetime.now() + timedelta(days=40))
+
+        res = self.client.get(FLIGHTS_URL, {"route": self.busy_route.id})
+        self.assertEqual(
+            [row["id"] for row in res.data["results"]], [self.upcoming.id]
+        )
+
+        date_from = (datetime.now() + timedelta(days=6)).date()
+        res = self.client.get(FLIGHTS_URL, {"date_from": date_from})
+        self.assertEqual(
+            [row["route"] for row in res.data["results"]],
+            [self.quiet_route.id],
+        )
+
+    def test_curves_not_fitted(self):
+        cache.clear()
+
+        for url in (FLIGHTS_URL, ROUTES_URL):
+            with self.subTest(url=url), self.assertNumQueries(0):
+                res = self.client.get(url)
+
+                self.assertEqual(
+                    res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+        self.assertIsNone(get_booking_curves())
+
+    def test_route_booking_curves(self):
+        res = self.client.get(ROUTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        busy, quiet = res.data["results"]
+        self.assertEqual(
+            (busy["route"], busy["flights"], busy["load_factor"]),
+            (self.busy_route.id, 5, 0.4),
+        )
+        self.assertEqual(
+            [busy["curve"][days] for days in ("0", "1", "3", "7", "14")],
+            [1.0, 1.0, 0.5, 0.5, 0.0],
+        )
+        self.assertEqual(quiet["route"], self.quiet_route.id)
@@ -0,0 +1,107 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from airport.conflicts import IntervalIndex, flight_bookings
+from airport.models import Airport, Flight, Order, Route, Ticket
+from airport.synthetic import airport_code
+
+OPTIONS = {
+    "airports": 10,
+    "airlines": 3,
+    "airplanes": 5,
+    "crews": 20,
+    "routes": 15,
+    "flights": 12,
+    "users": 8,
+    "tickets": 500,
+    "chunk_size": 100,
+}
+
+
+def generate_data(**options):
+    call_command("generate_data", stdout=io.StringIO(), **options)
+
+
+class GenerateDataTests(TestCase):
+    def test_generates_requested_rows(self):
+        generate_data(**OPTIONS)
+
+        self.assertEqual(Airport.objects.count(), 10)
+        self.assertEqual(Route.objects.count(), 15)
+        self.assertEqual(Flight.objects.count(), 12)
+        self.assertEqual(get_user_model().objects.count(), 8)
+        self.assertEqual(Ticket.objects.count(), 500)
+        self.assertFalse(
+            Flight.objects.annotate(crews=Count("crew"))
+            .filter(crews__lt=2)
+            .exists()
+        )
+
+    def test_tickets_are_valid(self):
+        generate_data(**OPTIONS)
+
+        for ticket in Ticket.objects.select_related("flight__airplane"):
+            ticket.full_clean()
+            self.assertLess(
+                ticket.order.created_at, ticket.flight.departure_time
+            )
+        self.assertFalse(
+            Route.objects.filter(source=F("destination")).exists()
+        )
+
+    def test_no_double_bookings(self):
+        generate_data(**{**OPTIONS, "airplanes": 2, "crews": 6})
+
+        index = IntervalIndex()
+        for flight in Flight.objects.prefetch_related("crew"):
+            for booking in flight_bookings(
+                flight.id,
+                flight.departure_time,
+                flight.arrival_time,
+                flight.airplane_id,
+                [member.id for member in flight.crew.all()],
+            ):
+                index.add(booking)
+
+        self.assertEqual(index.conflicts(), [])
+
+    def test_same_seed_gives_same_data(self):
+        generate_data(**OPTIONS, seed=7)
+        first = list(Ticket.objects.values_list("flight", "row", "seat"))
+        Order.objects.all().delete()
+        Flight.objects.all().delete()
+
+        generate_data(**OPTIONS, seed=7)
+        flight_offset = Flight.objects.order_by("pk").first().pk - 1
+        second = [
+            (flight - flight_offset, row, seat)
+            for flight, row, seat in Ticket.objects.values_list(
+                "flight", "row", "seat"
+            )
+        ]
+
+        self.assertEqual(len(first), 500)
+        self.assertEqual(second, first)
+
+    def test_generate_data_appends_to_existing_rows(self):
+        generate_data(**OPTIONS)
+        generate_data(**OPTIONS)
+
+        self.assertEqual(Airport.objects.count(), 20)
+        self.assertEqual(Ticket.objects.count(), 1000)
+
+    def test_too_many_tickets_for_flights(self):
+        with self.assertRaises(CommandError):
+            generate_data(**{**OPTIONS, "tickets": 100_000})
+
+        self.assertFalse(Airport.objects.exists())
+
+    def test_airport_codes_are_unique(self):
+        codes = [airport_code(num) for num in range(1, 20_000)]
+
+        self.assertEqual(len(set(codes)), len(codes))
+        self.assertEqual(airport_code(1), "BAB")
@@ -0,0 +1,258 @@
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.geo import (
+    KDTree,
+    chord_to_km,
+    great_circle_km,
+    km_to_chord,
+    unit_vectors,
+)
+from airport.locations import AirportLocations, update_route_distances
+from airport.models import Airport, Route
+
+NEAREST_URL = reverse("airport:airport-nearest")
+ROUTE_URL = reverse("airport:route-list")
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+LOCATIONS = {
+    "LHR": (51.47, -0.4543),
+    "LGW": (51.1537, -0.1821),
+    "CDG": (49.0097, 2.5479),
+    "JFK": (40.6413, -73.7781),
+}
+
+
+class GeoTests(TestCase):
+    def test_great_circle_km(self):
+        self.assertAlmostEqual(
+            great_circle_km(*LOCATIONS["LHR"], *LOCATIONS["JFK"]), 5540, 0
+        )
+        self.assertEqual(great_circle_km(10, 20, 10, 20), 0)
+        self.assertAlmostEqual(
+            great_circle_km(0, 0, 0, 180), np.pi * 6371.0088
+        )
+
+    def test_chords(self):
+        self.assertAlmostEqual(chord_to_km(km_to_chord(1234)), 1234)
+
+    def test_kd_tree_matches_brute_force(self):
+        rnd = np.random.default_rng(42)
+        latitudes = rnd.uniform(-90, 90, 500)
+        longitudes = rnd.uniform(-180, 180, 500)
+        tree = KDTree(unit_vectors(latitudes, longitudes))
+
+        for latitude, longitude, radius in ((0, 0, 2000), (60, 170, 800)):
+            distances = great_circle_km(
+                latitude, longitude, latitudes, longitudes
+            )
+            expected = [
+                index
+                for index in np.argsort(distances)[:5]
+                if distances[index] <= radius
+            ]
+
+            indexes, chords = tree.query(
+                unit_vectors([latitude], [longitude])[0],
+                5,
+                km_to_chord(radius),
+            )
+
+            self.assertEqual(indexes, expected)
+            np.testing.assert_allclose(
+                chord_to_km(np.array(chords)), distances[expected]
+            )
+
+    def test_empty_tree(self):
+        self.assertEqual(
+            KDTree(np.empty((0, 3))).query([1, 0, 0], 3), ([], [])
+        )
+
+
+class AirportLocationTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.airports = {
+            code: Airport.objects.create(
+                name=code,
+                code=code,
+                closest_big_city="City",
+                latitude=latitude,
+                longitude=longitude,
+            )
+            for code, (latitude, longitude) in LOCATIONS.items()
+        }
+        cls.unknown = Airport.objects.create(
+            name="Unknown", code="XXX", closest_big_city="Nowhere"
+        )
+
+
+class RouteDistanceTests(AirportLocationTestMixin, TestCase):
+    def test_distance_of_airports_with_location(self):
+        route = Route.objects.create(
+            source=self.airports["LHR"],
+            destination=self.airports["CDG"],
+            distance=1,
+        )
+
+        self.assertEqual(route.distance, 347)
+
+    def test_distance_of_airports_without_location(self):
+        route = Route.objects.create(
+            source=self.airports["LHR"], destination=self.unknown, distance=9
+        )
+
+        self.assertEqual(route.distance, 9)
+
+    def test_located_airport_updates_its_routes(self):
+        route = Route.objects.create(
+            source=self.unknown, destination=self.airports["LHR"], distance=9
+        )
+
+        self.unknown.latitude, self.unknown.longitude = LOCATIONS["CDG"]
+        self.unknown.save()
+
+        route.refresh_from_db()
+        self.assertEqual(route.distance, 347)
+
+    def test_update_route_distances(self):
+        Airport.objects.filter(pk=self.unknown.pk).update(
+            latitude=LOCATIONS["CDG"][0], longitude=LOCATIONS["CDG"][1]
+        )
+        route = Route.objects.create(
+            source=self.unknown, destination=self.airports["LHR"], distance=9
+        )
+
+        self.assertEqual(update_route_distances(), 1)
+        self.assertEqual(update_route_distances(), 0)
+
+        route.refresh_from_db()
+        self.assertEqual(route.distance, 347)
+
+    def test_route_api_distance(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+
+        res = client.post(
+            ROUTE_URL,
+            {
+                "source": self.airports["LHR"].id,
+                "destination": self.airports["JFK"].id,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["distance"], 5540)
+
+        res = client.post(
+            ROUTE_URL,
+            {
+                "source": self.airports["LHR"].id,
+                "destination": self.unknown.id,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("distance", res.data)
+
+        res = client.post(
+            reverse("airport:airport-list"),
+            {
+                "name": "Orly",
+                "code": "ORY",
+                "closest_big_city": "Paris",
+                "latitude": 48.7262,
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class NearestAirportsApiTests(AirportLocationTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "pass")
+        )
+
+    def nearest(self, **params):
+        # central London
+        params = {"latitude": 51.5072, "longitude": -0.1276, **params}
+        return self.client.get(NEAREST_URL, params)
+
+    def test_nearest_first(self):
+        res = self.nearest()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [airport["code"] for airport in res.data],
+            ["LHR", "LGW", "CDG", "JFK"],
+        )
+        self.assertAlmostEqual(res.data[0]["distance"], 23, 0)
+        self.assertEqual(res.data[0]["latitude"], LOCATIONS["LHR"][0])
+
+    def test_radius_and_limit(self):
+        res = self.nearest(radius=400)
+        self.assertEqual(
+            [airport["code"] for airport in res.data], ["LHR", "LGW", "CDG"]
+        )
+
+        res = self.nearest(radius=400, limit=1)
+        self.assertEqual([airport["code"] for airport in res.data], ["LHR"])
+
+    def test_invalid_params(self):
+        for params in (
+            {"latitude": 91},
+            {"longitude": "east"},
+            {"radius": -1},
+            {"limit": 0},
+            {"limit": 101},
+        ):
+            with self.subTest(params=params):
+                res = self.nearest(**params)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_airport_changes(self):
+        self.nearest()
+
+        self.unknown.latitude, self.unknown.longitude = 51.5, -0.12
+        self.unknown.save()
+        self.assertEqual(self.nearest(limit=1).data[0]["code"], "XXX")
+
+        self.unknown.delete()
+        self.assertEqual(self.nearest(limit=1).data[0]["code"], "LHR")
+
+    def test_index_follows_changes_of_other_workers(self):
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={"default": {"BACKEND": FILE_CACHE, "LOCATION": cache_dir}}
+        ):
+            self.nearest()
+
+            # an airport located by another worker process
+            other_worker = caches.create_connection("default")
+            with mock.patch("airport.locations.cache", other_worker):
+                self.unknown.latitude, self.unknown.longitude = 51.5, -0.12
+                self.unknown.save()
+
+            self.assertEqual(self.nearest(limit=1).data[0]["code"], "XXX")
+
+    def test_airports_without_location_are_not_indexed(self):
+        locations = AirportLocations.build()
+
+        self.assertEqual(len(locations.ids), len(LOCATIONS))
+        self.assertEqual(
+            [airport_id for airport_id, _ in locations.nearest(0, 0, 10)][-1],
+            self.airports["JFK"].id,
+        )
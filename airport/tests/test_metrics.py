@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Flight, Route
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+METRICS_URL = reverse("metrics")
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def setUpTestData(cls):
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Heathrow Airport",
+                code="LHR",
+                closest_big_city="London"
+            ),
+            destination=Airport.objects.create(
+                name="Charles de Gaulle Airport",
+                code="CDG",
+                closest_big_city="Paris"
+            ),
+            distance=400
+        )
+        cls.flight = Flight.objects.create(
+            route=route,
+            airline=Airline.objects.create(name="Test airline"),
+            airplane=Airplane.objects.create(
+                name="Test airplane",
+                rows=30,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(name="Test type"),
+            ),
+            departure_time="2024-06-01 10:00",
+            arrival_time="2024-06-01 12:00",
+        )
+
+    def book(self, row, seat):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": row, "seat": seat}]},
+            format="json",
+        )
+
+    def test_request_latency_and_queries(self):
+        labels = {"view": "airport:flight-list", "action": "list"}
+        requests = sample("airport_request_duration_seconds_count", **labels)
+        queries = sample("airport_request_db_queries_sum", **labels)
+
+        self.client.get(FLIGHT_URL)
+
+        self.assertEqual(
+            sample("airport_request_duration_seconds_count", **labels),
+            requests + 1,
+        )
+        self.assertEqual(
+            sample("airport_request_db_queries_sum", **labels), queries + 2
+        )
+        self.assertGreaterEqual(
+            sample("airport_requests_total", status="200", **labels), 1
+        )
+
+    def test_bookings_and_seat_conflicts(self):
+        bookings = sample("airport_bookings_total")
+        tickets = sample("airport_booked_tickets_total")
+        conflicts = sample("airport_seat_conflicts_total")
+
+        self.assertEqual(self.book(1, 1).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.book(1, 1).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+        self.assertEqual(sample("airport_bookings_total"), bookings + 1)
+        self.assertEqual(sample("airport_booked_tickets_total"), tickets + 1)
+        self.assertEqual(sample("airport_seat_conflicts_total"), conflicts + 1)
+
+    def test_throttled_requests(self):
+        labels = {"view": "airport:flight-list"}
+        throttled = sample("airport_throttled_requests_total", **labels)
+
+        for _ in range(31):
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(
+            sample("airport_throttled_requests_total", **labels),
+            throttled + 1,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.client.get(FLIGHT_URL)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            b'airport_request_duration_seconds_bucket{action="list",'
+            b'le="0.005",view="airport:flight-list"}',
+            res.content,
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_endpoint_without_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        with override_settings(DEBUG=True):
+            res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -94,6 +94,28 @@ class AuthenticatedOrderApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
 
+    def test_list_orders_queries(self):
+        for num in range(3):
+            flight = Flight.objects.create(
+                airline=Airline.objects.create(name=f"Airline {num}"),
+                airplane=self.airplane,
+                route=self.route,
+                departure_time=f"2022-06-0{num + 3} 14:00",
+                arrival_time=f"2022-06-0{num + 3} 20:00",
+            )
+            order = Order.objects.create(user=self.user)
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    flight=flight, order=order, row=1, seat=seat
+                )
+
+        # count, orders, tickets and flights with their relations
+        with self.assertNumQueries(4):
+            res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 3)
+
     def test_filter_list_orders_by_current_user(self):
         user_2 = get_user_model().objects.create_user(
             "test_2@test.com",
@@ -0,0 +1,392 @@
+import io
+from datetime import datetime
+from unittest import skipIf, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.conf import settings
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.partitions import (
+    DEFAULT_PARTITION,
+    TICKET_TABLE,
+    add_months,
+    create_partitions,
+    detach_partitions,
+    months_between,
+    partition_bounds,
+    partition_name,
+    rebuild_ticket_table,
+)
+
+# the last migration before the tickets are partitioned
+UNPARTITIONED = [("airport", "0004_airline_image_variants")]
+
+
+class PartitionMonthTests(TestCase):
+    def test_add_months(self):
+        self.assertEqual(
+            add_months(datetime(2024, 11, 1), 3), datetime(2025, 2, 1)
+        )
+        self.assertEqual(
+            add_months(datetime(2024, 1, 1), -1), datetime(2023, 12, 1)
+        )
+
+    def test_months_between(self):
+        self.assertEqual(
+            months_between(
+                datetime(2024, 11, 15, 10), datetime(2025, 1, 1)
+            ),
+            [datetime(2024, 11, 1), datetime(2024, 12, 1), datetime(2025, 1, 1)],
+        )
+
+    def test_partition_name(self):
+        self.assertEqual(
+            partition_name(datetime(2024, 3, 1)), "airport_ticket_p2024_03"
+        )
+
+    def test_partition_bounds(self):
+        self.assertEqual(
+            partition_bounds(datetime(2024, 12, 1)),
+            "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')",
+        )
+
+    @skipIf(connection.vendor == "postgresql", "Tickets are partitioned")
+    def test_commands_require_postgresql(self):
+        for command in ("create_ticket_partitions", "detach_ticket_partitions"):
+            with self.subTest(command=command):
+                with self.assertRaisesMessage(CommandError, "PostgreSQL"):
+                    call_command(command, stdout=io.StringIO())
+
+
+class TicketDepartureTimeTests(TestCase):
+    def setUp(self):
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=20,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airline=Airline.objects.create(name="Test airline"),
+            airplane=airplane,
+            departure_time=datetime(2024, 5, 1, 10),
+            arrival_time=datetime(2024, 5, 1, 12),
+        )
+        self.order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                "test@test.com", "testpass"
+            )
+        )
+
+    def test_copied_from_flight_on_save(self):
+        ticket = Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.departure_time, self.flight.departure_time)
+
+    def test_copied_from_flight_on_bulk_create(self):
+        Ticket.objects.bulk_create(
+            Ticket(flight_id=self.flight.id, order=self.order, row=1, seat=seat)
+            for seat in range(1, 4)
+        )
+
+        self.assertFalse(
+            Ticket.objects.exclude(
+                departure_time=self.flight.departure_time
+            ).exists()
+        )
+        self.assertEqual(self.flight.departure_tickets.count(), 3)
+
+    def test_follows_rescheduled_flight(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+
+        self.flight.departure_time = datetime(2024, 6, 1, 10)
+        self.flight.arrival_time = datetime(2024, 6, 1, 12)
+        self.flight.save()
+
+        self.assertEqual(
+            Ticket.objects.get().departure_time, datetime(2024, 6, 1, 10)
+        )
+
+    def test_full_clean_detects_booked_seat(self):
+        Ticket.objects.create(
+            flight=self.flight, order=self.order, row=1, seat=1
+        )
+
+        ticket = Ticket(flight=self.flight, order=self.order, row=1, seat=1)
+        with self.assertRaises(ValidationError):
+            ticket.full_clean()
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Tickets are only partitioned on PostgreSQL",
+)
+class TicketPartitionTests(TestCase):
+    # after the partitions the migration creates ahead
+    month = datetime(2040, 1, 1)
+
+    def setUp(self):
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=20,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        airline = Airline.objects.create(name="Test airline")
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                "test@test.com", "testpass"
+            )
+        )
+        self.tickets = [
+            Ticket.objects.create(
+                flight=Flight.objects.create(
+                    route=route,
+                    airline=airline,
+                    airplane=airplane,
+                    departure_time=departure_time,
+                    arrival_time=departure_time.replace(hour=12),
+                ),
+                order=order,
+                row=1,
+                seat=1,
+            )
+            for departure_time in (
+                datetime(2039, 12, 20, 10),
+                datetime(2040, 1, 10, 10),
+            )
+        ]
+        # DDL fails on tables with pending deferred foreign key checks
+        connection.check_constraints()
+
+    def query(self, sql, params=None):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def partition_of(self, ticket):
+        return self.query(
+            f"SELECT tableoid::regclass::text FROM {TICKET_TABLE} "
+            f"WHERE id = %s",
+            [ticket.id],
+        )[0][0]
+
+    def foreign_keys(self, table):
+        return self.query(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+
+    def test_rebuild_ticket_table(self):
+        with connection.schema_editor() as schema_editor:
+            rebuild_ticket_table(schema_editor, partitioned=False)
+        self.assertEqual(self.partition_of(self.tickets[0]), TICKET_TABLE)
+        connection.check_constraints()
+
+        with connection.schema_editor() as schema_editor:
+            rebuild_ticket_table(
+                schema_editor, partitioned=True, now=datetime(2039, 12, 1)
+            )
+
+        months = [datetime(2039, 12, 1), self.month]
+        for ticket, month in zip(self.tickets, months):
+            self.assertEqual(self.partition_of(ticket), partition_name(month))
+        self.assertEqual(
+            self.query(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [TICKET_TABLE],
+            ),
+            [("p",)],
+        )
+        self.assertEqual(len(self.foreign_keys(TICKET_TABLE)), 2)
+        ticket = Ticket.objects.create(
+            flight=self.tickets[1].flight,
+            order=self.tickets[1].order,
+            row=1,
+            seat=2,
+        )
+        self.assertGreater(ticket.id, self.tickets[1].id)
+
+    def test_create_partitions(self):
+        self.assertEqual(
+            self.partition_of(self.tickets[1]), DEFAULT_PARTITION
+        )
+
+        created = create_partitions(connection, [self.month])
+
+        self.assertEqual(created, [partition_name(self.month)])
+        self.assertEqual(
+            self.partition_of(self.tickets[1]), partition_name(self.month)
+        )
+        self.assertEqual(create_partitions(connection, [self.month]), [])
+
+    def test_detach_partitions(self):
+        create_partitions(connection, [self.month])
+        name = partition_name(self.month)
+
+        detached = detach_partitions(connection, add_months(self.month, 1))
+
+        self.assertIn(name, detached)
+        self.assertFalse(
+            Ticket.objects.filter(pk=self.tickets[1].id).exists()
+        )
+        self.assertEqual(
+            self.query(f"SELECT id FROM {name}"), [(self.tickets[1].id,)]
+        )
+        self.assertEqual(self.foreign_keys(name), [])
+
+    def test_detach_partitions_drop(self):
+        create_partitions(connection, [self.month])
+        name = partition_name(self.month)
+
+        detach_partitions(connection, add_months(self.month, 1), drop=True)
+
+        self.assertEqual(
+            self.query("SELECT to_regclass(%s)", [name]), [(None,)]
+        )
+
+
+@skipUnless(
+    connection.vendor == "postgresql",
+    "Tickets are only partitioned on PostgreSQL",
+)
+class TicketPartitionMigrationTests(TransactionTestCase):
+    def migrate(self, targets=()):
+        """Migrate to the targets and every other app to its latest
+        migration, and return the models of that state"""
+        executor = MigrationExecutor(connection)
+        apps = {app for app, _ in targets}
+        targets = [*targets] + [
+            node
+            for node in executor.loader.graph.leaf_nodes()
+            if node[0] not in apps
+        ]
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate()
+
+    def ticket_table(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+                [TICKET_TABLE],
+            )
+            relkind = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT id, tableoid::regclass::text FROM {TICKET_TABLE} "
+                f"ORDER BY id"
+            )
+            return relkind, cursor.fetchall()
+
+    def create_tickets(self, apps):
+        def model(name):
+            return apps.get_model("airport", name)
+
+        airplane = model("Airplane").objects.create(
+            name="Test airplane",
+            rows=20,
+            seats_in_row=6,
+            airplane_type=model("AirplaneType").objects.create(name="Type"),
+        )
+        route = model("Route").objects.create(
+            source=model("Airport").objects.create(name="Heathrow", code="LHR"),
+            destination=model("Airport").objects.create(
+                name="Orly", code="ORY"
+            ),
+            distance=400,
+        )
+        airline = model("Airline").objects.create(name="Test airline")
+        order = model("Order").objects.create(
+            user=apps.get_model(settings.AUTH_USER_MODEL).objects.create(
+                email="test@test.com"
+            )
+        )
+        for day in (datetime(2024, 5, 1), datetime(2024, 7, 1)):
+            flight = model("Flight").objects.create(
+                route=route,
+                airline=airline,
+                airplane=airplane,
+                departure_time=day.replace(hour=10),
+                arrival_time=day.replace(hour=12),
+            )
+            for seat in (1, 2):
+                model("Ticket").objects.create(
+                    flight=flight, order=order, row=1, seat=seat
+                )
+
+    def test_migrates_tickets_both_ways(self):
+        self.create_tickets(self.migrate(UNPARTITIONED))
+        relkind, tickets = self.ticket_table()
+        self.assertEqual(relkind, "r")
+        ids = [ticket_id for ticket_id, _ in tickets]
+
+        apps = self.migrate()
+
+        relkind, tickets = self.ticket_table()
+        self.assertEqual(relkind, "p")
+        self.assertEqual(
+            tickets,
+            [
+                (ids[0], "airport_ticket_p2024_05"),
+                (ids[1], "airport_ticket_p2024_05"),
+                (ids[2], "airport_ticket_p2024_07"),
+                (ids[3], "airport_ticket_p2024_07"),
+            ],
+        )
+        Ticket = apps.get_model("airport", "Ticket")
+        self.assertEqual(
+            [ticket.departure_time.month for ticket in Ticket.objects.all()],
+            [5, 5, 7, 7],
+        )
+        ticket = Ticket.objects.create(
+            flight_id=Ticket.objects.get(pk=ids[0]).flight_id,
+            order_id=Ticket.objects.get(pk=ids[0]).order_id,
+            departure_time=datetime(2024, 5, 1, 10),
+            row=2,
+            seat=1,
+        )
+        self.assertGreater(ticket.id, ids[-1])
+
+        self.migrate(UNPARTITIONED)
+
+        relkind, tickets = self.ticket_table()
+        self.assertEqual(relkind, "r")
+        self.assertEqual(
+            [ticket_id for ticket_id, _ in tickets], [*ids, ticket.id]
+        )
+        self.assertEqual(
+            {table for _, table in tickets}, {TICKET_TABLE}
+        )
@@ -0,0 +1,142 @@
+import marshal
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.serializers import UserTokenObtainPairSerializer
+
+FLIGHT_URL = reverse("airport:flight-list")
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+def profile_url(profile_id):
+    return reverse("airport:profile-detail", args=[profile_id])
+
+
+def stats_url(profile_id):
+    return reverse("airport:profile-stats", args=[profile_id])
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+
+    def authenticate(self, user):
+        token = UserTokenObtainPairSerializer.get_access_token(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_staff_request_profiled_by_header(self):
+        self.authenticate(self.admin)
+
+        res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        profile_id = res["X-Profile-Id"]
+        self.assertTrue(res["X-Profile-Url"].endswith(profile_url(profile_id)))
+
+        res = self.client.get(profile_url(profile_id))
+        self.assertEqual(res["Content-Type"], "application/octet-stream")
+        stats = marshal.loads(res.content)
+        self.assertIn(
+            "get_queryset",
+            {function_name for _, _, function_name in stats},
+        )
+
+    def test_staff_request_profiled_by_query_parameter(self):
+        self.authenticate(self.admin)
+
+        res = self.client.get(FLIGHT_URL, {"profile": "1"})
+
+        self.assertIn("X-Profile-Id", res)
+
+    def test_false_flag_not_profiled(self):
+        self.authenticate(self.admin)
+
+        for value in ("0", "false", "off", ""):
+            with self.subTest(value=value):
+                res = self.client.get(FLIGHT_URL, {"profile": value})
+                self.assertNotIn("X-Profile-Id", res)
+
+                res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE=value)
+                self.assertNotIn("X-Profile-Id", res)
+
+    def test_profiles_are_shared_by_worker_processes(self):
+        self.authenticate(self.admin)
+
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={"default": {"BACKEND": FILE_CACHE, "LOCATION": cache_dir}}
+        ):
+            profile_id = self.client.get(FLIGHT_URL, {"profile": "1"})[
+                "X-Profile-Id"
+            ]
+            # the cache of a worker process that didn't profile the request
+            other_worker = caches.create_connection("default")
+
+            with mock.patch("airport.profiling.cache", other_worker):
+                res = self.client.get(profile_url(profile_id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(marshal.loads(res.content))
+
+    def test_profile_stats(self):
+        self.authenticate(self.admin)
+        profile_id = self.client.get(FLIGHT_URL, {"profile": "1"})[
+            "X-Profile-Id"
+        ]
+
+        res = self.client.get(
+            stats_url(profile_id), {"sort": "tottime", "limit": 5}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        content = res.content.decode()
+        self.assertTrue(content.startswith(f"GET {FLIGHT_URL}?profile=1"))
+        self.assertIn("Ordered by: internal time", content)
+
+        res = self.client.get(stats_url(profile_id), {"sort": "unknown"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_staff_request_not_profiled(self):
+        self.authenticate(self.user)
+
+        res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", res)
+
+    def test_anonymous_request_not_profiled(self):
+        res = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")
+
+        self.assertNotIn("X-Profile-Id", res)
+
+    def test_only_staff_can_download_profiles(self):
+        self.authenticate(self.admin)
+        profile_id = self.client.get(FLIGHT_URL, HTTP_X_PROFILE="1")[
+            "X-Profile-Id"
+        ]
+        self.authenticate(self.user)
+
+        res = self.client.get(profile_url(profile_id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_profile(self):
+        self.authenticate(self.admin)
+
+        res = self.client.get(profile_url("abc123"))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
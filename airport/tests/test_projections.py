@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Crew, Flight, Order, Route,
+    Ticket
+)
+
+LIST_URLS = [
+    reverse("airport:airport-list"),
+    reverse("airport:airline-list"),
+    reverse("airport:airplanetype-list"),
+    reverse("airport:airplane-list"),
+    reverse("airport:crew-list"),
+    reverse("airport:route-list"),
+    reverse("airport:flight-list"),
+]
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProjectedListTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def setUpTestData(cls):
+        airlines = [
+            Airline.objects.create(
+                name="Test airline",
+                image=SimpleUploadedFile("logo.png", b"", "image/png"),
+                image_variants={
+                    "thumbnail": "uploads/airlines/logo-thumbnail.webp"
+                },
+            ),
+            Airline.objects.create(name="Airline without image"),
+        ]
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        heathrow = Airport.objects.create(
+            name="Heathrow Airport",
+            code="LHR",
+            closest_big_city="London"
+        )
+        routes = [
+            Route.objects.create(
+                source=heathrow,
+                destination=Airport.objects.create(
+                    name="Charles de Gaulle Airport",
+                    code="CDG",
+                    closest_big_city="Paris"
+                ),
+                distance=400
+            ),
+            Route.objects.create(
+                source=Airport.objects.create(
+                    name="Dubai International Airport",
+                    code="DXB",
+                    closest_big_city="Dubai"
+                ),
+                destination=heathrow,
+                distance=5500
+            ),
+        ]
+        crew = Crew.objects.create(first_name="John", last_name="Doe")
+        user = get_user_model().objects.create_user(
+            "buyer@test.com",
+            "testpass",
+        )
+        order = Order.objects.create(user=user)
+
+        for num in range(12):
+            flight = Flight.objects.create(
+                airline=airlines[num % 2],
+                airplane=airplane,
+                route=routes[num % 2],
+                departure_time=f"2022-06-{num + 1:02} 14:00",
+                arrival_time=f"2022-06-{num + 1:02} 20:00",
+            )
+            flight.crew.add(crew)
+            Ticket.objects.create(flight=flight, order=order, row=1, seat=1)
+
+    def assertSameAsSerializer(self, url, params=None):
+        res = self.client.get(url, params)
+        with override_settings(PROJECTED_LIST_RESPONSES=False):
+            expected = self.client.get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, expected.content)
+
+    def test_list_endpoints_match_serializers(self):
+        for url in LIST_URLS:
+            with self.subTest(url=url):
+                self.assertSameAsSerializer(url)
+
+    def test_filtered_flight_pages_match_serializer(self):
+        for params in (
+            {"page": 2},
+            {"source": "heathrow"},
+            {"destination": "heathrow"},
+        ):
+            with self.subTest(params=params):
+                self.assertSameAsSerializer(FLIGHT_URL, params)
+
+    def test_flight_list_query_count(self):
+        with self.assertNumQueries(2):
+            self.client.get(FLIGHT_URL)
@@ -0,0 +1,135 @@
+import io
+import shutil
+import tempfile
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Count, F
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Crew, Flight, Order, Route,
+    Ticket
+)
+from airport.parsers import ORJSONParser
+from airport.renderers import ORJSONRenderer
+from airport.serializers import (
+    FlightDetailSerializer, FlightListSerializer, OrderListSerializer
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ORJSONRendererTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        airline = Airline.objects.create(
+            name="Test airline",
+            image=SimpleUploadedFile("logo.png", b"", "image/png"),
+        )
+        airplane = Airplane.objects.create(
+            name="Test airplane",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=AirplaneType.objects.create(name="Test type"),
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Heathrow Airport",
+                code="LHR",
+                closest_big_city="London"
+            ),
+            destination=Airport.objects.create(
+                name="Aéroport Charles-de-Gaulle",
+                code="CDG",
+                closest_big_city="Paris"
+            ),
+            distance=400
+        )
+        cls.flight = Flight.objects.create(
+            airline=airline,
+            airplane=airplane,
+            route=route,
+            departure_time="2022-06-02 14:00",
+            arrival_time="2022-06-02 20:00",
+        )
+        cls.flight.crew.add(Crew.objects.create(first_name="John", last_name="Doe"))
+
+        user = get_user_model().objects.create_user("test@test.com", "testpass")
+        order = Order.objects.create(user=user)
+        for seat in range(1, 4):
+            Ticket.objects.create(
+                flight=cls.flight, order=order, row=1, seat=seat
+            )
+
+    def assertRendersLikeJSONRenderer(self, data):
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_flight_list_payload(self):
+        flights = Flight.objects.annotate(
+            tickets_available=F("airplane__rows")
+            * F("airplane__seats_in_row")
+            - Count("tickets")
+        )
+        data = FlightListSerializer(flights, many=True).data
+
+        self.assertRendersLikeJSONRenderer(data)
+
+    def test_flight_detail_payload(self):
+        self.assertRendersLikeJSONRenderer(
+            FlightDetailSerializer(self.flight).data
+        )
+
+    def test_order_list_payload(self):
+        data = OrderListSerializer(Order.objects.all(), many=True).data
+
+        self.assertRendersLikeJSONRenderer(data)
+
+    def test_non_native_types(self):
+        self.assertRendersLikeJSONRenderer(
+            {
+                "datetime": datetime(2024, 1, 10, 12, 30, 15, 123456),
+                "date": date(2024, 1, 10),
+                "time": time(12, 30),
+                "decimal": Decimal("12.50"),
+                "uuid": uuid.uuid4(),
+                "unicode": "line\u2028separator \u2029 ünïcode",
+                1: "integer key",
+                "big_int": 2 ** 70,
+            }
+        )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {"id": 1, "name": "Test"}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+
+class ORJSONParserTests(TestCase):
+    def test_parse_like_json_parser(self):
+        body = '{"tickets": [{"row": 1, "seat": 2, "flight": 3}], "é": 1.5}'
+
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body.encode())),
+            JSONParser().parse(io.BytesIO(body.encode())),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"tickets": '))
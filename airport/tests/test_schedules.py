@@ -0,0 +1,206 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+from airport.schedules import create_schedule, scheduled_departures
+
+SCHEDULE_URL = reverse("airport:schedule-list")
+
+
+class ScheduleTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.route = Route.objects.create(
+            source=Airport.objects.create(name="Heathrow", code="LHR"),
+            destination=Airport.objects.create(name="Orly", code="ORY"),
+            distance=400,
+        )
+        cls.airline = Airline.objects.create(name="Airline")
+        cls.airplane = Airplane.objects.create(
+            name="Airplane",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Type"),
+        )
+        cls.crew = [
+            Crew.objects.create(first_name=name, last_name="Doe")
+            for name in ("John", "Jane", "Jim")
+        ]
+
+    def payload(self, **fields):
+        return {
+            "route": self.route.id,
+            "airplane": self.airplane.id,
+            "airline": self.airline.id,
+            "crew": [member.id for member in self.crew[:2]],
+            # Mondays and Fridays of June 2024
+            "weekdays": [1, 5],
+            "departure_time": "08:30",
+            "duration": "02:15:00",
+            "start_date": "2024-06-01",
+            "end_date": "2024-06-30",
+            **fields,
+        }
+
+
+class CreateScheduleTests(ScheduleTestMixin, TestCase):
+    def schedule(self, crew, end_date=date(2024, 6, 30)):
+        return create_schedule(
+            route=self.route,
+            airplane=self.airplane,
+            airline=self.airline,
+            crew=crew,
+            weekdays=[1, 5],
+            departure_time=time(8, 30),
+            duration=timedelta(hours=2, minutes=15),
+            start_date=date(2024, 6, 1),
+            end_date=end_date,
+        )
+
+    def test_scheduled_departures(self):
+        self.assertEqual(
+            scheduled_departures(
+                date(2024, 6, 1), date(2024, 6, 10), [1, 5], time(8, 30)
+            ),
+            [
+                datetime(2024, 6, 3, 8, 30),
+                datetime(2024, 6, 7, 8, 30),
+                datetime(2024, 6, 10, 8, 30),
+            ],
+        )
+
+    def test_creates_flights_and_crew_with_bulk_inserts(self):
+        # savepoint, route lock, existing flights, airplane and crew
+        # locks, their bookings, flight insert, crew insert and release
+        with self.assertNumQueries(10):
+            result = self.schedule(self.crew[:2])
+
+        self.assertEqual(
+            result, {"created": 8, "existing": 0, "crew_links": 16}
+        )
+        flights = Flight.objects.filter(route=self.route)
+        self.assertEqual(
+            [flight.departure_time.day for flight in flights],
+            [3, 7, 10, 14, 17, 21, 24, 28],
+        )
+        self.assertEqual(
+            flights[0].arrival_time, datetime(2024, 6, 3, 10, 45)
+        )
+        self.assertEqual(
+            set(flights[0].crew.values_list("id", flat=True)),
+            {self.crew[0].id, self.crew[1].id},
+        )
+
+    def test_running_again_is_idempotent(self):
+        self.schedule(self.crew[:2])
+
+        result = self.schedule(self.crew[:2])
+
+        self.assertEqual(result, {"created": 0, "existing": 8, "crew_links": 0})
+        self.assertEqual(Flight.objects.count(), 8)
+        self.assertEqual(Flight.crew.through.objects.count(), 16)
+
+    def test_running_again_completes_schedule(self):
+        self.schedule(self.crew[:1], end_date=date(2024, 6, 15))
+
+        result = self.schedule(self.crew)
+
+        self.assertEqual(
+            result, {"created": 4, "existing": 4, "crew_links": 20}
+        )
+        self.assertEqual(Flight.crew.through.objects.count(), 24)
+
+
+class FlightScheduleApiTests(ScheduleTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "pass", is_staff=True
+            )
+        )
+
+    def test_staff_required(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "pass")
+        )
+
+        res = self.client.post(SCHEDULE_URL, self.payload(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_create_schedule(self):
+        res = self.client.post(SCHEDULE_URL, self.payload(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data, {"created": 8, "existing": 0, "crew_links": 16}
+        )
+
+        res = self.client.post(SCHEDULE_URL, self.payload(), format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, {"created": 0, "existing": 8, "crew_links": 0}
+        )
+
+    def test_invalid_schedules(self):
+        for fields in (
+            {"weekdays": []},
+            {"weekdays": [0, 8]},
+            {"duration": "00:00:00"},
+            {"end_date": "2024-05-31"},
+            {"end_date": "2025-06-02"},
+            {"crew": [0]},
+        ):
+            with self.subTest(fields=fields):
+                res = self.client.post(
+                    SCHEDULE_URL, self.payload(**fields), format="json"
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Flight.objects.exists())
+
+
+class CreateFlightScheduleCommandTests(ScheduleTestMixin, TestCase):
+    def call(self, **fields):
+        out = StringIO()
+        options = self.payload(**fields)
+        call_command(
+            "create_flight_schedule",
+            *[
+                f"--{name.replace('_', '-')}={value}"
+                for name, value in options.items()
+                if name not in ("crew", "weekdays")
+            ],
+            "--crew",
+            *map(str, options["crew"]),
+            "--weekdays",
+            *map(str, options["weekdays"]),
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_command_creates_schedule(self):
+        self.assertIn("8 flights created", self.call())
+        self.assertIn("0 flights created, 8 already scheduled", self.call())
+
+    def test_invalid_schedule(self):
+        with self.assertRaisesMessage(CommandError, "end_date"):
+            self.call(end_date="2024-05-01")
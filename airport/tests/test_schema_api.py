@@ -0,0 +1,98 @@
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiYamlRenderer
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import schema
+
+SCHEMA_URL = reverse("schema")
+SWAGGER_URL = reverse("swagger-ui")
+REDOC_URL = reverse("redoc")
+
+
+@override_settings(CODE_VERSION="v1")
+class PrecomputedSchemaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        schema.load_schema_artifact.cache_clear()
+        self.client = APIClient()
+        self.artifact_dir = tempfile.mkdtemp()
+        settings_override = override_settings(
+            SCHEMA_ARTIFACT_DIR=self.artifact_dir
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def artifact_names(self):
+        return sorted(path.name for path in Path(self.artifact_dir).iterdir())
+
+    def test_generate_schema_command(self):
+        call_command("generate_schema", stdout=tempfile.TemporaryFile("w"))
+
+        self.assertEqual(
+            self.artifact_names(),
+            [
+                "openapi-v1.json",
+                "openapi-v1.json.gz",
+                "openapi-v1.yaml",
+                "openapi-v1.yaml.gz",
+            ],
+        )
+
+    def test_schema_is_served_from_artifact(self):
+        res = self.client.get(SCHEMA_URL)
+
+        expected = OpenApiYamlRenderer().render(
+            SchemaGenerator().get_schema(request=None, public=True)
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, expected)
+        self.assertEqual(
+            res.content,
+            (Path(self.artifact_dir) / "openapi-v1.yaml").read_bytes(),
+        )
+        self.assertIn("ETag", res)
+        self.assertIn("max-age", res["Cache-Control"])
+
+    def test_json_schema(self):
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["info"]["title"], "Airport Service API")
+
+    def test_schema_not_modified(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_regenerated_for_new_code_version(self):
+        self.client.get(SCHEMA_URL)
+
+        with override_settings(CODE_VERSION="v2"):
+            res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("openapi-v2.yaml", self.artifact_names())
+        self.assertNotIn("openapi-v1.yaml", self.artifact_names())
+
+    def test_doc_pages_have_cache_headers(self):
+        for url in (SWAGGER_URL, REDOC_URL):
+            with self.subTest(url=url):
+                res = self.client.get(url)
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertIn("max-age", res["Cache-Control"])
+
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+                self.assertEqual(
+                    res.status_code, status.HTTP_304_NOT_MODIFIED
+                )
@@ -0,0 +1,133 @@
+import importlib
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from airport.checks import check_shared_cache
+
+BROWSABLE_API_RENDERER = "rest_framework.renderers.BrowsableAPIRenderer"
+SPECTACULAR_SCHEMA = "drf_spectacular.openapi.AutoSchema"
+REDIS_CACHE = "django.core.cache.backends.redis.RedisCache"
+LOCMEM_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+# a cold start of a worker, with every view imported
+SPECTACULAR_LOADED_SCRIPT = """
+import sys
+from django.urls import get_resolver
+from airport_service.wsgi import application
+get_resolver().url_patterns
+print("drf_spectacular" in sys.modules)
+"""
+
+
+def load_settings(name, **environ):
+    with mock.patch.dict(os.environ, environ):
+        module = importlib.import_module(f"airport_service.settings.{name}")
+        return importlib.reload(module)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_dev_settings_include_development_tools(self):
+        dev = load_settings("dev")
+
+        self.assertTrue(dev.DEBUG)
+        self.assertIn("debug_toolbar", dev.INSTALLED_APPS)
+        self.assertIn("drf_spectacular", dev.INSTALLED_APPS)
+        self.assertIn(
+            "debug_toolbar.middleware.DebugToolbarMiddleware", dev.MIDDLEWARE
+        )
+        self.assertIn(
+            BROWSABLE_API_RENDERER,
+            dev.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"],
+        )
+
+    def test_prod_settings_exclude_development_tools(self):
+        prod = load_settings("prod", DJANGO_ALLOWED_HOSTS="", SERVE_API_DOCS="")
+
+        self.assertFalse(prod.DEBUG)
+        self.assertNotIn("debug_toolbar", prod.INSTALLED_APPS)
+        self.assertNotIn("drf_spectacular", prod.INSTALLED_APPS)
+        self.assertNotIn("DEFAULT_SCHEMA_CLASS", prod.REST_FRAMEWORK)
+        self.assertFalse(
+            any("debug_toolbar" in middleware for middleware in prod.MIDDLEWARE)
+        )
+        self.assertNotIn(
+            BROWSABLE_API_RENDERER,
+            prod.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"],
+        )
+
+    def test_prod_settings_read_hosts_and_docs_from_environment(self):
+        prod = load_settings(
+            "prod",
+            DJANGO_ALLOWED_HOSTS="api.example.com, example.com,",
+            SERVE_API_DOCS="1",
+        )
+
+        self.assertEqual(prod.ALLOWED_HOSTS, ["api.example.com", "example.com"])
+        self.assertIn("drf_spectacular", prod.INSTALLED_APPS)
+        self.assertEqual(
+            prod.REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"], SPECTACULAR_SCHEMA
+        )
+
+    def spectacular_loaded(self, **environ):
+        environ = {
+            **os.environ,
+            "DJANGO_SECRET_KEY": "secret",
+            "POSTGRES_DB": "airport",
+            "POSTGRES_USER": "airport",
+            "POSTGRES_PASSWORD": "airport",
+            "DJANGO_SETTINGS_MODULE": "airport_service.settings.prod",
+            **environ,
+        }
+        environ.pop("PYTHONPATH", None)
+        result = subprocess.run(
+            [sys.executable, "-c", SPECTACULAR_LOADED_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=environ,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+
+    def test_prod_workers_dont_load_drf_spectacular(self):
+        self.assertEqual(self.spectacular_loaded(SERVE_API_DOCS=""), "False")
+        self.assertEqual(self.spectacular_loaded(SERVE_API_DOCS="1"), "True")
+
+    def test_base_settings_are_not_modified_by_profiles(self):
+        base = importlib.import_module("airport_service.settings.base")
+        load_settings("dev")
+
+        self.assertNotIn("debug_toolbar", base.INSTALLED_APPS)
+        self.assertNotIn(
+            "debug_toolbar.middleware.DebugToolbarMiddleware", base.MIDDLEWARE
+        )
+
+    def test_prod_settings_use_shared_cache(self):
+        prod = load_settings("prod", SERVE_API_DOCS="")
+
+        self.assertEqual(prod.CACHES["default"]["BACKEND"], REDIS_CACHE)
+
+    def test_dev_settings_use_process_cache_without_redis(self):
+        dev = load_settings("dev", REDIS_URL="")
+        self.assertEqual(dev.CACHES["default"]["BACKEND"], LOCMEM_CACHE)
+
+        dev = load_settings("dev", REDIS_URL="redis://cache:6379/1")
+        self.assertEqual(dev.CACHES["default"]["BACKEND"], REDIS_CACHE)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES={"default": {"BACKEND": LOCMEM_CACHE}})
+    def test_process_local_cache(self):
+        self.assertEqual(
+            [error.id for error in check_shared_cache(None)], ["airport.W001"]
+        )
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": REDIS_CACHE, "LOCATION": "redis://"}}
+    )
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,140 @@
+import json
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport import slow_queries
+from airport.models import Airport
+
+AIRPORT_URL = reverse("airport:airport-list")
+SLOW_QUERY_URL = reverse("airport:slow-query-list")
+SLOW_QUERY_EXPORT_URL = reverse("airport:slow-query-export")
+SLOW_QUERY_CLEAR_URL = reverse("airport:slow-query-clear")
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+@override_settings(
+    SLOW_QUERY_THRESHOLD_MS=0.000001,
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1,
+    SLOW_QUERY_LOG_SIZE=3,
+)
+class SlowQueryCaptureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            "admin@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        Airport.objects.create(
+            name="Heathrow Airport", code="LHR", closest_big_city="London"
+        )
+
+        patcher = mock.patch.object(slow_queries, "schedule_explain")
+        self.schedule_explain = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_slow_query_is_captured(self):
+        self.client.get(AIRPORT_URL, {"code": "LHR"})
+
+        entry = slow_queries.get_slow_queries()[0]
+        self.assertEqual(entry["view"], "airport:airport-list")
+        self.assertEqual(entry["action"], "list")
+        self.assertEqual(entry["method"], "GET")
+        self.assertIn('FROM "airport_airport"', entry["sql"])
+        self.assertIsNone(entry["plan"])
+        self.schedule_explain.assert_called_with(
+            entry["id"], "default", entry["sql"], mock.ANY
+        )
+
+    def test_writes_are_not_explained(self):
+        self.client.post(
+            AIRPORT_URL,
+            {"name": "Gatwick", "code": "LGW", "closest_big_city": "London"},
+        )
+
+        entry = slow_queries.get_slow_queries()[0]
+        self.assertTrue(entry["sql"].startswith("INSERT"))
+        self.assertEqual(entry["params"][:2], ["Gatwick", "LGW"])
+        explained = [call.args[2] for call in self.schedule_explain.mock_calls]
+        self.assertNotIn(entry["sql"], explained)
+
+    @override_settings(SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0)
+    def test_explain_sampling(self):
+        self.client.get(AIRPORT_URL)
+
+        self.assertTrue(slow_queries.get_slow_queries())
+        self.schedule_explain.assert_not_called()
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_capture_disabled(self):
+        self.client.get(AIRPORT_URL)
+
+        self.assertEqual(slow_queries.get_slow_queries(), [])
+
+    def test_ring_buffer_keeps_newest_captures(self):
+        for num in range(5):
+            slow_queries.record_slow_query({"sql": f"SELECT {num}"})
+
+        self.assertEqual(
+            [entry["sql"] for entry in slow_queries.get_slow_queries()],
+            ["SELECT 4", "SELECT 3", "SELECT 2"],
+        )
+
+    def test_captures_are_shared_by_worker_processes(self):
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES={"default": {"BACKEND": FILE_CACHE, "LOCATION": cache_dir}}
+        ):
+            self.client.get(AIRPORT_URL, {"code": "LHR"})
+            # the cache of a worker process that didn't run the query
+            other_worker = caches.create_connection("default")
+
+            with mock.patch.object(slow_queries, "cache", other_worker):
+                entries = slow_queries.get_slow_queries()
+
+        self.assertEqual(entries[0]["view"], "airport:airport-list")
+
+    def test_explain_slow_query(self):
+        entry_id = slow_queries.record_slow_query({"plan": None})
+
+        slow_queries.explain_slow_query(
+            entry_id,
+            "default",
+            'SELECT "id" FROM "airport_airport" WHERE "code" = %s',
+            ["LHR"],
+        )
+
+        self.assertTrue(slow_queries.get_slow_queries()[0]["plan"])
+
+    def test_list_export_and_clear(self):
+        self.client.get(AIRPORT_URL)
+
+        res = self.client.get(SLOW_QUERY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["view"], "airport:airport-list")
+
+        res = self.client.get(SLOW_QUERY_EXPORT_URL)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = res.content.decode().splitlines()
+        self.assertEqual(json.loads(lines[-1])["view"], "airport:airport-list")
+
+        res = self.client.post(SLOW_QUERY_CLEAR_URL)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(slow_queries.get_slow_queries(), [])
+
+    def test_only_staff_can_view_captures(self):
+        user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(SLOW_QUERY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
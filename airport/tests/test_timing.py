@@ -0,0 +1,110 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airline, Airplane, AirplaneType, Airport, Flight, Route
+)
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    @classmethod
+    def setUpTestData(cls):
+        route = Route.objects.create(
+            source=Airport.objects.create(
+                name="Heathrow Airport",
+                code="LHR",
+                closest_big_city="London"
+            ),
+            destination=Airport.objects.create(
+                name="Charles de Gaulle Airport",
+                code="CDG",
+                closest_big_city="Paris"
+            ),
+            distance=400
+        )
+        cls.flight = Flight.objects.create(
+            route=route,
+            airline=Airline.objects.create(name="Test airline"),
+            airplane=Airplane.objects.create(
+                name="Test airplane",
+                rows=30,
+                seats_in_row=6,
+                airplane_type=AirplaneType.objects.create(name="Test type"),
+            ),
+            departure_time="2024-06-01 10:00",
+            arrival_time="2024-06-01 12:00",
+        )
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_no_timing_when_sampling_is_off(self):
+        with self.assertNoLogs("airport.timing"):
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_server_timing_header(self):
+        with self.assertNumQueries(2), self.assertLogs("airport.timing"):
+            res = self.client.get(FLIGHT_URL)
+
+        metrics = parse_server_timing(res["Server-Timing"])
+        self.assertEqual(
+            list(metrics), ["db", "serializer", "render", "total"]
+        )
+        self.assertEqual(metrics["db"]["desc"], '"2 queries"')
+        for metric in metrics.values():
+            self.assertGreaterEqual(float(metric["dur"]), 0)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_serializer_time_of_detail_and_write_actions(self):
+        url = reverse("airport:flight-detail", args=[self.flight.id])
+        with self.assertLogs("airport.timing"):
+            res = self.client.get(url)
+        self.assertIn("serializer", parse_server_timing(res["Server-Timing"]))
+
+        with self.assertLogs("airport.timing"):
+            res = self.client.patch(
+                url, {"departure_time": "2024-06-01 11:00"}
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("serializer", parse_server_timing(res["Server-Timing"]))
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_timing_log_line(self):
+        with self.assertLogs("airport.timing", "INFO") as logs:
+            self.client.get(FLIGHT_URL, {"source": "Heathrow"})
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["method"], "GET")
+        self.assertEqual(record["path"], FLIGHT_URL)
+        self.assertEqual(record["view"], "airport:flight-list")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["queries"], 2)
+        for key in ("db_ms", "serializer_ms", "render_ms", "total_ms"):
+            self.assertIn(key, record)
@@ -0,0 +1,110 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """
+    Durations (in seconds) and query count of one sampled request.
+
+    Installed as a database execute wrapper, it times every query.
+    Named durations may overlap, e.g. serializer time includes the
+    queries of lazily evaluated relations.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.queries = 0
+
+    def add(self, name, duration):
+        self.durations[name] = self.durations.get(name, 0) + duration
+
+    @contextmanager
+    def measure(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", time.perf_counter() - started)
+            self.queries += 1
+
+    def as_header(self):
+        metrics = []
+        for name, duration in self.durations.items():
+            metric = f"{name};dur={duration * 1000:.1f}"
+            if name == "db":
+                metric += f';desc="{self.queries} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def as_log_record(self, request, response):
+        match = request.resolver_match
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": self.queries,
+        }
+        for name, duration in self.durations.items():
+            record[f"{name}_ms"] = round(duration * 1000, 2)
+        return record
+
+
+def get_timings(request):
+    """Return the `RequestTimings` of a sampled request, else `None`"""
+    return getattr(request, "server_timing", None)
+
+
+@contextmanager
+def measure(request, name):
+    timings = get_timings(request)
+    if timings is None:
+        yield
+        return
+
+    with timings.measure(name):
+        yield
+
+
+def log_timings(request, response, timings):
+    logger.info(
+        json.dumps(timings.as_log_record(request, response), sort_keys=True)
+    )
+
+
+class TimedSerializer:
+    """Proxy of a serializer timing the evaluation of its `data`"""
+
+    def __init__(self, serializer, timings):
+        self._serializer = serializer
+        self._timings = timings
+
+    def __getattr__(self, name):
+        return getattr(self._serializer, name)
+
+    @property
+    def data(self):
+        with self._timings.measure("serializer"):
+            return self._serializer.data
+
+
+class ServerTimingMixin:
+    """Measure the serializer time of requests sampled for timing"""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        timings = get_timings(self.request)
+        if timings is None:
+            return serializer
+        return TimedSerializer(serializer, timings)
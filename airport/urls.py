@@ -9,7 +9,12 @@ from airport.views import (
     RouteViewSet,
     CrewViewSet,
     FlightViewSet,
+    FlightScheduleViewSet,
     OrderViewSet,
+    LoadFactorViewSet,
+    DemandForecastViewSet,
+    SlowQueryViewSet,
+    ProfileViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -20,7 +25,16 @@ router.register("airplanes", AirplaneViewSet)
 router.register("crews", CrewViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
+router.register("schedules", FlightScheduleViewSet, basename="schedule")
 router.register("orders", OrderViewSet)
+router.register(
+    "analytics/load-factors", LoadFactorViewSet, basename="load-factor"
+)
+router.register(
+    "analytics/forecasts", DemandForecastViewSet, basename="forecast"
+)
+router.register("slow-queries", SlowQueryViewSet, basename="slow-query")
+router.register("profiles", ProfileViewSet, basename="profile")
 
 
 urlpatterns = [path("", include(router.urls))]
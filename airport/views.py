@@ -1,12 +1,29 @@
-from django.db.models import Count, F
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from datetime import datetime
+
+import orjson
+from django.db import DEFAULT_DB_ALIAS, IntegrityError
+from django.db.models import Count, F, Prefetch
+from django.http import HttpResponse
 from rest_framework import mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    APIException,
+    NotFound,
+    ValidationError,
+)
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.viewsets import GenericViewSet
-
+from rest_framework.viewsets import GenericViewSet, ViewSet
+
+from airport.analytics import load_factors
+from airport.conflicts import DoubleBookingError
+from airport.db_router import is_stuck_to_primary, stick_to_primary
+from airport.forecasting import forecast_flights, get_booking_curves
+from airport.images import discard_image_variants, schedule_image_variants
+from airport.large_tables import MAX_ID
+from airport.locations import get_airport_locations
+from airport.metrics import BOOKED_TICKETS, BOOKINGS, SEAT_CONFLICTS
 from airport.models import (
     Airport,
     AirplaneType,
@@ -16,13 +33,30 @@ from airport.models import (
     Route,
     Flight,
     Order,
+    DailyLoad,
+    prefetch_departure_tickets,
 )
+from airport.openapi import extend_schema, OpenApiParameter
 from airport.permissions import (
     IsAdminOrIfAuthenticatedReadOnly,
     ReadOnlyOrAdminPermission
 )
+from airport.pagination import KeysetCursorPagination
+from airport.profiling import format_stats, load_profile
+from airport.projections import (
+    ProjectedListModelMixin,
+    AIRPORT_LIST_PROJECTION,
+    AIRLINE_LIST_PROJECTION,
+    AIRPLANE_TYPE_LIST_PROJECTION,
+    AIRPLANE_LIST_PROJECTION,
+    CREW_LIST_PROJECTION,
+    ROUTE_LIST_PROJECTION,
+    FLIGHT_LIST_PROJECTION,
+)
 from airport.serializers import (
     AirportSerializer,
+    NearbyAirportFilterSerializer,
+    NearbyAirportSerializer,
     AirlineSerializer,
     AirlineListSerializer,
     AirlineImageSerializer,
@@ -34,29 +68,83 @@ from airport.serializers import (
     RouteDetailSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
+    FlightBatchFilterSerializer,
+    FlightSearchSerializer,
+    FlightScheduleSerializer,
+    FlightScheduleResultSerializer,
     FlightSerializer,
+    MAX_BATCH_FLIGHTS,
     OrderSerializer,
     OrderListSerializer,
+    SEAT_BOOKED_MESSAGE,
+    SlowQuerySerializer,
+    DateRangeSerializer,
+    RouteLoadFactorSerializer,
+    AirlineLoadFactorSerializer,
+    AirplaneTypeLoadFactorSerializer,
+    ForecastFilterSerializer,
+    FlightForecastSerializer,
+    RouteBookingCurveSerializer,
 )
+from airport.schedules import create_schedule
+from airport.search import search_flights
+from airport.slow_queries import clear_slow_queries, get_slow_queries
+from airport.timing import ServerTimingMixin
 
 
 class AirportViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    list_projection = AIRPORT_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(
+        parameters=[NearbyAirportFilterSerializer],
+        responses=NearbyAirportSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        serializer_class=NearbyAirportSerializer,
+    )
+    def nearest(self, request):
+        """
+        Airports nearest to a point, within a radius in kilometers,
+        nearest first
+        """
+        params = NearbyAirportFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = self.get_queryset()
+        distances = dict(
+            get_airport_locations(queryset.db).nearest(**params.validated_data)
+        )
+        airports = queryset.in_bulk(distances)
+        nearest = []
+        for airport_id, distance in distances.items():
+            # skip the airports deleted since the index was built
+            if airport_id in airports:
+                airports[airport_id].distance = distance
+                nearest.append(airports[airport_id])
+
+        serializer = self.get_serializer(nearest, many=True)
+        return Response(serializer.data)
+
 
 class AirlineViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Airline.objects.all()
     serializer_class = AirlineSerializer
+    list_projection = AIRLINE_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_serializer_class(self):
@@ -80,49 +168,59 @@ class AirlineViewSet(
         serializer = self.get_serializer(airline, data=request.data)
 
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        discard_image_variants(airline.image_variants)
+        serializer.save(image_variants={})
+        schedule_image_variants(airline)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class AirplaneTypeViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    list_projection = AIRPLANE_TYPE_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class AirplaneViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
     mixins.RetrieveModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
+    list_projection = AIRPLANE_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class CrewViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
+    list_projection = CREW_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class RouteViewSet(
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
     mixins.RetrieveModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
+    list_projection = ROUTE_LIST_PROJECTION
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_serializer_class(self):
@@ -138,17 +236,24 @@ class FlightPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class FlightSearchPagination(KeysetCursorPagination):
+    page_size = 10
+    ordering = ("-rank", "departure_time", "id")
+
+
 class FlightViewSet(
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
-    mixins.ListModelMixin,
+    ProjectedListModelMixin,
     mixins.RetrieveModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Flight.objects.select_related(
         "airplane", "route__source", "route__destination", "airline"
     ).prefetch_related("crew")
     serializer_class = FlightSerializer
+    list_projection = FLIGHT_LIST_PROJECTION
     pagination_class = FlightPagination
     permission_classes = (ReadOnlyOrAdminPermission,)
 
@@ -157,6 +262,14 @@ class FlightViewSet(
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
+    @staticmethod
+    def _annotate_tickets_available(queryset):
+        return queryset.annotate(
+            tickets_available=F("airplane__rows")
+            * F("airplane__seats_in_row")
+            - Count("tickets")
+        )
+
     def get_queryset(self):
         source = self.request.query_params.get("source")
         destination = self.request.query_params.get("destination")
@@ -173,12 +286,10 @@ class FlightViewSet(
                 route__destination__name__icontains=destination
             )
 
-        if self.action == "list":
-            queryset = queryset.annotate(
-                tickets_available=F("airplane__rows")
-                * F("airplane__seats_in_row")
-                - Count("tickets")
-            ).order_by("departure_time")
+        if self.action in ("list", "search"):
+            queryset = self._annotate_tickets_available(queryset).order_by(
+                "departure_time"
+            )
 
         return queryset
 
@@ -187,6 +298,8 @@ class FlightViewSet(
             return FlightListSerializer
         if self.action == "retrieve":
             return FlightDetailSerializer
+        if self.action == "search":
+            return FlightSearchSerializer
 
         return FlightSerializer
 
@@ -208,6 +321,118 @@ class FlightViewSet(
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=str,
+                required=True,
+                description="Words of airport names, codes, cities or "
+                            "airline names (ex. ?q=london paris)",
+            ),
+            OpenApiParameter(
+                "cursor", type=str, description="Page cursor"
+            ),
+        ],
+        responses=FlightSearchSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        pagination_class=FlightSearchPagination,
+    )
+    def search(self, request):
+        """Flights matching free text, best matches first"""
+        queryset = search_flights(
+            self.get_queryset(), request.query_params.get("q", "")
+        )
+        if queryset is None:
+            raise ValidationError({"q": "Enter words to search for."})
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[FlightBatchFilterSerializer],
+        responses=FlightDetailSerializer(many=True),
+        description="List representations unless detail is set",
+    )
+    @action(methods=["GET"], detail=False)
+    def batch(self, request):
+        """
+        Flights of an id list in its order, e.g. those of a cart, with
+        a fixed number of queries. Unknown ids are skipped.
+        """
+        params = FlightBatchFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        try:
+            ids = self._params_to_ints(params.validated_data["ids"])
+        except ValueError:
+            ids = None
+        if not ids or not all(0 < pk <= MAX_ID for pk in ids):
+            raise ValidationError({"ids": "Enter comma separated flight ids."})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > MAX_BATCH_FLIGHTS:
+            raise ValidationError(
+                {"ids": f"Enter at most {MAX_BATCH_FLIGHTS} flight ids."}
+            )
+
+        queryset = self.get_queryset()
+        if params.validated_data["detail"]:
+            serializer_class = FlightDetailSerializer
+            queryset = queryset.select_related("airplane__airplane_type")
+        else:
+            serializer_class = FlightListSerializer
+            queryset = self._annotate_tickets_available(
+                queryset.prefetch_related(None)
+            )
+
+        flights = queryset.in_bulk(ids)
+        flights = [flights[pk] for pk in ids if pk in flights]
+        if serializer_class is FlightDetailSerializer:
+            prefetch_departure_tickets(flights)
+
+        serializer = serializer_class(
+            flights, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+
+class FlightScheduleViewSet(ViewSet):
+    """Weekly flight schedules, see `airport.schedules`"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        request=FlightScheduleSerializer,
+        responses={
+            201: FlightScheduleResultSerializer,
+            200: FlightScheduleResultSerializer,
+        },
+    )
+    def create(self, request):
+        """
+        Create the flights of a weekly schedule with their crew, the
+        flights already scheduled being kept. Airplane and crew double
+        bookings are rejected per resource.
+        """
+        serializer = FlightScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = create_schedule(**serializer.validated_data)
+        except DoubleBookingError as error:
+            raise ValidationError(error.errors)
+        return Response(
+            FlightScheduleResultSerializer(result).data,
+            status=(
+                status.HTTP_201_CREATED
+                if result["created"]
+                else status.HTTP_200_OK
+            ),
+        )
+
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
@@ -217,17 +442,27 @@ class OrderPagination(PageNumberPagination):
 class OrderViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
+    ServerTimingMixin,
     GenericViewSet,
 ):
     queryset = Order.objects.prefetch_related(
-        "tickets__flight__airplane", "tickets__flight__route"
+        Prefetch(
+            "tickets__flight",
+            queryset=Flight.objects.select_related(
+                "airplane", "airline", "route__source", "route__destination"
+            ),
+        )
     )
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = self.queryset.filter(user_id=self.request.user.id)
+        if is_stuck_to_primary(self.request.user.id):
+            # new orders may not have reached the replicas yet
+            queryset = queryset.using(DEFAULT_DB_ALIAS)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -236,4 +471,250 @@ class OrderViewSet(
         return OrderSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        try:
+            serializer.save(user_id=self.request.user.id)
+        except IntegrityError:
+            # the seat was booked by a concurrent request after validation
+            SEAT_CONFLICTS.inc()
+            raise ValidationError({"tickets": [SEAT_BOOKED_MESSAGE]})
+
+        BOOKINGS.inc()
+        BOOKED_TICKETS.inc(len(serializer.validated_data["tickets"]))
+        stick_to_primary(self.request.user.id)
+
+
+class AnalyticsPagination(PageNumberPagination):
+    page_size = 100
+    max_page_size = 1000
+
+
+class LoadFactorViewSet(GenericViewSet):
+    """Daily load factors from the rollups of `airport.analytics`"""
+
+    queryset = DailyLoad.objects.all()
+    pagination_class = AnalyticsPagination
+    permission_classes = (IsAdminUser,)
+    # dimension and serializer of each action
+    dimensions = {
+        "routes": ("route", RouteLoadFactorSerializer),
+        "airlines": ("airline", AirlineLoadFactorSerializer),
+        "airplane_types": ("airplane_type", AirplaneTypeLoadFactorSerializer),
+    }
+
+    def get_serializer_class(self):
+        return self.dimensions[self.action][1]
+
+    def get_queryset(self):
+        params = DateRangeSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = self.queryset
+        if "date_from" in params.validated_data:
+            queryset = queryset.filter(
+                date__gte=params.validated_data["date_from"]
+            )
+        if "date_to" in params.validated_data:
+            queryset = queryset.filter(
+                date__lte=params.validated_data["date_to"]
+            )
+
+        return load_factors(queryset, self.dimensions[self.action][0])
+
+    def list_load_factors(self):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[DateRangeSerializer],
+        responses=RouteLoadFactorSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def routes(self, request):
+        """Seats offered and sold per departure date and route"""
+        return self.list_load_factors()
+
+    @extend_schema(
+        parameters=[DateRangeSerializer],
+        responses=AirlineLoadFactorSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def airlines(self, request):
+        """Seats offered and sold per departure date and airline"""
+        return self.list_load_factors()
+
+    @extend_schema(
+        parameters=[DateRangeSerializer],
+        responses=AirplaneTypeLoadFactorSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="airplane-types")
+    def airplane_types(self, request):
+        """Seats offered and sold per departure date and airplane type"""
+        return self.list_load_factors()
+
+
+class ForecastUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = (
+        "The booking curves aren't fitted yet, run fit_demand_curves."
+    )
+    default_code = "forecast_unavailable"
+
+
+class DemandForecastViewSet(GenericViewSet):
+    """Booking curves and seats sold forecasts of `airport.forecasting`"""
+
+    queryset = Flight.objects.select_related(
+        "route__source", "route__destination"
+    )
+    pagination_class = AnalyticsPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_serializer_class(self):
+        if self.action == "routes":
+            return RouteBookingCurveSerializer
+        return FlightForecastSerializer
+
+    def get_queryset(self):
+        params = ForecastFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        queryset = self.queryset.filter(departure_time__gte=datetime.now())
+        if "date_from" in filters:
+            queryset = queryset.filter(
+                departure_time__date__gte=filters["date_from"]
+            )
+        if "date_to" in filters:
+            queryset = queryset.filter(
+                departure_time__date__lte=filters["date_to"]
+            )
+        if "route" in filters:
+            queryset = queryset.filter(route_id=filters["route"])
+
+        return queryset.annotate(
+            capacity=F("airplane__rows") * F("airplane__seats_in_row"),
+            seats_sold=Count("tickets"),
+        ).order_by("departure_time")
+
+    @staticmethod
+    def get_curves():
+        curves = get_booking_curves()
+        if curves is None:
+            raise ForecastUnavailable()
+        return curves
+
+    @extend_schema(
+        parameters=[ForecastFilterSerializer],
+        responses=FlightForecastSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def flights(self, request):
+        """Expected final seats sold of the upcoming flights"""
+        curves = self.get_curves()
+        page = self.paginate_queryset(self.get_queryset())
+        forecast_flights(page, curves)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(responses=RouteBookingCurveSerializer(many=True))
+    @action(methods=["GET"], detail=False)
+    def routes(self, request):
+        """Booking curves of the routes, busiest first"""
+        page = self.paginate_queryset(self.get_curves().summaries())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class SlowQueryViewSet(ViewSet):
+    """Captured slow queries with their plans, see `airport.slow_queries`"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=SlowQuerySerializer(many=True))
+    def list(self, request):
+        serializer = SlowQuerySerializer(get_slow_queries(), many=True)
+        return Response(serializer.data)
+
+    @extend_schema(responses={(200, "application/x-ndjson"): str})
+    @action(methods=["GET"], detail=False, url_path="export")
+    def export(self, request):
+        """Download the captures as newline delimited JSON"""
+        response = HttpResponse(
+            b"".join(
+                orjson.dumps(entry) + b"\n" for entry in get_slow_queries()
+            ),
+            content_type="application/x-ndjson",
+        )
+        response["Content-Disposition"] = (
+            'attachment; filename="slow-queries.ndjson"'
+        )
+        return response
+
+    @extend_schema(request=None, responses={204: None})
+    @action(methods=["POST"], detail=False, url_path="clear")
+    def clear(self, request):
+        clear_slow_queries()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@extend_schema(
+    parameters=[OpenApiParameter("id", str, OpenApiParameter.PATH)]
+)
+class ProfileViewSet(ViewSet):
+    """Request profiles of staff users, see `airport.profiling`"""
+
+    permission_classes = (IsAdminUser,)
+    lookup_value_regex = "[0-9a-f]+"
+
+    def get_profile(self, pk):
+        profile = load_profile(pk)
+        if profile is None:
+            raise NotFound("Profile not found or expired.")
+        return profile
+
+    @extend_schema(responses={(200, "application/octet-stream"): bytes})
+    def retrieve(self, request, pk=None):
+        """Download the `cProfile` stats, readable by `pstats`"""
+        profile = self.get_profile(pk)
+        response = HttpResponse(
+            profile["stats"], content_type="application/octet-stream"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{pk}.prof"'
+        )
+        return response
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "sort",
+                type=str,
+                description="pstats sort key (ex. ?sort=tottime)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=int,
+                description="Number of functions listed (ex. ?limit=20)",
+            ),
+        ],
+        responses={(200, "text/plain"): str},
+    )
+    @action(methods=["GET"], detail=True, url_path="stats")
+    def stats(self, request, pk=None):
+        """Profile summary as printed by `pstats`"""
+        profile = self.get_profile(pk)
+        try:
+            content = format_stats(
+                profile["stats"],
+                sort=request.query_params.get("sort", "cumulative"),
+                limit=int(request.query_params.get("limit", 50)),
+            )
+        except (KeyError, ValueError):
+            raise ValidationError("Invalid sort or limit.")
+
+        header = (
+            f"{profile['method']} {profile['path']} "
+            f"({profile['status']}) in {profile['duration_ms']} ms\n"
+        )
+        return HttpResponse(header + content, content_type="text/plain")
@@ -0,0 +1,285 @@
+"""
+Django settings for airport_service project shared by every profile,
+see `dev` and `prod` for the profile specific ones.
+
+Generated by 'django-admin startproject' using Django 4.2.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.2/ref/settings/
+"""
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework",
+    "airport",
+    "user",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "airport.middleware.ReplicaRoutingMiddleware",
+    "airport.middleware.RequestProfilingMiddleware",
+    "airport.middleware.ServerTimingMiddleware",
+    "airport.middleware.MetricsMiddleware",
+    "airport.middleware.SlowQueryMiddleware",
+    "airport.middleware.CompressionMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "airport_service.urls"
+
+# Responses smaller than this (in bytes) are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+# Fraction of requests (0 to 1) reported with a `Server-Timing` header
+# and an `airport.timing` log line, 0 disables the instrumentation
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.environ.get("SERVER_TIMING_SAMPLE_RATE", 0)
+)
+
+# Bearer token required to read the Prometheus metrics at /metrics/,
+# which are only served under DEBUG when unset
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Queries of at least this duration are captured with their EXPLAIN plan
+# (see `airport.slow_queries`), 0 disables the capture
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200)
+)
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(
+    os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 1)
+)
+SLOW_QUERY_LOG_SIZE = 100
+
+# Seconds the profiles of staff requests with an `X-Profile` header
+# or a `profile` query parameter are kept for download
+REQUEST_PROFILE_TTL = 3600
+
+# Seconds the booking curves fitted by `airport.forecasting` are cached,
+# refit daily: a late refit leaves the forecast endpoints the old curves
+DEMAND_CURVES_TTL = 2 * 24 * 3600
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "airport_service.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "HOST": os.environ.get("POSTGRES_HOST"),
+        "NAME": os.environ["POSTGRES_DB"],
+        "USER": os.environ["POSTGRES_USER"],
+        "PASSWORD": os.environ["POSTGRES_PASSWORD"],
+    }
+}
+
+# read replicas of the default database, as comma separated hosts
+REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+REPLICA_DATABASES = [
+    f"replica_{num}" for num in range(1, len(REPLICA_HOSTS) + 1)
+]
+DATABASES.update(
+    {
+        alias: {
+            **DATABASES["default"],
+            "HOST": host,
+            "TEST": {"MIRROR": "default"},
+        }
+        for alias, host in zip(REPLICA_DATABASES, REPLICA_HOSTS)
+    }
+)
+
+DATABASE_ROUTERS = ["airport.db_router.PrimaryReplicaRouter"]
+
+# seconds a user reads their orders from the primary after a new one
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 10))
+
+
+# Cache shared by the worker processes and the management commands:
+# rate limits, read-your-writes stickiness, cached users, slow queries,
+# request profiles, booking curves and the versions of the in-process
+# indexes rely on it (see the `airport.W001` deploy check)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/0"),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation."
+        "UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation."
+        "MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation."
+        "CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation."
+        "NumericPasswordValidator",
+    },
+]
+
+AUTH_USER_MODEL = "user.User"
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.2/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = False
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.2/howto/static-files/
+
+STATIC_URL = "static/"
+
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_CLASSES": [
+        "rest_framework.throttling.AnonRateThrottle",
+        "rest_framework.throttling.UserRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        # an empty variable disables the throttle, e.g. for load tests
+        "anon": os.environ.get("ANON_THROTTLE_RATE", "10/day") or None,
+        "user": os.environ.get("USER_THROTTLE_RATE", "30/day") or None,
+    },
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "user.authentication.StatelessJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": ("airport.renderers.ORJSONRenderer",),
+    "DEFAULT_PARSER_CLASSES": (
+        "airport.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+}
+
+# Build read-only list responses from `values_list()` rows instead of
+# serializers (see `airport.projections`)
+PROJECTED_LIST_RESPONSES = True
+
+SPECTACULAR_SETTINGS = {
+    "TITLE": "Airport Service API",
+    "DESCRIPTION": "Order flight tickets",
+    "VERSION": "1.0.0",
+    "SERVE_INCLUDE_SCHEMA": False,
+    "SWAGGER_UI_SETTINGS": {
+        "deepLinking": True,
+        "defaultModelRendering": "model",
+        "defaultModelsExpandDepth": 2,
+        "defaultModelExpandDepth": 2,
+    },
+}
+
+# Version of the deployed code, e.g. a git commit; when unset,
+# a fingerprint of the source files is used
+CODE_VERSION = os.environ.get("CODE_VERSION")
+
+# Pregenerated OpenAPI schema, see `python manage.py generate_schema`
+SCHEMA_ARTIFACT_DIR = os.environ.get(
+    "SCHEMA_ARTIFACT_DIR", BASE_DIR / "var" / "schema"
+)
+SCHEMA_CACHE_MAX_AGE = 300
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.UserTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.UserTokenRefreshSerializer"
+    ),
+}
+
+# Seconds a full `User` instance is cached for views
+# that authenticate with `CachedUserJWTAuthentication` (0 disables it)
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get("JWT_USER_CACHE_TIMEOUT", 30))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "airport": {"handlers": ["console"], "level": "INFO"},
+    },
+}
@@ -0,0 +1,25 @@
+"""
+Production settings: no debug mode, and only the apps and middleware
+serving the API. The API documentation is served when `SERVE_API_DOCS`
+is set, so workers that never serve it don't import `drf_spectacular`:
+the views annotate their schema through `airport.openapi`.
+"""
+import os
+
+from airport_service.settings.base import *  # noqa: F401, F403
+from airport_service.settings.base import INSTALLED_APPS, REST_FRAMEWORK
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+if os.environ.get("SERVE_API_DOCS"):
+    INSTALLED_APPS = INSTALLED_APPS + ["drf_spectacular"]
+    REST_FRAMEWORK = {
+        **REST_FRAMEWORK,
+        "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    }
@@ -0,0 +1,56 @@
+"""
+Performance benchmarks for the airport API.
+
+Run a benchmark module from the project root, e.g.:
+
+    python -m benchmarks.renderers
+"""
+import os
+import timeit
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configure Django so benchmarks can use the project settings"""
+    os.environ.setdefault(
+        "DJANGO_SETTINGS_MODULE", "airport_service.settings.prod"
+    )
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Run the block against a freshly migrated, throwaway test database,
+    which the databases mirroring the default one, the replicas, read too.
+    """
+    from django.db import DEFAULT_DB_ALIAS, connection, connections
+    from django.test.utils import (
+        setup_test_environment,
+        teardown_test_environment,
+    )
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    for alias in connections:
+        if connections[alias].settings_dict["TEST"]["MIRROR"] == (
+            DEFAULT_DB_ALIAS
+        ):
+            connections[alias].creation.set_as_test_mirror(
+                connection.settings_dict
+            )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def bench(label, func, number, repeat=5):
+    """Print and return the best per-call time of `func` in seconds"""
+    seconds = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f"{label:<40} {seconds * 1e6:>10.1f} us")
+    return seconds
@@ -0,0 +1,50 @@
+"""
+Synthetic datasets for the benchmarks, built by `airport.synthetic`.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from airport.analytics import pending_refresh_range, refresh_daily_loads
+from airport.forecasting import cache_booking_curves
+from airport.search import invalidate_derived_indexes
+from airport.synthetic import SyntheticData
+
+SCALES = {
+    "small": {"tickets": 1_000, "flights": 100},
+    "medium": {"tickets": 100_000, "flights": 10_000},
+    "large": {"tickets": 1_000_000, "flights": 10_000},
+}
+
+
+def populate(tickets, flights, seed=0):
+    """
+    Create `flights` flights with `tickets` tickets spread evenly over
+    them, plus the reference data, users and orders they need, and the
+    load factor rollups and booking curves of the analytics endpoints.
+
+    Returns the user owning the most orders, to benchmark the order
+    endpoints on a page of orders.
+    """
+    SyntheticData(
+        airports=200,
+        airlines=20,
+        airplanes=100,
+        crews=500,
+        routes=1_000,
+        flights=flights,
+        users=1_000,
+        tickets=tickets,
+        seed=seed,
+        chunk_size=5_000,
+    ).generate()
+    # bulk inserts don't send the signals invalidating the indexes
+    invalidate_derived_indexes()
+    refresh_daily_loads(*pending_refresh_range())
+    cache_booking_curves()
+
+    return (
+        get_user_model()
+        .objects.annotate(orders=Count("order"))
+        .order_by("-orders", "pk")
+        .first()
+    )
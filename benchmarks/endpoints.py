@@ -0,0 +1,533 @@
+"""
+Benchmark of the API viewset actions against a synthetic dataset, all
+but the slow query and profile diagnostics of the staff.
+
+Creates a throwaway test database on the configured database server,
+fills it at the chosen scale and reports latency percentiles, queries
+per request and peak memory of each action. Results can be saved as a
+baseline, later runs are compared against it and exit with status 1 on
+regressions.
+
+    python -m benchmarks.endpoints --scale small --save-baseline
+    python -m benchmarks.endpoints --scale small
+"""
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.db.models import Max  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from PIL import Image  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework.views import APIView  # noqa: E402
+
+from airport.models import (  # noqa: E402
+    Airline,
+    Airplane,
+    AirplaneType,
+    Crew,
+    Flight,
+    Route,
+)
+from benchmarks.datasets import SCALES, populate  # noqa: E402
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+# actions moving flights in time, each gets its own slots
+FLIGHT_TIME_ACTIONS = (
+    "flights-create", "flights-update", "flights-partial-update"
+)
+
+
+class Action:
+    """A viewset action called with a fresh payload on every iteration"""
+
+    def __init__(self, name, method, url, payload=None, admin=False,
+                 format="json"):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.payload = payload
+        self.admin = admin
+        self.format = format
+
+    def call(self, client, num):
+        data = self.payload(num) if self.payload else None
+        if self.method == "get":
+            return client.get(self.url, data)
+        return getattr(client, self.method)(self.url, data, format=self.format)
+
+
+def png_upload(num):
+    content = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(content, format="PNG")
+    return {
+        "image": SimpleUploadedFile(
+            f"logo-{num}.png", content.getvalue(), "image/png"
+        )
+    }
+
+
+def get_actions(run_id):
+    airline = Airline.objects.first()
+    airplane = Airplane.objects.first()
+    route = Route.objects.first()
+    flight = Flight.objects.first()
+    booking_flight = Flight.objects.create(
+        route=route,
+        airline=airline,
+        airplane=airplane,
+        departure_time="2025-01-01 10:00",
+        arrival_time="2025-01-01 12:00",
+    )
+
+    airplanes = list(Airplane.objects.order_by("pk")[:20])
+    # schedules book airplanes of their own, week after week
+    airplanes, schedule_airplanes = airplanes[:10], airplanes[10:]
+    crews = list(Crew.objects.order_by("pk")[:10])
+    # after every generated flight, so no airplane or crew is busy
+    free_from = Flight.objects.aggregate(
+        latest=Max("arrival_time")
+    )["latest"] + timedelta(days=1)
+
+    def flight_times(action, num):
+        """Two hour flight in a slot no other call or action uses"""
+        slot = num * len(FLIGHT_TIME_ACTIONS) + FLIGHT_TIME_ACTIONS.index(
+            action
+        )
+        departure = free_from + timedelta(hours=3 * slot)
+        return {
+            "departure_time": departure.isoformat(),
+            "arrival_time": (departure + timedelta(hours=2)).isoformat(),
+        }
+
+    def flight_payload(action):
+        def payload(num):
+            return {
+                "route": route.id,
+                "airline": airline.id,
+                "airplane": airplanes[num % len(airplanes)].id,
+                "crew": [crews[num % len(crews)].id],
+                **flight_times(action, num),
+            }
+
+        return payload
+
+    def schedule_payload(num):
+        start_date = free_from.date() + timedelta(weeks=num)
+        return {
+            "route": route.id,
+            "airline": airline.id,
+            "airplane": schedule_airplanes[num % len(schedule_airplanes)].id,
+            "weekdays": [1, 2, 3, 4, 5, 6, 7],
+            "departure_time": "10:00",
+            "duration": "02:00:00",
+            "start_date": start_date.isoformat(),
+            "end_date": (start_date + timedelta(days=6)).isoformat(),
+        }
+
+    def order_payload(num):
+        return {
+            "tickets": [
+                {
+                    "flight": booking_flight.id,
+                    "row": num // airplane.seats_in_row + 1,
+                    "seat": num % airplane.seats_in_row + 1,
+                }
+            ]
+        }
+
+    flights_url = reverse("airport:flight-list")
+    flight_url = reverse("airport:flight-detail", args=[flight.id])
+    last_page = max(Flight.objects.count() // 10, 1)
+    # a cart of flights, out of their id order
+    batch_ids = Flight.objects.order_by("-pk").values_list("pk", flat=True)
+    batch_ids = ",".join(map(str, batch_ids[:20]))
+
+    return [
+        Action("airports-list", "get", reverse("airport:airport-list")),
+        Action(
+            "airports-create",
+            "post",
+            reverse("airport:airport-list"),
+            lambda num: {
+                "name": f"Bench airport {run_id}-{num}",
+                "code": f"B{run_id}-{num}",
+                "closest_big_city": "Bench city",
+            },
+            admin=True,
+        ),
+        Action(
+            "airports-nearest",
+            "get",
+            reverse("airport:airport-nearest"),
+            lambda num: {"latitude": 51.5, "longitude": -0.1},
+        ),
+        Action("airlines-list", "get", reverse("airport:airline-list")),
+        Action(
+            "airlines-create",
+            "post",
+            reverse("airport:airline-list"),
+            lambda num: {"name": f"Bench airline {run_id}-{num}"},
+            admin=True,
+        ),
+        Action(
+            "airlines-upload-image",
+            "post",
+            reverse("airport:airline-upload-image", args=[airline.id]),
+            png_upload,
+            admin=True,
+            format="multipart",
+        ),
+        Action(
+            "airplane-types-list", "get", reverse("airport:airplanetype-list")
+        ),
+        Action(
+            "airplane-types-create",
+            "post",
+            reverse("airport:airplanetype-list"),
+            lambda num: {"name": f"Bench type {run_id}-{num}"},
+            admin=True,
+        ),
+        Action("airplanes-list", "get", reverse("airport:airplane-list")),
+        Action(
+            "airplanes-retrieve",
+            "get",
+            reverse("airport:airplane-detail", args=[airplane.id]),
+        ),
+        Action(
+            "airplanes-create",
+            "post",
+            reverse("airport:airplane-list"),
+            lambda num: {
+                "name": f"Bench airplane {run_id}-{num}",
+                "rows": 30,
+                "seats_in_row": 6,
+                "airplane_type": AirplaneType.objects.first().id,
+            },
+            admin=True,
+        ),
+        Action("crews-list", "get", reverse("airport:crew-list")),
+        Action(
+            "crews-create",
+            "post",
+            reverse("airport:crew-list"),
+            lambda num: {"first_name": "Bench", "last_name": f"Crew {num}"},
+            admin=True,
+        ),
+        Action("routes-list", "get", reverse("airport:route-list")),
+        Action(
+            "routes-retrieve",
+            "get",
+            reverse("airport:route-detail", args=[route.id]),
+        ),
+        Action(
+            "routes-create",
+            "post",
+            reverse("airport:route-list"),
+            lambda num: {
+                "source": route.source_id,
+                "destination": route.destination_id,
+                "distance": 1000,
+            },
+            admin=True,
+        ),
+        Action("flights-list", "get", flights_url),
+        Action(
+            "flights-list-filtered",
+            "get",
+            flights_url,
+            lambda num: {"source": "London", "destination": "Paris"},
+        ),
+        Action(
+            "flights-list-last-page",
+            "get",
+            flights_url,
+            lambda num: {"page": last_page},
+        ),
+        Action(
+            "flights-search",
+            "get",
+            reverse("airport:flight-search"),
+            lambda num: {"q": "london paris"},
+        ),
+        Action(
+            "flights-batch",
+            "get",
+            reverse("airport:flight-batch"),
+            lambda num: {"ids": batch_ids},
+        ),
+        Action(
+            "flights-batch-detail",
+            "get",
+            reverse("airport:flight-batch"),
+            lambda num: {"ids": batch_ids, "detail": "true"},
+        ),
+        Action("flights-retrieve", "get", flight_url),
+        Action(
+            "flights-create",
+            "post",
+            flights_url,
+            flight_payload("flights-create"),
+            admin=True,
+        ),
+        Action(
+            "flights-update",
+            "put",
+            flight_url,
+            flight_payload("flights-update"),
+            admin=True,
+        ),
+        Action(
+            "flights-partial-update",
+            "patch",
+            flight_url,
+            lambda num: flight_times("flights-partial-update", num),
+            admin=True,
+        ),
+        Action(
+            "schedules-create",
+            "post",
+            reverse("airport:schedule-list"),
+            schedule_payload,
+            admin=True,
+        ),
+        Action("orders-list", "get", reverse("airport:order-list")),
+        Action(
+            "orders-create",
+            "post",
+            reverse("airport:order-list"),
+            order_payload,
+        ),
+        Action(
+            "load-factors-routes",
+            "get",
+            reverse("airport:load-factor-routes"),
+            admin=True,
+        ),
+        Action(
+            "load-factors-airlines",
+            "get",
+            reverse("airport:load-factor-airlines"),
+            admin=True,
+        ),
+        Action(
+            "load-factors-airplane-types",
+            "get",
+            reverse("airport:load-factor-airplane-types"),
+            admin=True,
+        ),
+        Action(
+            "forecasts-flights",
+            "get",
+            reverse("airport:forecast-flights"),
+            admin=True,
+        ),
+        Action(
+            "forecasts-routes",
+            "get",
+            reverse("airport:forecast-routes"),
+            admin=True,
+        ),
+    ]
+
+
+def percentile(quantiles, num):
+    return round(quantiles[num - 1] * 1000, 2)
+
+
+def run_action(action, client, iterations, counter):
+    # queries of every database, the replicas included
+    with ExitStack() as stack:
+        queries = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        ]
+        tracemalloc.start()
+        res = action.call(client, next(counter))
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    query_count = sum(map(len, queries))
+
+    latencies = []
+    statuses = {res.status_code}
+    for _ in range(iterations):
+        num = next(counter)
+        started = time.perf_counter()
+        res = action.call(client, num)
+        latencies.append(time.perf_counter() - started)
+        statuses.add(res.status_code)
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": percentile(quantiles, 50),
+        "p95_ms": percentile(quantiles, 95),
+        "p99_ms": percentile(quantiles, 99),
+        "max_ms": round(max(latencies) * 1000, 2),
+        "queries": query_count,
+        "peak_memory_kib": round(peak_memory / 1024, 1),
+        "statuses": sorted(statuses),
+    }
+
+
+def run(tickets, flights, iterations, seed):
+    results = {}
+    with test_database(), override_settings(
+        MEDIA_ROOT=tempfile.mkdtemp()
+    ), mock.patch.object(APIView, "check_throttles"):
+        print(f"Generating {tickets} tickets over {flights} flights...")
+        customer = populate(tickets=tickets, flights=flights, seed=seed)
+        admin = get_user_model().objects.create_user(
+            "bench-admin@example.com", "password", is_staff=True
+        )
+
+        user_client = APIClient()
+        user_client.force_authenticate(customer)
+        admin_client = APIClient()
+        admin_client.force_authenticate(admin)
+
+        for action in get_actions(run_id=seed):
+            client = admin_client if action.admin else user_client
+            results[action.name] = run_action(
+                action, client, iterations, iter(range(sys.maxsize))
+            )
+
+    return results
+
+
+def print_results(results):
+    header = (
+        f"{'action':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'queries':>8} {'peak KiB':>9}  status"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        print(
+            f"{name:<28} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+            f"{result['p99_ms']:>8} {result['max_ms']:>8} "
+            f"{result['queries']:>8} {result['peak_memory_kib']:>9}  "
+            f"{','.join(map(str, result['statuses']))}"
+        )
+
+
+def find_regressions(results, baseline, tolerance, slack_ms=0):
+    # absolute slack of each measure, below which changes are noise;
+    # tail latencies of a few dozen calls are too noisy to compare
+    slack = {"p50_ms": slack_ms, "peak_memory_kib": 0}
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries "
+                f"(baseline {base['queries']})"
+            )
+        for key in slack:
+            if result[key] > max(
+                base[key] * (1 + tolerance), base[key] + slack[key]
+            ):
+                regressions.append(
+                    f"{name}: {key} {result[key]} (baseline {base[key]})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--tickets", type=int, help="overrides --scale")
+    parser.add_argument("--flights", type=int, help="overrides --scale")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="baseline file, by default benchmarks/baselines/<scale>.json",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative median latency and memory increase",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=5,
+        help="median latency increase always allowed, timer noise",
+    )
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    tickets = args.tickets or scale["tickets"]
+    flights = args.flights or scale["flights"]
+    baseline_path = args.baseline or BASELINE_DIR / f"{args.scale}.json"
+
+    results = run(tickets, flights, args.iterations, args.seed)
+    print_results(results)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps(
+                {
+                    "database": connection.vendor,
+                    "tickets": tickets,
+                    "flights": flights,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nBaseline saved to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        return
+
+    baseline = json.loads(baseline_path.read_text())
+    if (baseline["tickets"], baseline["flights"]) != (tickets, flights):
+        print(f"\nBaseline {baseline_path} is for another dataset size")
+        return
+    if baseline.get("database") != connection.vendor:
+        print(f"\nBaseline {baseline_path} is for another database")
+        return
+
+    regressions = find_regressions(
+        results, baseline["results"], args.tolerance, args.slack_ms
+    )
+    if regressions:
+        print(f"\nRegressions against {baseline_path}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+    print(f"\nNo regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""
+Traffic replay load tester for a running API server.
+
+Replays a request log, recorded or generated, against the server with
+a fixed number of concurrent connections, sending every request at its
+scheduled time (open model). Reports throughput, error, conflict and
+throttle rates and latency percentiles per endpoint. Latency is
+measured from the scheduled time, so queueing in the tester itself
+is not hidden when the server falls behind.
+
+Users are logged in with the password of `manage.py generate_data`;
+run the server with throttling disabled, e.g.:
+
+    ANON_THROTTLE_RATE= USER_THROTTLE_RATE= python manage.py runserver
+
+Generate a log with a request mix and a Poisson arrival rate, then
+replay it, optionally faster or slower:
+
+    python -m benchmarks.loadtest generate --requests 5000 --rate 50 \\
+        --mix search=60,detail=25,refresh=5,order=10 -o traffic.ndjson
+    python -m benchmarks.loadtest run --log traffic.ndjson --concurrency 16
+    python -m benchmarks.loadtest run --log traffic.ndjson --speed 2
+
+Without `--log`, `run` generates the traffic on the fly. Log lines are
+JSON objects with `at` (seconds from the start), `endpoint`, `method`,
+`path`, optional `body` and `user` (index of a logged in user); bodies
+of `refresh` requests are filled with the user's refresh token.
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+API = "/api/airport"
+TOKEN_URL = "/api/user/token/"
+TOKEN_REFRESH_URL = "/api/user/token/refresh/"
+DEFAULT_MIX = "search=60,detail=25,refresh=5,order=10"
+SEAT_BOOKED = b"already booked"
+
+
+class Client:
+    """Keep-alive HTTP connection to the server, one per thread"""
+
+    def __init__(self, base_url, timeout=30):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def get_connection(self):
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return self.local.connection
+
+    def request(self, method, path, body=None, token=None):
+        """Return the status code and content of the response"""
+        headers = {"Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        connection = self.get_connection()
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            self.local.connection = None
+        return response.status, content
+
+
+class VirtualUser:
+    def __init__(self, email, access, refresh):
+        self.email = email
+        self.access = access
+        self.refresh = refresh
+        self.lock = threading.Lock()
+
+
+def log_in(client, emails, password):
+    users = []
+    for email in emails:
+        status, content = client.request(
+            "POST", TOKEN_URL, {"email": email, "password": password}
+        )
+        if status != 200:
+            sys.exit(f"Can't log in {email}: {status} {content[:200]!r}")
+        tokens = json.loads(content)
+        users.append(VirtualUser(email, tokens["access"], tokens["refresh"]))
+    return users
+
+
+def discover(client, user):
+    """Return the search terms and flight ids found on the server"""
+    status, content = client.request(
+        "GET", f"{API}/airports/", token=user.access
+    )
+    if status != 200:
+        sys.exit(f"Can't list airports: {status} {content[:200]!r}")
+    cities = sorted(
+        {airport["closest_big_city"] for airport in json.loads(content)}
+    )
+
+    status, content = client.request(
+        "GET", f"{API}/flights/", token=user.access
+    )
+    if status != 200:
+        sys.exit(f"Can't list flights: {status} {content[:200]!r}")
+    flights = json.loads(content)["count"]
+    if not cities or not flights:
+        sys.exit("No airports or flights, run `manage.py generate_data`")
+
+    return cities, range(1, flights + 1)
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        endpoint, weight = part.split("=")
+        if endpoint not in ENDPOINTS:
+            sys.exit(f"Unknown endpoint {endpoint!r}, use {list(ENDPOINTS)}")
+        weights[endpoint] = float(weight)
+    return weights
+
+
+def search_request(rnd, cities, flight_ids, args):
+    params = {"source": rnd.choice(cities)}
+    if rnd.random() < 0.5:
+        params["destination"] = rnd.choice(cities)
+    return "GET", f"{API}/flights/?{urlencode(params)}", None
+
+
+def detail_request(rnd, cities, flight_ids, args):
+    return "GET", f"{API}/flights/{rnd.choice(flight_ids)}/", None
+
+
+def refresh_request(rnd, cities, flight_ids, args):
+    return "POST", TOKEN_REFRESH_URL, None
+
+
+def order_request(rnd, cities, flight_ids, args):
+    flight_id = rnd.choice(flight_ids)
+    tickets = [
+        {
+            "flight": flight_id,
+            "row": rnd.randint(1, args.max_row),
+            "seat": rnd.randint(1, args.max_seat),
+        }
+        for _ in range(rnd.randint(1, 2))
+    ]
+    return "POST", f"{API}/orders/", {"tickets": tickets}
+
+
+ENDPOINTS = {
+    "search": search_request,
+    "detail": detail_request,
+    "refresh": refresh_request,
+    "order": order_request,
+}
+
+
+def generate_traffic(args, cities, flight_ids):
+    """Yield log entries of the mix with Poisson distributed arrivals"""
+    rnd = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    endpoints = list(weights)
+
+    at = 0.0
+    for _ in range(args.requests):
+        at += rnd.expovariate(args.rate)
+        endpoint = rnd.choices(endpoints, list(weights.values()))[0]
+        method, path, body = ENDPOINTS[endpoint](
+            rnd, cities, flight_ids, args
+        )
+        yield {
+            "at": round(at, 6),
+            "endpoint": endpoint,
+            "method": method,
+            "path": path,
+            "body": body,
+            "user": rnd.randrange(args.users),
+        }
+
+
+def read_log(path):
+    with open(path) as log:
+        entries = [json.loads(line) for line in log if line.strip()]
+    return sorted(entries, key=lambda entry: entry["at"])
+
+
+class Result:
+    __slots__ = ("endpoint", "status", "latency", "conflict")
+
+    def __init__(self, endpoint, status, latency, conflict=False):
+        self.endpoint = endpoint
+        self.status = status
+        self.latency = latency
+        self.conflict = conflict
+
+
+def send(client, entry, user, scheduled):
+    """Send a log entry, refreshing the user's token when it expired"""
+    body = entry.get("body")
+    if entry["endpoint"] == "refresh":
+        body = {"refresh": user.refresh}
+
+    try:
+        status, content = client.request(
+            entry["method"], entry["path"], body, user.access
+        )
+        if status == 401 and entry["endpoint"] != "refresh":
+            refresh_token(client, user)
+            status, content = client.request(
+                entry["method"], entry["path"], body, user.access
+            )
+    except (OSError, http.client.HTTPException):
+        status, content = None, b""
+
+    if entry["endpoint"] == "refresh" and status == 200:
+        user.access = json.loads(content)["access"]
+
+    return Result(
+        entry["endpoint"],
+        status,
+        time.perf_counter() - scheduled,
+        conflict=status == 409 or (status == 400 and SEAT_BOOKED in content),
+    )
+
+
+def refresh_token(client, user):
+    with user.lock:
+        status, content = client.request(
+            "POST", TOKEN_REFRESH_URL, {"refresh": user.refresh}
+        )
+        if status == 200:
+            user.access = json.loads(content)["access"]
+
+
+def replay(client, entries, users, concurrency, speed):
+    """Send every entry at its scheduled time and return the results"""
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        started = time.perf_counter()
+        for entry in entries:
+            scheduled = started + entry["at"] / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            user = users[entry.get("user", 0) % len(users)]
+            futures.append(
+                executor.submit(send, client, entry, user, scheduled)
+            )
+
+        results = [future.result() for future in futures]
+
+    return results, time.perf_counter() - started
+
+
+def percentile(latencies, num):
+    if len(latencies) == 1:
+        return round(latencies[0] * 1000, 1)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return round(quantiles[num - 1] * 1000, 1)
+
+
+def summarize(results, duration):
+    groups = {}
+    for result in results:
+        groups.setdefault(result.endpoint, []).append(result)
+    groups["total"] = results
+
+    summary = {}
+    for endpoint, group in groups.items():
+        latencies = [result.latency for result in group]
+        count = len(group)
+        errors = sum(
+            result.status is None or result.status >= 500 for result in group
+        )
+        summary[endpoint] = {
+            "requests": count,
+            "throughput_rps": round(count / duration, 1),
+            "error_rate": round(errors / count, 4),
+            "conflict_rate": round(
+                sum(result.conflict for result in group) / count, 4
+            ),
+            "throttled_rate": round(
+                sum(result.status == 429 for result in group) / count, 4
+            ),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": round(max(latencies) * 1000, 1),
+            "statuses": dict(
+                sorted(Counter(str(result.status) for result in group).items())
+            ),
+        }
+    return summary
+
+
+def print_summary(summary, duration):
+    header = (
+        f"{'endpoint':<10} {'requests':>8} {'req/s':>7} {'errors':>7} "
+        f"{'conflicts':>9} {'throttled':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8}"
+    )
+    print(f"Replayed in {duration:.1f}s\n")
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in summary.items():
+        print(
+            f"{endpoint:<10} {row['requests']:>8} "
+            f"{row['throughput_rps']:>7} {row['error_rate']:>7.1%} "
+            f"{row['conflict_rate']:>9.1%} {row['throttled_rate']:>9.1%} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} "
+            f"{row['max_ms']:>8}"
+        )
+
+
+def add_traffic_arguments(parser):
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument(
+        "--rate", type=float, default=20, help="mean requests per second"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-row", type=int, default=25)
+    parser.add_argument("--max-seat", type=int, default=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--users", type=int, default=20, help="number of users logged in"
+    )
+    parser.add_argument("--first-user", type=int, default=1)
+    parser.add_argument("--password", default="password")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a request log")
+    add_traffic_arguments(generate)
+    generate.add_argument("-o", "--output", help="by default stdout")
+
+    run = commands.add_parser("run", help="replay traffic")
+    add_traffic_arguments(run)
+    run.add_argument("--log", help="request log to replay")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument(
+        "--speed", type=float, default=1, help="replay speed multiplier"
+    )
+    run.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    client = Client(args.url)
+    emails = [
+        f"user{num}@example.com"
+        for num in range(args.first_user, args.first_user + args.users)
+    ]
+
+    if args.command == "generate":
+        users = log_in(client, emails[:1], args.password)
+        cities, flight_ids = discover(client, users[0])
+        output = open(args.output, "w") if args.output else sys.stdout
+        for entry in generate_traffic(args, cities, flight_ids):
+            output.write(json.dumps(entry) + "\n")
+        if args.output:
+            output.close()
+        return
+
+    users = log_in(client, emails, args.password)
+    if args.log:
+        entries = read_log(args.log)
+    else:
+        cities, flight_ids = discover(client, users[0])
+        entries = list(generate_traffic(args, cities, flight_ids))
+
+    results, duration = replay(
+        client, entries, users, args.concurrency, args.speed
+    )
+    summary = summarize(results, duration)
+    print_summary(summary, duration)
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(summary, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
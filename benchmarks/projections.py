@@ -0,0 +1,133 @@
+"""
+Benchmark of list endpoints served by projections versus serializers.
+
+Creates a throwaway test database, fills it with flights and
+reference data and times each list endpoint both ways.
+
+    python -m benchmarks.projections [--flights 1000] [--page-size 100]
+"""
+import argparse
+
+from benchmarks import bench, setup_django, test_database
+
+setup_django()
+
+from django.test import override_settings  # noqa: E402
+from rest_framework.pagination import PageNumberPagination  # noqa: E402
+from rest_framework.test import (  # noqa: E402
+    APIRequestFactory,
+    force_authenticate,
+)
+
+from airport import views  # noqa: E402
+from airport.models import (  # noqa: E402
+    Airline,
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Route,
+)
+
+LIST_VIEWS = {
+    "airports": views.AirportViewSet,
+    "airlines": views.AirlineViewSet,
+    "airplane-types": views.AirplaneTypeViewSet,
+    "airplanes": views.AirplaneViewSet,
+    "crews": views.CrewViewSet,
+    "routes": views.RouteViewSet,
+    "flights": views.FlightViewSet,
+}
+
+
+def populate(flights):
+    airports = Airport.objects.bulk_create(
+        Airport(
+            name=f"Airport {num}",
+            code=f"A{num:03}",
+            closest_big_city=f"City {num}",
+        )
+        for num in range(100)
+    )
+    airlines = Airline.objects.bulk_create(
+        Airline(name=f"Airline {num}", image=f"uploads/airlines/{num}.png")
+        for num in range(20)
+    )
+    airplane_type = AirplaneType.objects.create(name="Narrow body")
+    airplanes = Airplane.objects.bulk_create(
+        Airplane(
+            name=f"Airplane {num}",
+            rows=30,
+            seats_in_row=6,
+            airplane_type=airplane_type,
+        )
+        for num in range(50)
+    )
+    Crew.objects.bulk_create(
+        Crew(first_name=f"First {num}", last_name=f"Last {num}")
+        for num in range(100)
+    )
+    routes = Route.objects.bulk_create(
+        Route(
+            source=airports[num % 100],
+            destination=airports[(num + 1) % 100],
+            distance=1000,
+        )
+        for num in range(100)
+    )
+    Flight.objects.bulk_create(
+        Flight(
+            route=routes[num % 100],
+            airline=airlines[num % 20],
+            airplane=airplanes[num % 50],
+            departure_time=f"2024-01-01 {num % 24:02}:00",
+            arrival_time=f"2024-01-01 {(num + 2) % 24:02}:00",
+        )
+        for num in range(flights)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=1000)
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=100,
+        help="page size of paginated endpoints",
+    )
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    factory = APIRequestFactory()
+    user = type("BenchUser", (), {"is_authenticated": True, "pk": 0})()
+    pagination_class = type(
+        "BenchPagination",
+        (PageNumberPagination,),
+        {"page_size": args.page_size},
+    )
+
+    with test_database():
+        populate(args.flights)
+
+        for name, viewset in LIST_VIEWS.items():
+            initkwargs = {"throttle_classes": ()}
+            if viewset.pagination_class is not None:
+                initkwargs["pagination_class"] = pagination_class
+            view = viewset.as_view({"get": "list"}, **initkwargs)
+
+            def get():
+                request = factory.get(f"/api/airport/{name}/")
+                force_authenticate(request, user)
+                return view(request).render()
+
+            print(f"\n{name}")
+            with override_settings(PROJECTED_LIST_RESPONSES=False):
+                base = bench("serializer", get, args.number)
+            fast = bench("projection", get, args.number)
+            print(f"{'speedup':<40} {base / fast:>10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Microbenchmark of the JSON renderer and parser on flight and order pages.
+
+    python -m benchmarks.renderers [--flights 100] [--orders 100]
+"""
+import argparse
+import io
+from datetime import datetime, timedelta
+
+from benchmarks import bench, setup_django
+
+setup_django()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from airport.parsers import ORJSONParser  # noqa: E402
+from airport.renderers import ORJSONRenderer  # noqa: E402
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def flight_list_item(num):
+    """Build a `FlightListSerializer` shaped representation"""
+    departure = datetime(2024, 1, 1, 6, 0) + timedelta(hours=num)
+    return {
+        "id": num,
+        "route_source": f"Heathrow Airport {num}, London (LHR)",
+        "route_destination": f"Charles de Gaulle Airport {num}, Paris (CDG)",
+        "departure_time": departure.strftime(DATETIME_FORMAT),
+        "arrival_time": (departure + timedelta(hours=2)).strftime(
+            DATETIME_FORMAT
+        ),
+        "airplane_num_seats": 180,
+        "tickets_available": 180 - num % 180,
+        "airline_image": (
+            "http://testserver/media/uploads/airlines/"
+            f"airline-{num}-0b0a8b5e-2f5c-4bb0-9f83-3a4d1e0f7c11.png"
+        ),
+    }
+
+
+def order_list_item(num, tickets=3):
+    """Build an `OrderListSerializer` shaped representation"""
+    return {
+        "id": num,
+        "created_at": datetime(2024, 1, 1, 6, 0).strftime(DATETIME_FORMAT),
+        "tickets": [
+            {
+                "id": num * tickets + seat,
+                "row": num % 30 + 1,
+                "seat": seat + 1,
+                "flight": flight_list_item(num),
+            }
+            for seat in range(tickets)
+        ],
+    }
+
+
+def paginated(results):
+    return {
+        "count": len(results) * 10,
+        "next": "http://testserver/api/airport/flights/?page=2",
+        "previous": None,
+        "results": results,
+    }
+
+
+def compare(name, data, number):
+    print(f"\n{name}")
+    body = JSONRenderer().render(data)
+    assert ORJSONRenderer().render(data) == body
+
+    base = bench("JSONRenderer", lambda: JSONRenderer().render(data), number)
+    fast = bench(
+        "ORJSONRenderer", lambda: ORJSONRenderer().render(data), number
+    )
+    print(f"{'render speedup':<40} {base / fast:>10.1f} x")
+
+    base = bench(
+        "JSONParser", lambda: JSONParser().parse(io.BytesIO(body)), number
+    )
+    fast = bench(
+        "ORJSONParser", lambda: ORJSONParser().parse(io.BytesIO(body)), number
+    )
+    print(f"{'parse speedup':<40} {base / fast:>10.1f} x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    compare(
+        f"Flight list page ({args.flights} flights)",
+        paginated([flight_list_item(num) for num in range(args.flights)]),
+        args.number,
+    )
+    compare(
+        f"Order list page ({args.orders} orders)",
+        paginated([order_list_item(num) for num in range(args.orders)]),
+        args.number,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Cold start benchmark of `airport_service.wsgi.application`.
+
+Imports the WSGI application and loads the URLConf, as a worker does
+before serving its first request, in fresh interpreters. Exits with
+status 1 when the best time exceeds the budget.
+
+    python -m benchmarks.startup [--budget-ms 800] [--settings dev]
+    python -m benchmarks.startup --importtime 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import Counter
+
+COLD_START = """
+import time
+started = time.perf_counter()
+import airport_service.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - started)
+"""
+
+# settings read from the environment, no service is contacted on start
+PLACEHOLDER_ENV = {
+    "DJANGO_SECRET_KEY": "startup-benchmark",
+    "POSTGRES_DB": "airport",
+    "POSTGRES_USER": "airport",
+    "POSTGRES_PASSWORD": "airport",
+}
+
+
+def get_env(settings):
+    env = {**PLACEHOLDER_ENV, **os.environ}
+    env["DJANGO_SETTINGS_MODULE"] = f"airport_service.settings.{settings}"
+    return env
+
+
+def cold_start(env):
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output.split()[-1])
+
+
+def print_slowest_packages(env, count):
+    """Print the packages taking the longest to import, from -X importtime"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", COLD_START],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    packages = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        if self_time.strip().isdigit():
+            packages[name.strip().split(".")[0]] += int(self_time)
+
+    print("\nSlowest packages to import:")
+    for package, self_time in packages.most_common(count):
+        print(f"  {self_time / 1000:>8.1f} ms  {package}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--settings", default="prod", choices=("dev", "prod"))
+    parser.add_argument("--budget-ms", type=float, default=800)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--importtime",
+        type=int,
+        metavar="COUNT",
+        help="also list the COUNT slowest packages to import",
+    )
+    args = parser.parse_args()
+
+    env = get_env(args.settings)
+    times = [cold_start(env) * 1000 for _ in range(args.repeat)]
+    best = min(times)
+    print(
+        f"Cold start with {args.settings} settings: best {best:.1f} ms, "
+        f"worst {max(times):.1f} ms over {args.repeat} runs "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+
+    if args.importtime:
+        print_slowest_packages(env, args.importtime)
+
+    if best > args.budget_ms:
+        print(f"\nCold start exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
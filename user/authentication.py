@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from airport.metrics import record_cache_lookup
+from user.models import User
+
+USER_CACHE_KEY = "user:auth:{}"
+
+
+def user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticates requests from the signed token claims only.
+
+    `request.user` is a `TokenUser` exposing `id`, `email` and `is_staff`
+    from the token, so no `User` row is loaded per request.
+    """
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates requests with the full `User` model instance,
+    keeping it in the cache for `JWT_USER_CACHE_TIMEOUT` seconds.
+    """
+
+    def get_user(self, validated_token):
+        timeout = settings.JWT_USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(validated_token.get(api_settings.USER_ID_CLAIM))
+        user = cache.get(key)
+        record_cache_lookup("jwt_user", hit=user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout)
+
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
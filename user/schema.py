@@ -0,0 +1,23 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+)
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.StatelessJWTAuthentication"
+
+
+class CachedUserJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.CachedUserJWTAuthentication"
+
+
+class UserTokenObtainPairSerializerExtension(
+    TokenObtainPairSerializerExtension
+):
+    target_class = "user.serializers.UserTokenObtainPairSerializer"
+
+
+class UserTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = "user.serializers.UserTokenRefreshSerializer"
@@ -1,5 +1,12 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -22,3 +29,61 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+def add_user_claims(token, user):
+    """Add the claims the stateless token user is built from"""
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+
+    return token
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Put the user claims on the access token only. The refresh token
+    doesn't carry them, so refreshed access tokens read the current
+    user instead of copying stale staff rights.
+    """
+
+    @classmethod
+    def get_access_token(cls, user):
+        return add_user_claims(AccessToken.for_user(user), user)
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data["access"] = str(self.get_access_token(self.user))
+
+        return data
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Issue access tokens with the claims of the current user, refusing
+    the refresh tokens of deleted or deactivated users.
+    """
+
+    default_error_messages = {
+        "no_active_account": "No active account found for the given token."
+    }
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh[api_settings.USER_ID_CLAIM]
+        user = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        data = super().validate(attrs)
+        data["access"] = str(
+            UserTokenObtainPairSerializer.get_access_token(user)
+        )
+
+        return data
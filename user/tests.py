@@ -1,3 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+class StatelessJwtAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.admin = get_user_model().objects.create_user(
+            "admin@admin.com",
+            "testpass",
+            is_staff=True,
+        )
+
+    def authenticate(self, email):
+        res = self.client.post(
+            TOKEN_URL, {"email": email, "password": "testpass"}
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {res.data['access']}"
+        )
+        return res.data["access"]
+
+    def test_token_contains_user_claims(self):
+        token = AccessToken(self.authenticate(self.admin.email))
+
+        self.assertEqual(token["user_id"], self.admin.id)
+        self.assertEqual(token["email"], self.admin.email)
+        self.assertTrue(token["is_staff"])
+
+    def test_refresh_token_has_no_user_claims(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": self.admin.email, "password": "testpass"}
+        )
+        refresh = RefreshToken(res.data["refresh"])
+
+        self.assertNotIn("is_staff", refresh.payload)
+        self.assertNotIn("is_superuser", refresh.payload)
+
+    def test_refresh_reads_current_user(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": self.admin.email, "password": "testpass"}
+        )
+        self.admin.is_staff = False
+        self.admin.save()
+
+        res = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": res.data["refresh"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(AccessToken(res.data["access"])["is_staff"])
+
+    def test_refresh_rejects_inactive_user(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": self.admin.email, "password": "testpass"}
+        )
+        self.admin.is_active = False
+        self.admin.save()
+
+        res = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": res.data["refresh"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_read_does_not_query_user(self):
+        self.authenticate(self.user.email)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(AIRPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_staff_claim_allows_create(self):
+        payload = {
+            "name": "Heathrow Airport",
+            "code": "LHR",
+            "closest_big_city": "London",
+        }
+
+        self.authenticate(self.user.email)
+        res = self.client.post(AIRPORT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.admin.email)
+        res = self.client.post(AIRPORT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_manage_user_is_cached(self):
+        self.authenticate(self.user.email)
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_manage_user_update_invalidates_cache(self):
+        self.authenticate(self.user.email)
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {"email": "new@test.com"})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["email"], "new@test.com")
@@ -1,7 +1,8 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 
+from user.authentication import CachedUserJWTAuthentication
 from user.serializers import UserSerializer
 
 
@@ -11,8 +12,12 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedUserJWTAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+
+        # the cached instance may be stale, so never save over it
+        return get_user_model().objects.get(pk=self.request.user.pk)